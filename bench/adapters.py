@@ -0,0 +1,161 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+"""Database adapters for the benchmarks.
+
+    an adapter knows how to build a y47 Connection for one backend, which
+    cursor class to use and how to write its bind placeholders.  'sqlite' 
+    and 'stand-in' run offline, 'mysql' and 'oracle' read their settings 
+    from the environment:
+
+        Y47_BENCH_MYSQL=host:user:passwd:database
+        Y47_BENCH_ORACLE=host:user:passwd:sid
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from y47.db.connection import MySQLConnection, OracleConnection
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import MySQLCursor, OracleCursor, SQLiteCursor
+
+
+class StandInConnection(SQLiteConnection):
+    """a SQLite file behind a connect() that sleeps for handshake seconds,
+    standing in for a server on the local network"""
+    def __init__(self, database=None, handshake=0.005):
+        SQLiteConnection.__init__(self, database=database, 
+                                    check_same_thread=False)
+        self._handshake = handshake
+
+    def _connect(self):
+        time.sleep(self._handshake)
+        return SQLiteConnection._connect(self)
+
+
+class Adapter(object):
+    name = None
+    cursor_class = None
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def connection(self):
+        raise NotImplementedError
+
+    def sql(self, sql):
+        """benchmarks write ? placeholders"""
+        return sql
+
+    def create(self, handle):
+        cursor = self.cursor_class(connection=handle)
+        try:
+            cursor.execute("DROP TABLE bench")
+        except Exception:
+            pass
+        cursor.execute("CREATE TABLE bench (id INTEGER PRIMARY KEY, "
+                        "name VARCHAR(64), value FLOAT)")
+
+
+class SQLiteAdapter(Adapter):
+    name = 'sqlite'
+    cursor_class = SQLiteCursor
+
+    def setUp(self):
+        self._tmp = tempfile.mkdtemp()
+        self.database = os.path.join(self._tmp, 'bench.db')
+
+    def tearDown(self):
+        shutil.rmtree(self._tmp)
+
+    def connection(self):
+        return SQLiteConnection(database=self.database, 
+                                check_same_thread=False)
+
+
+class StandInAdapter(SQLiteAdapter):
+    name = 'stand-in'
+
+    def __init__(self, handshake=0.005):
+        self.handshake = handshake
+
+    def connection(self):
+        return StandInConnection(database=self.database, 
+                                    handshake=self.handshake)
+
+
+class MySQLAdapter(Adapter):
+    name = 'mysql'
+    cursor_class = MySQLCursor
+
+    def connection(self):
+        host, user, passwd, database = os.environ['Y47_BENCH_MYSQL'].split(':')
+        return MySQLConnection(host=host, user=user, passwd=passwd, 
+                                database=database)
+
+    def sql(self, sql):
+        return sql.replace('?', '%s')
+
+
+class OracleAdapter(Adapter):
+    name = 'oracle'
+    cursor_class = OracleCursor
+
+    def connection(self):
+        host, user, passwd, sid = os.environ['Y47_BENCH_ORACLE'].split(':')
+        return OracleConnection(host=host, user=user, passwd=passwd, sid=sid)
+
+    def sql(self, sql):
+        count = [0]
+        def bind(match):
+            count[0] += 1
+            return ':%d' % count[0]
+        return re.sub(r'\?', bind, sql)
+
+    def create(self, handle):
+        cursor = self.cursor_class(connection=handle)
+        try:
+            cursor.execute("DROP TABLE bench")
+        except Exception:
+            pass
+        cursor.execute("CREATE TABLE bench (id NUMBER PRIMARY KEY, "
+                        "name VARCHAR2(64), value BINARY_DOUBLE)")
+
+
+ADAPTERS = {
+    'sqlite': SQLiteAdapter,
+    'stand-in': StandInAdapter,
+    'mysql': MySQLAdapter,
+    'oracle': OracleAdapter,
+}
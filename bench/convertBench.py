@@ -0,0 +1,105 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+"""Column conversion per field against one compiled transform per result.
+
+    python bench/convertBench.py [rows]
+
+    'per field' is the usual loop over each row's columns looking up a 
+    converter for each, 'compiled' is Converters.compile().
+"""
+
+import sys
+import time
+import types
+
+from y47.db.connection import SQLiteConnection
+from y47.db.convert import Converters, toDecimal, toDatetime, fromJSON
+
+
+SQL = "SELECT id, price, created, attributes, name FROM items"
+
+
+def perField(rows, names, converters, row_type):
+    functions = [ converters.converter(name) for name in names ]
+    result = []
+    for row in rows:
+        values = []
+        for function, value in zip(functions, row):
+            if function is not None and value is not None:
+                value = function(value)
+            values.append(value)
+        if row_type is types.DictType:
+            result.append( dict( zip(names, values) ) )
+        else:
+            result.append( tuple(values) )
+    return result
+
+
+def compiled(rows, description, converters, row_type):
+    return map(converters.compile(description, row_type), rows)
+
+
+def main(rows=100000):
+    connection = SQLiteConnection(database=':memory:').connect
+    connection.execute("CREATE TABLE items (id INTEGER, price TEXT, "
+                        "created TEXT, attributes TEXT, name TEXT)")
+    connection.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?)",
+                            [ (i, '%d.25' % i, '2012-03-04 05:06:07', 
+                                '{"size": %d}' % i, 'name%d' % i) 
+                                for i in xrange(rows) ])
+
+    converters = Converters()
+    converters.register(toDecimal, name='price')
+    converters.register(toDatetime, name='created')
+    converters.register(fromJSON, name='attributes')
+    light = Converters()
+    light.register(int, name='id')
+
+    cursor = connection.cursor()
+    cursor.execute(SQL)
+    description = cursor.description
+    names = [ d[0] for d in description ]
+    fetched = cursor.fetchall()
+
+    for label, registry in [('decimal+datetime+json', converters), 
+                            ('one int column', light)]:
+        for row_type in [types.TupleType, types.DictType]:
+            for name, convert, argument in [
+                    ('per field', perField, names),
+                    ('compiled', compiled, description)]:
+                start = time.time()
+                convert(fetched, argument, registry, row_type)
+                elapsed = time.time() - start
+                print '%-22s %-6s %-10s %8.3fs %10.0f rows/s' % (label, 
+                        row_type.__name__, name, elapsed, rows / elapsed)
+
+    connection.close()
+
+
+if __name__ == '__main__':
+    main(*[ int(arg) for arg in sys.argv[1:] ])
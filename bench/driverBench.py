@@ -0,0 +1,84 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+"""Per-execute overhead of driver resolution.
+
+    python bench/driverBench.py [executes]
+
+    'inline import' repeats what the cursors did before y47.db.driver, i.e.
+    try the legacy sqlite module, fall back to sqlite3, on every call.
+"""
+
+import sys
+import time
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteDictionaryCursor
+from y47.db.driver import driver
+
+
+def inline_import():
+    try:
+        import sqlite
+    except ImportError:
+        import sqlite3 as sqlite
+    return sqlite
+
+
+def resolved():
+    return driver('sqlite')
+
+
+class InlineImportCursor(SQLiteDictionaryCursor):
+    def _execute(self, sql, args=None):
+        self._connection.row_factory = inline_import().Row
+        return SQLiteDictionaryCursor._execute(self, sql, args)
+
+
+def timeit(name, func, n):
+    start = time.time()
+    for i in xrange(n):
+        func()
+    elapsed = time.time() - start
+    print '%-32s %9d calls %8.3fs %8.2f us/call' % (name, n, elapsed, 
+                                                    elapsed / n * 1e6)
+
+
+def main(n=100000):
+    timeit('resolve: inline import', inline_import, n)
+    timeit('resolve: driver()', resolved, n)
+
+    connection = SQLiteConnection(database=':memory:').connect
+    for name, cursor in [('execute: inline import', InlineImportCursor),
+                         ('execute: driver()', SQLiteDictionaryCursor)]:
+        c = cursor(connection=connection)
+        timeit(name, lambda: c.execute("SELECT 1"), n / 10)
+
+
+if __name__ == '__main__':
+    main(*[ int(arg) for arg in sys.argv[1:] ])
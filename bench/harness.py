@@ -0,0 +1,211 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+"""Benchmark suite for the y47.db connection and cursor layers.
+
+    python bench/harness.py [--adapter sqlite] [--rows 100000] 
+                            [--repeat 5] [--output results.json]
+                            [--compare baseline.json] [--tolerance 0.10]
+
+    runs each benchmark --repeat times against a freshly loaded table and
+    records the best and median operations per second.  results are 
+    written as JSON (with the python, sqlite and platform versions) and, 
+    given --compare, checked against an earlier run: any benchmark whose 
+    best ops/sec dropped by more than --tolerance is reported and the 
+    exit status is 1.
+"""
+
+import json
+import optparse
+import platform
+import sqlite3
+import sys
+import time
+import types
+
+from y47.db.row import Record
+
+from adapters import ADAPTERS
+
+
+BENCHMARKS = []
+
+def benchmark(func):
+    BENCHMARKS.append(func)
+    return func
+
+
+def _load(adapter, handle, rows):
+    adapter.create(handle)
+    cursor = adapter.cursor_class(connection=handle)
+    cursor.execute_many(adapter.sql("INSERT INTO bench VALUES (?, ?, ?)"),
+                        ( (i, 'name%08d' % i, i * 0.5) for i in xrange(rows) ),
+                        chunk_size=10000)
+
+
+# each benchmark returns the number of operations it timed
+
+@benchmark
+def connect(adapter, handle, rows):
+    factory = adapter.connection()
+    for i in xrange(50):
+        factory._connect().close()
+    return 50
+
+
+@benchmark
+def lookup(adapter, handle, rows):
+    cursor = adapter.cursor_class(connection=handle)
+    sql = adapter.sql("SELECT * FROM bench WHERE id=?")
+    n = min(rows, 5000)
+    for i in xrange(n):
+        cursor.execute(sql, ((i * 7919) % rows,))
+    return n
+
+
+def _fetch(name, row_type):
+    def fetch(adapter, handle, rows):
+        cursor = adapter.cursor_class(connection=handle, row_type=row_type)
+        return len(cursor.execute("SELECT * FROM bench"))
+
+    fetch.__name__ = name
+    return benchmark(fetch)
+
+_fetch('fetch_tuple', types.TupleType)
+_fetch('fetch_dict', types.DictionaryType)
+_fetch('fetch_record', Record)
+
+
+@benchmark
+def iterate(adapter, handle, rows):
+    cursor = adapter.cursor_class(connection=handle)
+    count = 0
+    for row in cursor.iterate("SELECT * FROM bench", batch_size=1000):
+        count += 1
+    return count
+
+
+@benchmark
+def bulk_insert(adapter, handle, rows):
+    _load(adapter, handle, rows)
+    return rows
+
+
+def run(adapter, rows, repeat, names=None):
+    results = {}
+    adapter.setUp()
+    try:
+        handle = adapter.connection().connect
+        _load(adapter, handle, rows)
+        for func in BENCHMARKS:
+            if names and func.__name__ not in names:
+                continue
+
+            rates = []
+            for i in range(repeat):
+                start = time.time()
+                ops = func(adapter, handle, rows)
+                rates.append(ops / max(time.time() - start, 1e-9))
+
+            rates.sort()
+            results[func.__name__] = {
+                'best': rates[-1],
+                'median': rates[len(rates) // 2],
+                'ops': ops,
+            }
+        handle.close()
+    finally:
+        adapter.tearDown()
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in sorted(results['benchmarks'].items()):
+        before = baseline['benchmarks'].get(name)
+        if before is None:
+            continue
+        change = result['best'] / before['best'] - 1
+        if change < -tolerance:
+            regressions.append((name, before['best'], result['best'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = optparse.OptionParser()
+    parser.add_option('--adapter', default='sqlite', 
+                        choices=sorted(ADAPTERS.keys()))
+    parser.add_option('--rows', type='int', default=100000)
+    parser.add_option('--repeat', type='int', default=5)
+    parser.add_option('--benchmark', action='append', dest='names',
+                        help='run only this benchmark (repeatable)')
+    parser.add_option('--output')
+    parser.add_option('--compare')
+    parser.add_option('--tolerance', type='float', default=0.10)
+    options, args = parser.parse_args(argv)
+
+    adapter = ADAPTERS[options.adapter]()
+    results = {
+        'adapter': options.adapter,
+        'rows': options.rows,
+        'repeat': options.repeat,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'benchmarks': run(adapter, options.rows, options.repeat, 
+                            options.names),
+    }
+
+    for name, result in sorted(results['benchmarks'].items()):
+        print '%-14s %12.0f ops/s best %12.0f ops/s median' % (name, 
+                                            result['best'], result['median'])
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('adapter') != options.adapter:
+            print 'warning: comparing %s against a %s baseline' % (
+                                        options.adapter, baseline.get('adapter'))
+        regressions = compare(results, baseline, options.tolerance)
+        for name, before, after, change in regressions:
+            print 'REGRESSION %-14s %12.0f -> %12.0f ops/s (%+.1f%%)' % (
+                                            name, before, after, change * 100)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
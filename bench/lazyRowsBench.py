@@ -0,0 +1,84 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+"""Dictionary rows built up front against LazyRows, for callers that use
+a few rows, every row, or only the count.
+
+    python bench/lazyRowsBench.py [rows] [repeat]
+
+    both run over a plain DB-API cursor (SQLite here, the OracleCursor 
+    paths are the same functions), so the difference is the Python side
+    of the fetch: dict() per row against a DictRow per row touched.
+"""
+
+import sys
+import time
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import _dictionaryFactory, _lazyDictionaryFactory
+
+
+SQL = "SELECT id, name, value, flag, note FROM test"
+
+
+def first(rows):
+    return [ row['name'] for row in rows[:10] ]
+
+def every(rows):
+    return [ row['name'] for row in rows ]
+
+def count(rows):
+    return len(rows)
+
+
+def main(rows=100000, repeat=5):
+    connection = SQLiteConnection(database=':memory:').connect
+    connection.execute("CREATE TABLE test (id INTEGER, name TEXT, "
+                        "value REAL, flag INTEGER, note TEXT)")
+    connection.executemany("INSERT INTO test VALUES (?, ?, ?, ?, ?)",
+                            [ (i, 'name%d' % i, i * 0.5, i % 2, None) 
+                                for i in xrange(rows) ])
+
+    for use in [first, every, count]:
+        for name, factory in [('dict', _dictionaryFactory), 
+                                ('LazyRows', _lazyDictionaryFactory)]:
+            start = time.time()
+            for n in xrange(repeat):
+                cursor = connection.cursor()
+                cursor.arraysize = 1000
+                cursor.execute(SQL)
+                use(factory(cursor))
+                cursor.close()
+            elapsed = (time.time() - start) / repeat
+            print '%-6s %-10s %8.4fs per query' % (use.__name__, name, 
+                                                    elapsed)
+
+    connection.close()
+
+
+if __name__ == '__main__':
+    main(*[ int(arg) for arg in sys.argv[1:] ])
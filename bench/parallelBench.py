@@ -0,0 +1,98 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+"""Rows/sec of a full scan through one cursor against ParallelQuery.
+
+    python bench/parallelBench.py [rows] [partitions]
+
+    the scan returns Record rows, so each row is converted in Python, on
+    one core for the cursor and spread over the workers for ParallelQuery
+    (which also pays for pickling the rows back).
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+from y47.db.parallel import ParallelQuery
+from y47.db.row import Record
+
+
+SQL = "SELECT id, name, value FROM test"
+
+
+def setup(factory, rows):
+    connection = factory.connect
+    connection.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, "
+                        "name TEXT, value REAL)")
+    SQLiteCursor(connection=connection).execute_many(
+                    "INSERT INTO test VALUES (?, ?, ?)",
+                    ( (i, 'name%d' % i, i * 0.5) for i in xrange(rows) ),
+                    chunk_size=10000)
+    connection.close()
+
+
+def report(name, rows, elapsed):
+    print '%-28s %10d rows %8.3fs %10.0f rows/s' % (name, rows, elapsed,
+                                                    rows / elapsed)
+
+
+def main(rows=500000, partitions=4):
+    tmp = tempfile.mkdtemp()
+    try:
+        factory = SQLiteConnection(database=os.path.join(tmp, 'bench.db'))
+        setup(factory, rows)
+
+        connection = factory.connect
+        start = time.time()
+        count = len(SQLiteCursor(connection=connection, 
+                                    row_type=Record).execute(SQL))
+        report('cursor', count, time.time() - start)
+        connection.close()
+
+        for partitioning in ['modulo', 'range']:
+            query = ParallelQuery(connection=factory, 
+                                    cursor_class=SQLiteCursor, key='id',
+                                    partitions=partitions, 
+                                    partitioning=partitioning, 
+                                    row_type=Record)
+            start = time.time()
+            count = len(query.execute(SQL))
+            report('parallel %s x%d' % (partitioning, partitions), count,
+                    time.time() - start)
+            query.close()
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main(*[ int(arg) for arg in sys.argv[1:] ])
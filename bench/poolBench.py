@@ -0,0 +1,119 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+"""Queries/sec with and without ConnectionPool.
+
+    python bench/poolBench.py [queries] [threads] [handshake ms]
+
+    'sqlite' connects to a local SQLite file, 'stand-in' is the same file
+    behind a connect() that sleeps for the handshake time, standing in for
+    a MySQL/Oracle server on the local network.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+from y47.db.pool import ConnectionPool
+
+from adapters import StandInConnection
+
+
+def setup(path):
+    connection = SQLiteConnection(database=path).connect
+    connection.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)")
+    connection.executemany("INSERT INTO test VALUES (?, ?)",
+                            [ (i, 'name%d' % i) for i in range(1000) ])
+    connection.commit()
+    connection.close()
+
+
+def query(connection, i):
+    cursor = SQLiteCursor(connection=connection)
+    return cursor.execute("SELECT * FROM test WHERE id=?", (i % 1000,))
+
+
+def unpooled(factory, queries):
+    for i in queries:
+        connection = factory._connect()
+        query(connection, i)
+        connection.close()
+
+
+def pooled(pool, queries):
+    for i in queries:
+        with pool.connection() as connection:
+            query(connection, i)
+
+
+def run(name, target, args, queries, threads):
+    chunks = [ range(n, queries, threads) for n in range(threads) ]
+    workers = [ threading.Thread(target=target, args=args + (chunk,))
+                for chunk in chunks ]
+
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.time() - start
+
+    print '%-28s %8d queries %8.3fs %10.0f q/s' % (name, queries, elapsed, 
+                                                    queries / elapsed)
+
+
+def main(queries=5000, threads=4, handshake=5):
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'bench.db')
+        setup(path)
+
+        factories = [
+            ('sqlite', SQLiteConnection(database=path, 
+                                        check_same_thread=False)),
+            ('stand-in %dms' % handshake, StandInConnection(database=path,
+                                        handshake=handshake / 1000.0)),
+        ]
+        for name, factory in factories:
+            run('%s unpooled' % name, unpooled, (factory,), queries, threads)
+
+            pool = ConnectionPool(connection=factory, min_size=threads,
+                                    max_size=threads)
+            run('%s pooled' % name, pooled, (pool,), queries, threads)
+            pool.close()
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main(*[ int(arg) for arg in sys.argv[1:] ])
@@ -0,0 +1,128 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+"""Loads and concurrent reads/writes per SQLiteConnection profile.
+
+    python bench/pragmaBench.py [rows] [readers] [seconds]
+
+    each profile gets a fresh database file.  'load' inserts rows in 
+    chunks of 1000, 'mixed' runs readers threads of point SELECTs against
+    one thread of single row INSERT + COMMITs for the given seconds, each 
+    thread on its own connection.  'busy' counts operations that gave up 
+    on a locked database.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+from y47.db.driver import driver
+from y47.db.pragma import PROFILES
+
+
+def load(factory, rows):
+    connection = factory.connect
+    connection.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)")
+    cursor = SQLiteCursor(connection=connection)
+    result = cursor.execute_many("INSERT INTO test VALUES (?, ?)",
+                                ( (i, 'name%d' % i) for i in xrange(rows) ))
+    connection.close()
+    return result.rows_per_second
+
+
+class Worker(threading.Thread):
+    def __init__(self, factory, stop, rows, write):
+        threading.Thread.__init__(self)
+        self.factory = factory
+        self.stop = stop
+        self.rows = rows
+        self.write = write
+        self.count = 0
+        self.busy = 0
+
+    def run(self):
+        connection = self.factory.connect
+        cursor = SQLiteCursor(connection=connection)
+        i = self.rows
+        while not self.stop.is_set():
+            try:
+                if self.write:
+                    cursor.execute("INSERT INTO test VALUES (?, ?)", 
+                                    (i, 'name%d' % i))
+                    connection.commit()
+                    i += 1
+                else:
+                    cursor.execute("SELECT * FROM test WHERE id=?", 
+                                    (self.count % self.rows,))
+                self.count += 1
+            except driver('sqlite').OperationalError:
+                self.busy += 1
+                connection.rollback()
+        connection.close()
+
+
+def mixed(factory, rows, readers, seconds):
+    stop = threading.Event()
+    workers = [ Worker(factory, stop, rows, False) for i in range(readers) ]
+    workers.append( Worker(factory, stop, rows, True) )
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    reads = sum([ worker.count for worker in workers[:-1] ])
+    return (reads / float(seconds), workers[-1].count / float(seconds),
+            sum([ worker.busy for worker in workers ]))
+
+
+def main(rows=100000, readers=4, seconds=3):
+    print '%-12s %12s %12s %12s %8s' % ('profile', 'load rows/s', 'reads/s',
+                                        'writes/s', 'busy')
+    for profile in [None] + sorted(PROFILES.keys()):
+        tmp = tempfile.mkdtemp()
+        try:
+            factory = SQLiteConnection(database=os.path.join(tmp, 'bench.db'),
+                                        profile=profile)
+            loaded = load(factory, rows)
+            reads, writes, busy = mixed(factory, rows, readers, seconds)
+        finally:
+            shutil.rmtree(tmp)
+
+        print '%-12s %12.0f %12.0f %12.0f %8d' % (profile or 'default', 
+                                                loaded, reads, writes, busy)
+
+
+if __name__ == '__main__':
+    main(*[ int(arg) for arg in sys.argv[1:] ])
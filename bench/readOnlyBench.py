@@ -0,0 +1,138 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+"""Memory and read latency of SQLite reader processes per open mode.
+
+    python bench/readOnlyBench.py [rows] [readers] [queries]
+
+    readers processes open the same database file and each run queries 
+    range scans of 1000 rows.  every mode has a 64MB page cache, so the 
+    difference is pages copied into each process' pager against pages 
+    read through a shared memory map.  RSS is read from /proc (Linux): 
+    anon is private to the process, file is mapped pages of the database 
+    that all readers share through the OS page cache.
+"""
+
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+
+
+MODES = [
+    ('read/write', {}),
+    ('read_only', {'read_only': True}),
+    ('immutable', {'read_only': True, 'immutable': True}),
+    ('immutable+mmap', {'read_only': True, 'immutable': True, 
+                        'mmap_size': 1 << 30}),
+]
+
+
+def setup(path, rows):
+    connection = SQLiteConnection(database=path).connect
+    connection.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, "
+                        "payload TEXT)")
+    cursor = SQLiteCursor(connection=connection)
+    cursor.execute_many("INSERT INTO test VALUES (?, ?)",
+                        ( (i, '%0200d' % i) for i in xrange(rows) ),
+                        chunk_size=10000)
+    connection.close()
+
+
+def rss():
+    """(anon, file) resident KB from /proc/self/status"""
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('Rss'):
+                name, value = line.split(':')
+                values[name] = int(value.split()[0])
+    return values.get('RssAnon', 0), values.get('RssFile', 0)
+
+
+def reader(path, options, rows, queries, seed, results):
+    connection = SQLiteConnection(database=path, **options).connect
+    connection.execute('PRAGMA cache_size=-65536')
+    cursor = SQLiteCursor(connection=connection)
+    rand = random.Random(seed)
+    latencies = []
+    for i in xrange(queries):
+        start = rand.randrange(rows - 1000)
+        began = time.time()
+        cursor.execute("SELECT sum(length(payload)) FROM test "
+                        "WHERE id BETWEEN ? AND ?", (start, start + 1000))
+        latencies.append(time.time() - began)
+    results.put( (latencies, rss()) )
+    connection.close()
+
+
+def run(path, options, rows, readers, queries):
+    results = multiprocessing.Queue()
+    processes = [ multiprocessing.Process(target=reader, args=(path, options,
+                                rows, queries, seed, results))
+                    for seed in range(readers) ]
+    began = time.time()
+    for process in processes:
+        process.start()
+    collected = [ results.get() for process in processes ]
+    elapsed = time.time() - began
+    for process in processes:
+        process.join()
+
+    latencies = sorted(sum([ c[0] for c in collected ], []))
+    anon = sum([ c[1][0] for c in collected ]) / len(collected)
+    mapped = sum([ c[1][1] for c in collected ]) / len(collected)
+    return (latencies[len(latencies) // 2] * 1000, 
+            latencies[int(len(latencies) * 0.99)] * 1000,
+            len(latencies) / elapsed, anon / 1024.0, mapped / 1024.0)
+
+
+def main(rows=200000, readers=16, queries=500):
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'bench.db')
+        setup(path, rows)
+        print '%d readers, %.0fMB database' % (readers, 
+                                        os.path.getsize(path) / 1048576.0)
+        print '%-16s %8s %8s %10s %10s %10s' % ('mode', 'p50 ms', 'p99 ms',
+                                    'queries/s', 'anon MB', 'file MB')
+        for name, options in MODES:
+            print '%-16s %8.2f %8.2f %10.0f %10.1f %10.1f' % (
+                    (name,) + run(path, options, rows, readers, queries))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main(*[ int(arg) for arg in sys.argv[1:] ])
@@ -0,0 +1,101 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+"""Memory held by a result set per row_type.
+
+    python bench/rowBench.py [rows] [columns]
+
+    each row_type is measured in a fresh process: the peak RSS growth while
+    SQLiteCursor.execute() returns rows x columns from an in memory table.
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import time
+import types
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import OracleCursor, SQLiteCursor
+from y47.db.row import Record
+
+
+ROW_TYPES = {
+    'tuple': types.TupleType,
+    'dict': types.DictionaryType,
+    'record': Record,
+}
+
+
+def maxrss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def setup(rows, columns):
+    connection = SQLiteConnection(database=':memory:').connect
+    names = [ 'column%02d' % i for i in range(columns) ]
+    connection.execute("CREATE TABLE test (%s)" % ', '.join(names))
+    connection.executemany("INSERT INTO test VALUES (%s)" % 
+                            ', '.join('?' * columns),
+                            ( [i] * columns for i in xrange(rows) ))
+    return connection
+
+
+def child(name, rows, columns):
+    connection = setup(rows, columns)
+    row_type = ROW_TYPES[name]
+    if row_type is types.DictionaryType:
+        # sqlite3.Row is not a dict, build real dicts the way OracleCursor 
+        # does (its DB-API calls work on a sqlite3 connection too)
+        cursor = OracleCursor(connection=connection, row_type=row_type)
+    else:
+        cursor = SQLiteCursor(connection=connection, row_type=row_type)
+
+    before = maxrss()
+    start = time.time()
+    cursor.execute("SELECT * FROM test")
+    elapsed = time.time() - start
+    print '%d %f' % (maxrss() - before, elapsed)
+
+
+def main(rows=1000000, columns=10):
+    for name in ['tuple', 'dict', 'record']:
+        output = subprocess.check_output([sys.executable, __file__, '--child',
+                                        name, str(rows), str(columns)],
+                                        env=os.environ)
+        used, elapsed = output.split()
+        print '%-8s %8d rows x %2d columns %10.1f MB %8.3fs' % (name, rows, 
+                            columns, int(used) / 1048576.0, float(elapsed))
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        child(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+    else:
+        main(*[ int(arg) for arg in sys.argv[1:] ])
@@ -0,0 +1,91 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+"""Mixed tuple/dictionary workload on one SQLite connection.
+
+    python bench/rowFactoryBench.py [queries] [rows]
+
+    'connection row_factory' replays the old SQLiteDictionaryCursor, which
+    set sqlite3.Row on the shared connection, so every tuple cursor on it 
+    silently got Row objects through the slower factory path as well.
+"""
+
+import sys
+import time
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor, SQLiteDictionaryCursor
+from y47.db.driver import driver
+
+
+class ConnectionRowFactoryCursor(SQLiteDictionaryCursor):
+    def _execute(self, sql, args=None):
+        self._connection.row_factory = driver('sqlite').Row
+        return SQLiteDictionaryCursor._execute(self, sql, args)
+
+    def _newCursor(self, sql):
+        return self._connection.cursor()
+
+
+class ConnectionTupleCursor(SQLiteCursor):
+    def _newCursor(self, sql):
+        return self._connection.cursor()
+
+
+def main(queries=2000, rows=1000):
+    connection = SQLiteConnection(database=':memory:').connect
+    connection.execute("CREATE TABLE test (id INTEGER, name TEXT, value REAL)")
+    connection.executemany("INSERT INTO test VALUES (?, ?, ?)",
+                            [ (i, 'name%d' % i, i * 0.5) for i in range(rows) ])
+
+    for name, dictionary, tuples in [
+            ('connection row_factory', ConnectionRowFactoryCursor, 
+                                        ConnectionTupleCursor),
+            ('cursor row_factory', SQLiteDictionaryCursor, SQLiteCursor)]:
+        connection.row_factory = None
+        d = dictionary(connection=connection)
+        t = tuples(connection=connection)
+
+        tuple_time = 0.0
+        start = time.time()
+        for i in xrange(queries):
+            if i % 4 == 0:
+                d.execute("SELECT * FROM test")
+            else:
+                mark = time.time()
+                results = t.execute("SELECT * FROM test")
+                tuple_time += time.time() - mark
+        elapsed = time.time() - start
+
+        print '%-24s %8.0f q/s mixed %8.0f q/s tuple queries (%s rows)' % (
+                name, queries / elapsed, (queries * 3 / 4) / tuple_time,
+                type(results[0]).__name__)
+
+
+if __name__ == '__main__':
+    main(*[ int(arg) for arg in sys.argv[1:] ])
@@ -0,0 +1,115 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+"""Fan-out over many SQLite shards: one after the other against 
+ShardManager's worker threads, and the cost of an LRU smaller than the
+shard count.
+
+    python bench/shardBench.py [shards] [rows per shard] [capacity]
+
+    sqlite3 releases the GIL while a statement runs, so threads overlap 
+    the aggregate queries; rows are still built one thread at a time.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+from y47.db.shard import ShardManager
+
+
+SCAN = "SELECT id, value FROM test WHERE value > 0"
+AGGREGATE = "SELECT COUNT(*), SUM(value) FROM test WHERE name LIKE '%7%'"
+
+
+def setup(directory, shards, rows):
+    for shard in range(shards):
+        connection = SQLiteConnection(database=os.path.join(directory, 
+                                    '%d.db' % shard)).connect
+        connection.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, "
+                            "name TEXT, value REAL)")
+        SQLiteCursor(connection=connection).execute_many(
+                        "INSERT INTO test VALUES (?, ?, ?)",
+                        ( (i, 'name%d' % i, i * 0.5) for i in xrange(rows) ),
+                        chunk_size=10000)
+        connection.close()
+
+
+def report(name, elapsed, result=''):
+    print '%-36s %8.3fs %s' % (name, elapsed, result)
+
+
+def main(shards=64, rows=20000, capacity=16):
+    tmp = tempfile.mkdtemp()
+    try:
+        setup(tmp, shards, rows)
+
+        for sql in [SCAN, AGGREGATE]:
+            print sql
+            manager = ShardManager(directory=tmp, capacity=shards, 
+                                    max_workers=1)
+            start = time.time()
+            for shard in manager.shards():
+                manager.execute(shard, sql)
+            report('serial', time.time() - start)
+            manager.close()
+
+            for workers in [4, 8]:
+                manager = ShardManager(directory=tmp, capacity=shards,
+                                        max_workers=workers)
+                start = time.time()
+                if sql is SCAN:
+                    result = '%d rows' % len(manager.execute_all(sql))
+                else:
+                    result = manager.aggregate(sql)
+                report('%d threads' % workers, time.time() - start, result)
+
+                if sql is SCAN:
+                    start = time.time()
+                    manager.execute_all(sql, order_by='id')
+                    report('%d threads, ordered' % workers, 
+                            time.time() - start)
+                manager.close()
+
+            manager = ShardManager(directory=tmp, capacity=capacity, 
+                                    max_workers=8)
+            start = time.time()
+            for n in range(3):
+                manager.execute_all(sql)
+            report('3 runs, capacity %d' % capacity, time.time() - start,
+                    manager.stats())
+            manager.close()
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main(*[ int(arg) for arg in sys.argv[1:] ])
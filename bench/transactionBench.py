@@ -0,0 +1,95 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+"""Inserts/sec with a commit per statement against Connection.transaction().
+
+    python bench/transactionBench.py [rows] [group size]
+
+    single row INSERTs into a SQLite file with the default settings 
+    (journal_mode=DELETE, synchronous=FULL), so each commit is a journal
+    write and fsyncs.  'autocommit' commits every statement, 
+    'transaction' all rows in one unit of work and 'group commit' every
+    group size statements.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+
+
+SQL = "INSERT INTO test VALUES (?, ?)"
+
+
+def autocommit(connection, rows, group_size):
+    cursor = SQLiteCursor(connection=connection.connect)
+    for i in xrange(rows):
+        cursor.execute(SQL, (i, 'name%d' % i))
+
+
+def transaction(connection, rows, group_size):
+    with connection.transaction() as tx:
+        cursor = SQLiteCursor(connection=tx.connection)
+        for i in xrange(rows):
+            cursor.execute(SQL, (i, 'name%d' % i))
+
+
+def group_commit(connection, rows, group_size):
+    with connection.transaction(group_size=group_size) as tx:
+        cursor = SQLiteCursor(connection=tx.connection)
+        for i in xrange(rows):
+            cursor.execute(SQL, (i, 'name%d' % i))
+
+
+def main(rows=2000, group_size=100):
+    for name, target in [('autocommit', autocommit), 
+                        ('transaction', transaction), 
+                        ('group commit %d' % group_size, group_commit)]:
+        tmp = tempfile.mkdtemp()
+        try:
+            connection = SQLiteConnection(database=os.path.join(tmp, 
+                                                                'bench.db'))
+            connection.connect.execute("CREATE TABLE test "
+                                        "(id INTEGER PRIMARY KEY, name TEXT)")
+            start = time.time()
+            target(connection, rows, group_size)
+            elapsed = time.time() - start
+            connection.close()
+        finally:
+            shutil.rmtree(tmp)
+
+        print '%-20s %8d rows %8.3fs %10.0f inserts/s' % (name, rows, elapsed,
+                                                        rows / elapsed)
+
+
+if __name__ == '__main__':
+    main(*[ int(arg) for arg in sys.argv[1:] ])
@@ -34,3 +34,13 @@ class InvalidRowType(DatabaseException):
         DatabaseException.__init__(self, msg)
         self.row_type = row_type
         self.row_types = row_types
+
+class PoolTimeout(DatabaseException):
+    def __init__(self, timeout, msg=''):
+        DatabaseException.__init__(self, msg)
+        self.timeout = timeout
+
+class FutureTimeout(DatabaseException):
+    def __init__(self, timeout, msg=''):
+        DatabaseException.__init__(self, msg)
+        self.timeout = timeout
@@ -0,0 +1,624 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import sys
+import threading
+import types
+from collections import deque
+from itertools import islice
+from Queue import Queue
+
+from y47.db import FutureTimeout
+from y47.db.connection import SQLiteConnection, MySQLConnection
+from y47.db.connection import OracleConnection
+from y47.db.cursor import SQLiteCursor, MySQLCursor, OracleCursor
+
+
+class Future(object):
+    """the pending result of a call running on an Executor"""
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+
+
+    def _run(self, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except:
+            self._exc_info = sys.exc_info()
+        else:
+            self._result = result
+
+        self._lock.acquire()
+        try:
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        finally:
+            self._lock.release()
+
+        for callback in callbacks:
+            callback(self)
+
+
+    def done(self):
+        return self._event.isSet()
+
+
+    def _wait(self, timeout):
+        if not self._event.wait(timeout):
+            raise FutureTimeout(timeout, 'no result after %ss' % timeout)
+
+
+    def result(self, timeout=None):
+        self._wait(timeout)
+        if self._exc_info is not None:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+
+    def exception(self, timeout=None):
+        self._wait(timeout)
+        if self._exc_info is not None:
+            return self._exc_info[1]
+        return None
+
+
+    def add_done_callback(self, callback):
+        self._lock.acquire()
+        try:
+            if not self._event.isSet():
+                self._callbacks.append(callback)
+                return
+        finally:
+            self._lock.release()
+
+        callback(self)
+
+
+# END: Future
+
+
+class Executor(object):
+    """example:
+        from y47.db.asynchronous import Executor
+        executor = Executor(max_workers=4)
+        future = executor.submit(pow, 2, 10)
+        print future.result()
+        1024
+        executor.shutdown()
+
+        a bounded pool of daemon threads, started as work arrives.
+    """
+    def __init__(self, max_workers=10):
+        if max_workers < 1:
+            raise ValueError, 'max_workers must be >= 1'
+
+        self._max_workers = max_workers
+        self._queue = Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+
+    def _getMaxWorkers(self):
+        return self._max_workers
+
+    max_workers = property(_getMaxWorkers, None, None, 'max_workers')
+
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            future, fn, args, kwargs = item
+            future._run(fn, args, kwargs)
+
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self._lock.acquire()
+        try:
+            if self._shutdown:
+                raise ValueError, 'executor is shut down'
+
+            self._queue.put((future, fn, args, kwargs))
+            if len(self._workers) < self._max_workers:
+                worker = threading.Thread(target=self._work)
+                worker.setDaemon(True)
+                worker.start()
+                self._workers.append(worker)
+        finally:
+            self._lock.release()
+
+        return future
+
+
+    def shutdown(self, wait=True):
+        self._lock.acquire()
+        try:
+            self._shutdown = True
+            for worker in self._workers:
+                self._queue.put(None)
+        finally:
+            self._lock.release()
+
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+
+# END: Executor
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def defaultExecutor():
+    """the Executor shared by async connections created without one"""
+    global _executor
+    _executor_lock.acquire()
+    try:
+        if _executor is None:
+            _executor = Executor()
+        return _executor
+    finally:
+        _executor_lock.release()
+
+
+class _Serial(object):
+    """runs submitted calls one at a time, in submission order, on an 
+    executor. only one call is queued on the executor at a time, so a busy
+    connection does not tie up more than one worker.
+    an owner (an AsyncIterator) that reserve()s the queue and then hold()s
+    it from one of its calls keeps it until release(): meanwhile only the
+    calls it submits with submitAs() run, the others wait."""
+    def __init__(self, executor):
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self._held = {}         # owner: deque of its calls
+        self._owner = None
+        self._running = False
+
+
+    # called with the lock held
+    def _runnable(self):
+        if self._owner is not None:
+            return self._held[self._owner]
+        return self._pending
+
+    def _start(self):
+        if self._running or not self._runnable():
+            return False
+        self._running = True
+        return True
+
+
+    def _submit(self, queue, fn, args):
+        future = Future()
+        self._lock.acquire()
+        try:
+            if queue is None:
+                queue = self._pending
+            queue.append((future, fn, args))
+            start = self._start()
+        finally:
+            self._lock.release()
+
+        if start:
+            self._executor.submit(self._next)
+        return future
+
+
+    def submit(self, fn, *args):
+        return self._submit(None, fn, args)
+
+
+    def submitAs(self, owner, fn, *args):
+        """a call of owner's, run while it holds the queue (or in turn once
+        it has released it)"""
+        self._lock.acquire()
+        try:
+            queue = self._held.get(owner)
+        finally:
+            self._lock.release()
+        return self._submit(queue, fn, args)
+
+
+    def reserve(self, owner):
+        self._lock.acquire()
+        try:
+            self._held[owner] = deque()
+        finally:
+            self._lock.release()
+
+
+    def hold(self, owner):
+        """called from a running call of owner's"""
+        self._lock.acquire()
+        try:
+            self._owner = owner
+        finally:
+            self._lock.release()
+
+
+    def release(self, owner):
+        """ends owner's hold, its calls still queued run in turn"""
+        self._lock.acquire()
+        try:
+            if self._owner is owner:
+                self._owner = None
+            self._pending.extend( self._held.pop(owner, ()) )
+            start = self._start()
+        finally:
+            self._lock.release()
+
+        if start:
+            self._executor.submit(self._next)
+
+
+    def _next(self):
+        self._lock.acquire()
+        try:
+            future, fn, args = self._runnable().popleft()
+        finally:
+            self._lock.release()
+
+        future._run(fn, args, {})
+
+        self._lock.acquire()
+        try:
+            self._running = False
+            start = self._start()
+        finally:
+            self._lock.release()
+
+        if start:
+            self._executor.submit(self._next)
+
+
+# ============================================================================
+
+
+class AsyncConnection(object):
+    """runs every driver call for one connection on an Executor, one call
+    at a time. the driver connection is opened by the first call."""
+    def __init__(self, connection=None, executor=None):
+        self._connection = connection
+        self._executor = executor or defaultExecutor()
+        self._serial = _Serial(self._executor)
+        self._handle = None
+
+
+    def _getConnection(self):
+        return self._connection
+
+    connection = property(_getConnection, None, None, 
+                        'connection (configuration) property')
+
+
+    def _open(self):
+        if self._handle is None:
+            self._handle = self._connection._reconnect()
+
+        return self._handle
+
+
+    def _call(self, fn, args):
+        return fn(self._open(), *args)
+
+
+    def submit(self, fn, *args):
+        """returns a Future of fn(driver connection, *args)"""
+        return self._serial.submit(self._call, fn, args)
+
+
+    def _connect(self):
+        return self._serial.submit(self._open)
+
+    connect = property(_connect, None, None, 
+                        'connect property, a Future of the driver connection')
+
+
+    def commit(self):
+        return self.submit(lambda handle: handle.commit())
+
+
+    def rollback(self):
+        return self.submit(lambda handle: handle.rollback())
+
+
+    def _close(self):
+        if self._handle is not None:
+            handle, self._handle = self._handle, None
+            handle.close()
+
+
+    def close(self):
+        return self._serial.submit(self._close)
+
+
+# END: AsyncConnection
+
+
+class AsyncSQLiteConnection(AsyncConnection):
+    """example:
+        from y47.db.asynchronous import AsyncSQLiteConnection
+        from y47.db.asynchronous import AsyncSQLiteCursor
+        connection = AsyncSQLiteConnection(database=r'sqlite.db')
+        cursor = AsyncSQLiteCursor(connection=connection)
+        futures = [ cursor.execute("SELECT * FROM test WHERE id=?", (i,))
+                    for i in range(100) ]
+        for future in futures:
+            print future.result()
+        connection.close().result()
+    """
+    def __init__(self, database=None, autocommit=None, executor=None,
+                profile=None):
+        AsyncConnection.__init__(self, SQLiteConnection(database=database,
+                                autocommit=autocommit, check_same_thread=False,
+                                profile=profile), executor)
+
+
+# END: AsyncSQLiteConnection
+
+
+class AsyncMySQLConnection(AsyncConnection):
+    def __init__(self, host=None, user=None, passwd=None, database=None,
+                autocommit=1, executor=None):
+        AsyncConnection.__init__(self, MySQLConnection(host=host, user=user,
+                                passwd=passwd, database=database, 
+                                autocommit=autocommit), executor)
+
+
+# END: AsyncMySQLConnection
+
+
+class AsyncOracleConnection(AsyncConnection):
+    def __init__(self, host=None, user=None, passwd=None, sid=None,
+                autocommit=1, executor=None):
+        AsyncConnection.__init__(self, OracleConnection(host=host, user=user,
+                                passwd=passwd, sid=sid, autocommit=autocommit),
+                                executor)
+
+
+# END: AsyncOracleConnection
+# ============================================================================
+
+
+class _Hold(object):
+    """the connection an AsyncIterator holds.  kept apart from the 
+    iterator, which a failed batch's traceback can put in a reference 
+    cycle, so that __del__ still releases the connection when the 
+    iterator is dropped.  the serial queue only sees owner, a token"""
+    def __init__(self, connection):
+        self.connection = connection
+        self.serial = connection._serial
+        self.owner = object()
+        self.rows = None
+        self.done = False
+        self.serial.reserve(self.owner)
+
+
+    def submit(self, fn):
+        return self.serial.submitAs(self.owner, self.connection._call, 
+                                    fn, ())
+
+
+    def release(self):
+        self.done = True
+        self.serial.release(self.owner)
+
+
+    def close(self, handle):
+        if self.rows is not None:
+            self.rows.close()
+        if not self.done:
+            self.release()
+
+
+    # no batch is queued once the iterator is gone (each references it),
+    # close on the executor without resurrecting self
+    def __del__(self):
+        if self.done:
+            return
+        rows, serial, owner = self.rows, self.serial, self.owner
+        def close(handle):
+            if rows is not None:
+                rows.close()
+            serial.release(owner)
+        serial.submitAs(owner, self.connection._call, close, ())
+
+
+# END: _Hold
+
+
+class AsyncIterator(object):
+    """returned by AsyncCursor.iterate(). next_batch() returns a Future of 
+    the next list of rows ([] once exhausted) and starts fetching the one 
+    after it.
+
+        rows = cursor.iterate("SELECT * FROM test", batch_size=500)
+        rows.next_batch().add_done_callback(lambda future: ...)
+
+        for row in cursor.iterate("SELECT * FROM test", batch_size=500):
+            print row
+
+    from its first batch until it is exhausted, close()d or dropped the 
+    iterator holds the connection: calls made meanwhile wait, so a MySQL 
+    server side cursor is not interrupted by another statement ("Commands
+    out of sync").  leaving a for loop over it early closes it.  
+    iterating it blocks the calling thread on each batch, 
+    never iterate from an event loop or from a done callback (which runs
+    on the executor), use next_batch() there.
+    """
+    def __init__(self, cursor, sql, args=None, batch_size=1000):
+        self._cursor = cursor
+        self._sql = sql
+        self._args = args
+        self._batch_size = batch_size
+
+        # the first batch runs in turn and takes the connection, the rest
+        # run while it is held
+        self._hold = _Hold(cursor.connection)
+        self._pending = cursor.connection.submit(self._batch)
+
+
+    def _batch(self, handle):
+        hold = self._hold
+        if hold.done:
+            return []
+
+        try:
+            if hold.rows is None:
+                hold.serial.hold(hold.owner)
+                hold.rows = self._cursor._getCursor(handle).iterate(
+                                    self._sql, self._args, self._batch_size)
+            rows = list( islice(hold.rows, self._batch_size) )
+        except:
+            hold.release()
+            raise
+
+        if not rows:
+            hold.release()
+        return rows
+
+
+    def next_batch(self):
+        future, self._pending = self._pending, self._hold.submit(self._batch)
+        return future
+
+
+    def __iter__(self):
+        try:
+            while True:
+                rows = self.next_batch().result()
+                if not rows:
+                    return
+                for row in rows:
+                    yield row
+        finally:
+            if not self._hold.done:
+                self.close()
+
+
+    def close(self):
+        """a Future of closing the driver cursor and releasing the 
+        connection"""
+        return self._hold.submit(self._hold.close)
+
+
+# END: AsyncIterator
+
+
+class AsyncCursor(object):
+    """the async counterpart of a y47.db.cursor class, every call returns a
+    Future and runs on the connection's executor"""
+    _cursor_class = None
+
+    def __init__(self, connection=None, row_type=types.TupleType,
+                statement_cache=0):
+        self._connection = connection
+        self._row_type = row_type
+        self._statement_cache = statement_cache
+        self._cursor = None
+
+
+    def _getConnection(self):
+        return self._connection
+
+    def _setConnection(self, connection):
+        self._connection = connection
+        self._cursor = None
+
+    connection = property(_getConnection, _setConnection, None, 
+                        'connection property')
+
+
+    def _getRowType(self):
+        return self._row_type
+
+    row_type = property(_getRowType, None, None, 'row_type property')
+
+
+    # runs on the executor, the synchronous cursor is built on first use
+    def _getCursor(self, handle):
+        if self._cursor is None:
+            self._cursor = self._cursor_class(connection=handle, 
+                                    row_type=self._row_type,
+                                    statement_cache=self._statement_cache)
+        elif self._cursor.connection is not handle:
+            self._cursor.connection = handle
+
+        return self._cursor
+
+
+    def _submit(self, method, *args):
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        return self._connection.submit(lambda handle: 
+                            getattr(self._getCursor(handle), method)(*args))
+
+
+    def execute(self, sql, args=None):
+        return self._submit('execute', sql, args)
+
+
+    def execute_many(self, sql, rows, chunk_size=1000):
+        return self._submit('execute_many', sql, rows, chunk_size)
+
+
+    def iterate(self, sql, args=None, batch_size=1000):
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        return AsyncIterator(self, sql, args, batch_size)
+
+
+# END: AsyncCursor
+
+
+class AsyncSQLiteCursor(AsyncCursor):
+    _cursor_class = SQLiteCursor
+
+
+class AsyncMySQLCursor(AsyncCursor):
+    _cursor_class = MySQLCursor
+
+
+class AsyncOracleCursor(AsyncCursor):
+    _cursor_class = OracleCursor
+
+
+# END: AsyncOracleCursor
@@ -0,0 +1,339 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from y47.db.util import VERB
+
+
+_name = r'[\w."`\[\]]+'
+_reads = re.compile(r'\b(?:FROM|JOIN)\s+((?:%s(?:\s+(?:AS\s+)?\w+)?\s*,\s*)*%s)'
+                    % (_name, _name), re.I)
+_writes = re.compile(r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?(?:INTO\s+)?'
+                     r'|REPLACE\s+(?:INTO\s+)?'
+                     r'|UPDATE\s+(?:OR\s+\w+\s+)?(?:LOW_PRIORITY\s+|IGNORE\s+)*'
+                     r'|DELETE\s+(?:LOW_PRIORITY\s+|QUICK\s+|IGNORE\s+)*FROM\s+'
+                     r'|MERGE\s+INTO\s+'
+                     r'|TRUNCATE\s+(?:TABLE\s+)?)(%s)' % _name, re.I)
+_main = re.compile(r'(?:SELECT|INSERT|UPDATE|DELETE|REPLACE)\b', re.I)
+
+
+def _table(name):
+    return name.strip('"`[]').split('.')[-1].strip('"`[]').lower()
+
+
+def mainStatement(sql):
+    """sql without its leading WITH clause, i.e. the DELETE of 
+    WITH d AS (SELECT 1) DELETE FROM t WHERE id IN d. returns sql as it
+    is when there is no WITH or no statement after it"""
+    match = VERB.match(sql)
+    if not match or match.group(1).upper() != 'WITH':
+        return sql
+
+    depth = 0
+    quote = None
+    for i in xrange(match.end(), len(sql)):
+        c = sql[i]
+        if quote is not None:
+            if c == quote:
+                quote = None
+        elif c in '\'"`':
+            quote = c
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif depth == 0 and not (sql[i - 1].isalnum() or sql[i - 1] == '_') \
+                and _main.match(sql, i):
+            return sql[i:]
+    return sql
+
+
+def readTables(sql):
+    """returns the set of (lower case, unqualified) table names a query 
+    reads from"""
+    tables = set()
+    for names in _reads.findall(sql):
+        for name in names.split(','):
+            tables.add( _table(name.split()[0]) )
+    return tables
+
+
+def writeTable(sql):
+    """returns the table an INSERT/UPDATE/DELETE/REPLACE/MERGE/TRUNCATE 
+    writes to, or None"""
+    match = _writes.match(sql)
+    if match:
+        return _table(match.group(1))
+    return None
+
+
+def _key(sql, args, row_type):
+    if isinstance(args, dict):
+        args = tuple(sorted(args.items()))
+    elif args is not None:
+        args = tuple(args)
+
+    key = (sql, args, row_type)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class ResultCache(object):
+    """a size bounded LRU of query results that expire ttl seconds after 
+    they were stored (ttl=None never expires), indexed by the tables each
+    query reads so invalidate(table) drops every result that depends on it.
+    one ResultCache can be shared by many CachingCursors."""
+    def __init__(self, capacity=1000, ttl=60):
+        if capacity < 1:
+            raise ValueError, 'capacity must be >= 1'
+
+        self._capacity = capacity
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._results = OrderedDict()   # key: (expires, tables, result)
+        self._tables = {}               # table: set(key)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+
+    def _getCapacity(self):
+        return self._capacity
+
+    capacity = property(_getCapacity, None, None, 'capacity property')
+
+
+    def _getTtl(self):
+        return self._ttl
+
+    def _setTtl(self, ttl):
+        self._ttl = ttl
+
+    ttl = property(_getTtl, _setTtl, None, 'ttl property')
+
+
+    def __len__(self):
+        return len(self._results)
+
+
+    # called with the lock held
+    def _remove(self, key):
+        expires, tables, result = self._results.pop(key)
+        for table in tables:
+            keys = self._tables.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tables[table]
+
+
+    def get(self, key):
+        """returns (True, result) or (False, None) on a miss"""
+        self._lock.acquire()
+        try:
+            entry = self._results.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            expires, tables, result = entry
+            if expires is not None and expires <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            # most recently used last
+            del self._results[key]
+            self._results[key] = entry
+            self.hits += 1
+            return True, result
+        finally:
+            self._lock.release()
+
+
+    def put(self, key, result, tables):
+        expires = None
+        if self._ttl is not None:
+            expires = time.time() + self._ttl
+
+        self._lock.acquire()
+        try:
+            if key in self._results:
+                self._remove(key)
+
+            self._results[key] = (expires, tables, result)
+            for table in tables:
+                self._tables.setdefault(table, set()).add(key)
+
+            while len(self._results) > self._capacity:
+                self._remove( next(iter(self._results)) )
+                self.evictions += 1
+        finally:
+            self._lock.release()
+
+
+    def invalidate(self, table):
+        """drops every result read from table, returns how many"""
+        self._lock.acquire()
+        try:
+            keys = list( self._tables.get(_table(table), ()) )
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+        finally:
+            self._lock.release()
+
+
+    def clear(self):
+        self._lock.acquire()
+        try:
+            self.invalidations += len(self._results)
+            self._results.clear()
+            self._tables.clear()
+        finally:
+            self._lock.release()
+
+
+    def stats(self):
+        return {
+            'capacity': self._capacity,
+            'size': len(self._results),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
+
+
+# END: ResultCache
+
+
+class CachingCursor(object):
+    """example:
+        from y47.db.cache import CachingCursor, ResultCache
+        from y47.db.cursor import SQLiteCursor
+        cache = ResultCache(capacity=500, ttl=30)
+        cursor = CachingCursor(SQLiteCursor(connection=connection), cache)
+        cursor.execute("SELECT * FROM test WHERE id=?", (1,))   # database
+        cursor.execute("SELECT * FROM test WHERE id=?", (1,))   # cache
+        cursor.execute("UPDATE test SET name=? WHERE id=?", ('Glenn', 1))
+        cursor.execute("SELECT * FROM test WHERE id=?", (1,))   # database
+
+        wraps any y47.db.cursor class.  SELECT results are cached by (sql,
+        args, row_type).  an INSERT/UPDATE/DELETE run through the wrapper 
+        (WITH ... DELETE included) invalidates the results read from its 
+        table, any other statement
+        (DDL, statements the wrapper cannot parse) clears the cache.  
+        writes made through other connections are only seen once the ttl
+        expires or after cache.invalidate(table).  cached rows are shared
+        between callers, treat them as read only.
+    """
+    def __init__(self, cursor=None, cache=None):
+        self._cursor = cursor
+        if cache is None:
+            cache = ResultCache()
+        self._cache = cache
+
+
+    def _getCursor(self):
+        return self._cursor
+
+    def _setCursor(self, cursor):
+        self._cursor = cursor
+
+    cursor = property(_getCursor, _setCursor, None, 'wrapped cursor')
+
+
+    def _getCache(self):
+        return self._cache
+
+    cache = property(_getCache, None, None, 'cache property')
+
+
+    def _invalidate(self, sql):
+        table = writeTable(mainStatement(sql))
+        if table is None:
+            self._cache.clear()
+        else:
+            self._cache.invalidate(table)
+
+
+    def execute(self, sql, args=None):
+        if not self._cursor:
+            raise ValueError, 'cursor not set'
+
+        # a WITH clause can feed an INSERT/UPDATE/DELETE as well as a SELECT
+        match = VERB.match(mainStatement(sql))
+        if not match or match.group(1).upper() != 'SELECT':
+            try:
+                return self._cursor.execute(sql, args)
+            finally:
+                self._invalidate(sql)
+
+        key = _key(sql, args, getattr(self._cursor, '_row_type', None))
+        if key is None:
+            return self._cursor.execute(sql, args)
+
+        hit, result = self._cache.get(key)
+        if hit:
+            return result
+
+        result = self._cursor.execute(sql, args)
+        self._cache.put(key, result, readTables(sql))
+        return result
+
+
+    def execute_many(self, sql, rows, chunk_size=1000):
+        try:
+            return self._cursor.execute_many(sql, rows, chunk_size)
+        finally:
+            self._invalidate(sql)
+
+
+    def invalidate(self, table):
+        return self._cache.invalidate(table)
+
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+# END: CachingCursor
@@ -0,0 +1,134 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from array import array
+from collections import OrderedDict
+
+
+_numpy = []
+
+def _importNumpy():
+    """numpy, or None when it is not installed, imported on first use"""
+    if not _numpy:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy.append(numpy)
+    return _numpy[0]
+
+
+def _typecode(values):
+    """'l' for integers, 'd' for floats, None for anything else (including
+    NULLs, which array.array cannot hold)"""
+    typecode = None
+    for value in values:
+        if isinstance(value, (bool, int, long)):
+            if typecode is None:
+                typecode = 'l'
+        elif isinstance(value, float):
+            typecode = 'd'
+        else:
+            return None
+    return typecode
+
+
+class _Column(object):
+    """one result column, an array.array while every value fits one,
+    otherwise a list"""
+    def __init__(self):
+        self.values = None
+
+
+    def extend(self, values):
+        if self.values is None:
+            typecode = _typecode(values)
+            if typecode is None:
+                self.values = []
+            else:
+                self.values = array(typecode)
+
+        if isinstance(self.values, list):
+            self.values.extend(values)
+            return
+
+        size = len(self.values)
+        try:
+            self.values.extend(values)
+        except (TypeError, OverflowError):
+            # array.extend() appends up to the failing value
+            self.values = self.values.tolist()[:size]
+            self.values.extend(values)
+
+
+    def result(self, numpy):
+        if self.values is None:
+            return []
+
+        if numpy is not None and isinstance(self.values, array):
+            dtype = {'l': 'i%d' % self.values.itemsize, 'd': 'f8'}
+            return numpy.frombuffer(self.values, 
+                                    dtype=dtype[self.values.typecode])
+        return self.values
+
+
+def columnar(c, batch_size=1000, numpy=True):
+    """example:
+        from y47.db.cursor import OracleCursor
+        cursor = OracleCursor(connection=connection)
+        columns = cursor.columns("SELECT ID, PRICE, NAME FROM ITEMS")
+        print columns
+        OrderedDict([('ID', array('l', [1, 2])), ('PRICE', array('d', [1.5,
+                    2.0])), ('NAME', ['foo', 'bar'])])
+
+        builds {column name: values} from an executed driver cursor one 
+        fetchmany batch at a time, so the row-wise result is never held.
+        integer and float columns become array.array (or, with numpy=True 
+        and NumPy installed, NumPy arrays sharing the array's memory), 
+        columns with NULLs or other types become lists.  closes the cursor.
+    """
+    try:
+        names = [ d[0] for d in c.description ]
+        columns = [ _Column() for name in names ]
+        while True:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                break
+
+            for column, values in zip(columns, zip(*rows)):
+                column.extend(values)
+    finally:
+        c.close()
+
+    if numpy:
+        numpy = _importNumpy()
+    else:
+        numpy = None
+
+    return OrderedDict( (name, column.result(numpy)) 
+                        for name, column in zip(names, columns) )
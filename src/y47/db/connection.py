@@ -26,12 +26,448 @@
 #
 #####
 
+import os
+import threading
+import time
+import urllib
+from y47.db import DatabaseException
+from y47.db.driver import driver
+from y47.db.pragma import PROFILES, setPragmas
+
+
+# driver error codes worth retrying a connect for
+MYSQL_TRANSIENT = [1040, 2002, 2003, 2006, 2013]
+ORACLE_TRANSIENT = [3113, 3114, 12170, 12516, 12519, 12520, 12528, 12537,
+                    12541, 12547]
+
+
+# sqlite libraries built without SQLITE_USE_URI open 'file:...' as a plain
+# file name, checked once per process
+_use_uri = None
+
+def _useURI(sqlite):
+    global _use_uri
+    if _use_uri is None:
+        connection = sqlite.connect(':memory:')
+        _use_uri = ('USE_URI',) in [ tuple(row) for row in 
+                            connection.execute('PRAGMA compile_options') ]
+        connection.close()
+    return _use_uri
+
+
+def _readOnlyURI(database, immutable=False):
+    uri = 'file:%s?mode=ro' % urllib.quote(database)
+    if immutable:
+        uri += '&immutable=1'
+    return uri
+
+
 class Connection(object):
+    """the lifecycle every backend shares:
+
+        connection = SQLiteConnection(database=r'sqlite.db')
+        db = connection.open()      # or connection.connect
+        print db is connection.open()
+        True
+        connection.close()
+
+        # or, closed on the way out
+
+        with SQLiteConnection(database=r'sqlite.db') as db:
+            print db.execute("SELECT * FROM test").fetchall()
+
+        open() returns the calling thread's connection, opened on first 
+        use and reused afterwards.  a handle the caller closed is replaced
+        at once, one idle for more than ping_interval seconds (30, 0 pings
+        on every open()) is pinged first and, when it is dead, replaced.  
+        close(), and changing a setting connections are opened with, drops 
+        every thread's handle.  connects failing with a 
+        transient error (the server is down or busy) are retried retries 
+        times, sleeping backoff seconds and doubling it each time, before 
+        DatabaseException is raised; other driver errors (a bad path or 
+        password) raise it at once.  _connect() opens one new connection 
+        and raises the driver's error, _reconnect() opens one with the 
+        retries, ConnectionPool and the async connections use it.
+    """
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._handles = {}
+        self._generation = 0
+        self._retries = 3
+        self._backoff = 0.1
+        self._ping_interval = 30
+
+
     def _connect(self): raise NotImplementedError
+    def _ping(self, connection): raise NotImplementedError
+
+    # whether the handle was closed on this side, without a round trip
+    def _closed(self, handle): return False
+
+    # whether a failed connect is worth retrying
+    def _transient(self, err): return False
+
+
+    # the settings pickle, open handles do not (i.e. for the worker 
+    # processes of y47.db.parallel, which connect for themselves)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ['_connection', '_mysql', '_oracle', '_local', '_lock',
+                    '_handles']:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._handles = {}
+
+
+    def _getRetries(self):
+        return self._retries
+
+    def _setRetries(self, retries=3):
+        self._retries = retries
+
+    retries = property(_getRetries, _setRetries, None, 'retries property')
+
+
+    def _getBackoff(self):
+        return self._backoff
+
+    def _setBackoff(self, backoff=0.1):
+        self._backoff = backoff
+
+    backoff = property(_getBackoff, _setBackoff, None, 'backoff property')
+
+
+    def _getPingInterval(self):
+        return self._ping_interval
+
+    def _setPingInterval(self, ping_interval=30):
+        self._ping_interval = ping_interval
+
+    ping_interval = property(_getPingInterval, _setPingInterval, None, 
+                        'ping_interval property')
+
+
+    def _alive(self, handle):
+        try:
+            self._ping(handle)
+            return True
+        except Exception:
+            return False
+
+
+    def _reconnect(self):
+        delay = self._getBackoff()
+        for attempt in range(self._getRetries() + 1):
+            # bad settings or a missing driver will not fix themselves
+            try:
+                return self._connect()
+            except (ValueError, ImportError):
+                raise
+            except Exception, err:
+                if not self._transient(err):
+                    raise DatabaseException('could not connect: %s' % err)
+
+            if attempt < self._getRetries():
+                time.sleep(delay)
+                delay *= 2
+
+        raise DatabaseException('could not connect: %s' % err)
+
+
+    def open(self):
+        local = self._local
+        handle = getattr(local, 'handle', None)
+
+        # a forked child must not share its parent's connection
+        if handle is not None and local.pid != os.getpid():
+            handle = None
+
+        # close() or a new setting since this thread connected
+        if handle is not None and local.generation != self._generation:
+            self._discard(handle)
+            handle = None
+
+        now = time.time()
+        if handle is not None and (self._closed(handle) or 
+                now - local.used >= self._ping_interval and 
+                not self._alive(handle)):
+            self._discard(handle)
+            handle = None
+
+        if handle is None:
+            local.handle = None
+            handle = self._reconnect()
+            self._register(handle)
+            local.handle = handle
+            local.pid = os.getpid()
+            local.generation = self._generation
+
+        local.used = now
+        return handle
+
+    connect = property(open, None, None, 'connect property')
+
+
+    def _discard(self, handle):
+        try:
+            handle.close()
+        except Exception:
+            pass
+
+
+    # every thread's handle, keyed by (pid, thread), so close() reaches 
+    # them all. handles of finished threads are dropped here
+    def _register(self, handle):
+        pid = os.getpid()
+        threads = set(thread.ident for thread in threading.enumerate())
+        dead = []
+        self._lock.acquire()
+        try:
+            for key in self._handles.keys():
+                # a parent process's handles are not this process's to close
+                if key[0] != pid:
+                    del self._handles[key]
+                elif key[1] not in threads:
+                    dead.append(self._handles.pop(key))
+            self._handles[(pid, threading.current_thread().ident)] = handle
+        finally:
+            self._lock.release()
+
+        for old in dead:
+            self._discard(old)
+
+
+    def close(self):
+        """closes every thread's connection.  a driver may refuse to close
+        another thread's (sqlite3 with check_same_thread), that thread 
+        closes it on its next open() and reconnects"""
+        pid = os.getpid()
+        self._lock.acquire()
+        try:
+            self._generation += 1
+            mine = [ key for key in self._handles if key[0] == pid ]
+            handles = [ self._handles.pop(key) for key in mine ]
+        finally:
+            self._lock.release()
+
+        local = self._local
+        handle = getattr(local, 'handle', None)
+        if handle is not None and local.pid == pid:
+            self._discard(handle)
+        local.handle = None
+
+        for handle in handles:
+            self._discard(handle)
+
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def transaction(self, group_size=None, group_ms=None):
+        """a unit of work on this thread's connection, see Transaction"""
+        return Transaction(self, group_size, group_ms)
+
+
+    # transaction control for Transaction, per driver. _enter/_exit switch
+    # the handle out of and back into its autocommit mode
+    def _run(self, handle, sql):
+        cursor = handle.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+
+    def _enter(self, handle): return None
+    def _exit(self, handle, saved): pass
+    def _begin(self, handle): pass
+    def _commit(self, handle): handle.commit()
+    def _rollback(self, handle): handle.rollback()
+
+    def _savepoint(self, handle, name):
+        self._run(handle, 'SAVEPOINT %s' % name)
+
+    def _release(self, handle, name):
+        self._run(handle, 'RELEASE SAVEPOINT %s' % name)
+
+    def _rollbackTo(self, handle, name):
+        self._run(handle, 'ROLLBACK TO SAVEPOINT %s' % name)
 
 # END: Connection
 
 
+# open group commit transactions by id() of their driver connection, the
+# cursors count their statements through executed()
+_grouped = {}
+
+def executed(handle):
+    """counts a statement run on handle (a driver connection) towards its
+    open group commit transaction, if there is one"""
+    tx = _grouped.get(id(handle))
+    if tx is not None:
+        tx._count(1)
+
+
+class Transaction(object):
+    """example:
+        connection = SQLiteConnection(database=r'sqlite.db')
+        with connection.transaction() as tx:
+            cursor = SQLiteCursor(connection=tx.connection)
+            cursor.execute("INSERT INTO test VALUES (?, ?)", (1, 'Glenn'))
+
+            # nested, a savepoint: an error rolls back to here only
+            try:
+                with connection.transaction():
+                    cursor.execute("INSERT INTO test VALUES (?, ?)", 
+                                    (1, 'Glenn'))
+            except IntegrityError:
+                pass
+
+        # group commit, a long job commits every 1000 statements or 50ms
+
+        with connection.transaction(group_size=1000, group_ms=50) as tx:
+            cursor = SQLiteCursor(connection=tx.connection)
+            for row in rows:
+                cursor.execute("INSERT INTO test VALUES (?, ?)", row)
+        print tx.commits
+
+        commits on a clean exit and rolls back when the block raises.  
+        transactions opened inside another on the same thread are 
+        savepoints.  with group_size or group_ms every cursor execute() on
+        the transaction's connection is counted, once group_size have run
+        or group_ms have passed since the last commit the work so far is 
+        committed and a new transaction begun (only between nested 
+        transactions, never inside one).  executed(n) counts statements 
+        run some other way (i.e. on the driver connection itself).  
+        execute_many() commits its own chunks, do not call it inside a 
+        transaction.
+    """
+    def __init__(self, connection, group_size=None, group_ms=None):
+        self._owner = connection
+        self._group_size = group_size
+        self._group_ms = group_ms
+
+        self._handle = None
+        self._name = None
+        self._saved = None
+
+        self.statements = 0
+        self.commits = 0
+
+
+    def _getConnection(self):
+        return self._handle
+
+    connection = property(_getConnection, None, None, 
+                        'the driver connection of the open transaction')
+
+
+    def _stack(self):
+        local = self._owner._local
+        if getattr(local, 'transactions', None) is None:
+            local.transactions = []
+        return local.transactions
+
+
+    def __enter__(self):
+        stack = self._stack()
+        self._handle = self._owner.open()
+        if stack:
+            self._name = 'y47_savepoint_%d' % len(stack)
+            self._owner._savepoint(self._handle, self._name)
+        else:
+            self._saved = self._owner._enter(self._handle)
+            try:
+                self._owner._begin(self._handle)
+            except:
+                self._owner._exit(self._handle, self._saved)
+                raise
+            self._pending = 0
+            self._started = time.time()
+            self._transactions = stack
+            if self._group_size is not None or self._group_ms is not None:
+                _grouped[id(self._handle)] = self
+
+        stack.append(self)
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        stack = self._stack()
+        stack.pop()
+        owner, handle = self._owner, self._handle
+        if self._name is not None:
+            if exc_type is None:
+                owner._release(handle, self._name)
+            else:
+                owner._rollbackTo(handle, self._name)
+                owner._release(handle, self._name)
+            return False
+
+        if _grouped.get(id(handle)) is self:
+            del _grouped[id(handle)]
+        try:
+            if exc_type is None:
+                try:
+                    owner._commit(handle)
+                except:
+                    owner._rollback(handle)
+                    raise
+                self.commits += 1
+            else:
+                owner._rollback(handle)
+        finally:
+            owner._exit(handle, self._saved)
+        return False
+
+
+    def executed(self, n=1):
+        """counts n statements, committing when a group is full"""
+        stack = self._stack()
+        if not stack:
+            raise ValueError, 'transaction not open'
+
+        stack[0]._count(n)
+
+
+    def _count(self, n):
+        self.statements += n
+        self._pending += n
+        if len(self._transactions) == 1 and self._due():
+            self.commit()
+
+
+    def _due(self):
+        if self._group_size is not None and \
+                self._pending >= self._group_size:
+            return True
+        if self._group_ms is not None and \
+                (time.time() - self._started) * 1000 >= self._group_ms:
+            return True
+        return False
+
+
+    def commit(self):
+        """commits the work so far and begins again"""
+        self._owner._commit(self._handle)
+        self._owner._begin(self._handle)
+        self.commits += 1
+        self._pending = 0
+        self._started = time.time()
+
+
+# END: Transaction
+
+
 class SQLiteConnection(Connection):
     """example: 
         from y47.db.connection import SQLiteConnection
@@ -47,11 +483,33 @@ class SQLiteConnection(Connection):
         db = connection.connect
         print db
         <sqlite3.Connection object at 0x7fcad01f0a28>
+
+        # tuned for the workload, see y47.db.pragma.PROFILES
+
+        connection = SQLiteConnection(database=r'sqlite.db', 
+                                        profile='read_heavy').connect
+
+        # read only, for many processes reading the same file. immutable
+        # skips locking and change detection, only use it for files 
+        # nothing writes to while they are open. with mmap_size pages are
+        # read from the OS page cache every process shares
+
+        connection = SQLiteConnection(database=r'sqlite.db', read_only=True,
+                                    immutable=True, mmap_size=1 << 30).connect
         """
-    def __init__(self, database=None, autocommit=None):
+    def __init__(self, database=None, autocommit=None, check_same_thread=True,
+                cached_statements=100, profile=None, read_only=False,
+                immutable=False, mmap_size=None):
         Connection.__init__(self)
         self._database = database
         self._autocommit = autocommit
+        self._check_same_thread = check_same_thread
+        self._cached_statements = cached_statements
+        self._profile = None
+        self._setProfile(profile)
+        self._read_only = read_only
+        self._immutable = immutable
+        self._mmap_size = mmap_size
 
         self._autocommit_levels = [None, 'DEFERRED', 'IMMEDIATE', 'EXCLUSIVE']
 
@@ -62,6 +520,7 @@ class SQLiteConnection(Connection):
 
     def _setDatabase(self, database):
         self._database = database
+        self.close()
 
     database = property(_getDatabase, _setDatabase, None, 'database property')
 
@@ -75,36 +534,174 @@ class SQLiteConnection(Connection):
                     self._autocommit_levels
 
         self._autocommit = autocommit
+        self.close()
 
     autocommit = property(_getAutoCommit, _setAutocommit, None, 
                         'autocommit property')
 
 
+    # check_same_thread, set False to hand connections between threads
+    # (i.e. from a ConnectionPool)
+    def _getCheckSameThread(self):
+        return self._check_same_thread
+
+    def _setCheckSameThread(self, check_same_thread=True):
+        self._check_same_thread = check_same_thread
+        self.close()
+
+    check_same_thread = property(_getCheckSameThread, _setCheckSameThread,
+                        None, 'check_same_thread property')
+
+
+    # cached_statements, size of sqlite3's per connection cache of prepared
+    # statements (the sqlite3 default is 100)
+    def _getCachedStatements(self):
+        return self._cached_statements
+
+    def _setCachedStatements(self, cached_statements=100):
+        self._cached_statements = cached_statements
+        self.close()
+
+    cached_statements = property(_getCachedStatements, _setCachedStatements,
+                        None, 'cached_statements property')
+
+
+    # profile, PRAGMA settings applied at connect time
+    # ('read_heavy', 'write_heavy', 'bulk_load' or None for sqlite's defaults)
+    def _getProfile(self):
+        return self._profile
+
+    def _setProfile(self, profile=None):
+        if profile is not None and profile not in PROFILES:
+            raise ValueError, 'profile not in %s' % sorted(PROFILES.keys())
+
+        self._profile = profile
+        self.close()
+
+    profile = property(_getProfile, _setProfile, None, 'profile property')
+
+
+    # read_only, opens the file with mode=ro, immutable=True adds 
+    # immutable=1 (no locking, the file must not change while open)
+    def _getReadOnly(self):
+        return self._read_only
+
+    def _setReadOnly(self, read_only=False):
+        self._read_only = read_only
+        self.close()
+
+    read_only = property(_getReadOnly, _setReadOnly, None, 
+                        'read_only property')
+
+
+    def _getImmutable(self):
+        return self._immutable
+
+    def _setImmutable(self, immutable=False):
+        self._immutable = immutable
+        self.close()
+
+    immutable = property(_getImmutable, _setImmutable, None, 
+                        'immutable property')
+
+
+    # mmap_size, bytes of the file to memory map (PRAGMA mmap_size), set 
+    # after the profile so it overrides the profile's value
+    def _getMmapSize(self):
+        return self._mmap_size
+
+    def _setMmapSize(self, mmap_size=None):
+        self._mmap_size = mmap_size
+        self.close()
+
+    mmap_size = property(_getMmapSize, _setMmapSize, None, 
+                        'mmap_size property')
+
+
+    def _open(self, sqlite, database):
+        if not (self._getReadOnly() or self._getImmutable()):
+            return sqlite.connect(database, 
+                                isolation_level=self._getAutoCommit(),
+                                check_same_thread=self._getCheckSameThread(),
+                                cached_statements=self._getCachedStatements())
+
+        if _useURI(sqlite):
+            database = _readOnlyURI(database, self._getImmutable())
+        elif not os.path.isfile(database):
+            raise sqlite.OperationalError, 'unable to open database file'
+
+        connection = sqlite.connect(database, 
+                                isolation_level=self._getAutoCommit(),
+                                check_same_thread=self._getCheckSameThread(),
+                                cached_statements=self._getCachedStatements())
+
+        # without URI support the file is opened read/write, query_only 
+        # still refuses writes on the connection
+        connection.execute('PRAGMA query_only=1')
+        return connection
+
+
     # connect
     def _connect(self):
         if not self._getDatabase():
             raise ValueError, "database not set i.e. 'filename' or ':memory:'"
+        if self._getDatabase() == ':memory:' and (self._getReadOnly() or 
+                                                self._getImmutable()):
+            raise ValueError, 'read_only needs a database file'
 
         self._connection = None
+        sqlite = driver('sqlite')
+
+        # a local until it is ready, the same SQLiteConnection may be
+        # connecting on several threads (i.e. a ConnectionPool)
+        connection = self._open(sqlite, self.database)
+
+        connection.text_factory = str
+        if self._getProfile():
+            setPragmas(connection, PROFILES[self._getProfile()])
+        if self._getMmapSize() is not None:
+            setPragmas(connection, [('mmap_size', self._getMmapSize())])
+
+        self._connection = connection
+        return connection
+
+
+    # a missing file or directory stays missing, only a lock held by
+    # another connection (i.e. while switching journal_mode) goes away
+    def _transient(self, err):
+        return (isinstance(err, driver('sqlite').OperationalError) and
+                'locked' in str(err))
+
+
+    def _ping(self, connection):
+        connection.execute('SELECT 1')
+
+    def _closed(self, handle):
         try:
-            try:
-                import sqlite
-            except ImportError:
-                try:
-                    import sqlite3 as sqlite
-                except ImportError:
-                    print 'Cannot find SQLite module'
+            handle.total_changes
+            return False
+        except driver('sqlite').ProgrammingError:
+            return True
+
 
-            self._connection = sqlite.connect(self.database, 
-                                        isolation_level=self._getAutoCommit())
+    # sqlite3 begins and commits behind the scenes unless isolation_level
+    # is None, so a transaction takes over with it set to None
+    def _enter(self, handle):
+        saved = handle.isolation_level
+        handle.isolation_level = None
+        return saved
 
-            self._connection.text_factory = str
-            return self._connection
+    def _exit(self, handle, saved):
+        handle.isolation_level = saved
 
-        except(StandardError, sqlite.Error), err:
-            print err       
+    def _begin(self, handle):
+        self._run(handle, 'BEGIN')
 
-    connect = property(_connect, None, None, 'connect property')
+    def _commit(self, handle):
+        self._run(handle, 'COMMIT')
+
+    def _rollback(self, handle):
+        self._run(handle, 'ROLLBACK')
 
 
 # END: SQLiteConnection
@@ -131,13 +728,14 @@ class MySQLConnection(Connection):
     <_mysql.connection open to 'localhost' at 1b94cf0>
     """
     def __init__(self, host=None, user=None, passwd=None, database=None, 
-                autocommit=1):
+                autocommit=1, local_infile=0):
         Connection.__init__(self)
         self._host = host
         self._user = user
         self._passwd = passwd
         self._database = database
         self._autocommit = autocommit
+        self._local_infile = local_infile
 
         self._mysql = None
 
@@ -147,6 +745,7 @@ class MySQLConnection(Connection):
 
     def _setHost(self, host):
         self._host = host
+        self.close()
 
     host = property(_getHost, _setHost, None, 'host')
 
@@ -156,6 +755,7 @@ class MySQLConnection(Connection):
 
     def _setUser(self, user):
         self._user = user
+        self.close()
 
     user = property(_getUser, _setUser, None, 'user')
 
@@ -165,6 +765,7 @@ class MySQLConnection(Connection):
 
     def _setPasswd(self, passwd):
         self._passwd = passwd
+        self.close()
 
     passwd = property(_getPasswd, _setPasswd, None, 'passwd')
 
@@ -174,6 +775,7 @@ class MySQLConnection(Connection):
 
     def _setDatabase(self, database):
         self._database = database
+        self.close()
 
     database = property(_getDatabase, _setDatabase, None, 'Db')
 
@@ -183,10 +785,24 @@ class MySQLConnection(Connection):
 
     def _setAutocommit(self, autocommit=1):
         self._autocommit = autocommit
+        self.close()
 
     autocommit = property(_getAutoCommit, _setAutocommit, None, 'autocommit')
 
 
+    # local_infile, set to allow LOAD DATA LOCAL INFILE, see
+    # MySQLCursor.import_file
+    def _getLocalInfile(self):
+        return self._local_infile
+
+    def _setLocalInfile(self, local_infile=0):
+        self._local_infile = local_infile
+        self.close()
+
+    local_infile = property(_getLocalInfile, _setLocalInfile, None, 
+                        'local_infile')
+
+
     def _connect(self):
         if not self._getHost(): raise ValueError, 'host not set'
         if not self._getUser(): raise ValueError, 'user not set'
@@ -194,26 +810,36 @@ class MySQLConnection(Connection):
         if not self._getDatabase(): raise ValueError, 'database not set'
 
         self._mysql = None
-        try:
-            import MySQLdb
-        except ImportError:
-            print 'Cannot find MySQLdb module'
+        MySQLdb = driver('mysql')
+        connection = MySQLdb.connect( 
+            host = self._getHost(),
+            user = self._getUser(),
+            passwd = self._getPasswd(),
+            db = self._getDatabase(),
+            local_infile = self._getLocalInfile()
+        )
 
-        try:
-            self._mysql = MySQLdb.connect( 
-                host = self._getHost(),
-                user = self._getUser(),
-                passwd = self._getPasswd(),
-                db = self._getDatabase()
-            )
+        connection._transactional = self._getAutoCommit()
+        self._mysql = connection
+        return connection
+
+
+    # too many connections, can't connect, server gone away, lost 
+    # connection; a bad password or database is not retried
+    def _transient(self, err):
+        return (isinstance(err, driver('mysql').OperationalError) and 
+                bool(err.args) and err.args[0] in MYSQL_TRANSIENT)
+
+
+    def _ping(self, connection):
+        connection.ping()
 
-            self._mysql._transactional = self._getAutoCommit()
-            return self._mysql
+    def _closed(self, handle):
+        return not handle.open
 
-        except(StandardError, MySQLdb.Error), err:
-            print err
 
-    connect = property(_connect, None, None, 'connect')
+    def _begin(self, handle):
+        self._run(handle, 'START TRANSACTION')
 
 
 # END: MySQLConnection
@@ -263,6 +889,7 @@ class OracleConnection(Connection):
 
     def _setHost(self, host):
         self._host = host
+        self.close()
 
     host = property(_getHost, _setHost, None, 'host')
 
@@ -272,6 +899,7 @@ class OracleConnection(Connection):
 
     def _setUser(self, user):
         self._user = user
+        self.close()
 
     user = property(_getUser, _setUser, None, 'user')
 
@@ -281,6 +909,7 @@ class OracleConnection(Connection):
 
     def _setPasswd(self, passwd):
         self._passwd = passwd
+        self.close()
 
     passwd = property(_getPasswd, _setPasswd, None, 'passwd')
 
@@ -290,6 +919,7 @@ class OracleConnection(Connection):
 
     def _setSid(self, sid):
         self._sid = sid
+        self.close()
 
     sid = property(_getSid, _setSid, None, 'sid')
 
@@ -299,6 +929,7 @@ class OracleConnection(Connection):
 
     def _setAutocommit(self, autocommit=1):
         self._autocommit = autocommit
+        self.close()
 
     autocommit = property(_getAutoCommit, _setAutocommit, None, 'autocommit')
 
@@ -310,26 +941,54 @@ class OracleConnection(Connection):
         if not self._getSid(): raise ValueError, 'sid not set'
 
         self._oracle = None
+        cx_Oracle = driver('oracle')
+        self._connection_string = "%s/%s@%s/%s" % (
+            self._getUser(),
+            self._getPasswd(),
+            self._getHost(),
+            self._getSid()
+        )
+        connection = cx_Oracle.connect(self._connection_string)
+        connection.autocommit = self._getAutoCommit()
+        self._oracle = connection
+        return connection
+
+
+    # listener down or refusing, end-of-file on the channel; ORA-01017 
+    # (bad user/password) and friends are not retried
+    def _transient(self, err):
+        if not isinstance(err, driver('oracle').DatabaseError) or not err.args:
+            return False
+        return getattr(err.args[0], 'code', None) in ORACLE_TRANSIENT
+
+
+    def _ping(self, connection):
+        cursor = connection.cursor()
+        cursor.execute('SELECT 1 FROM DUAL')
+        cursor.close()
+
+    # cx_Oracle raises 'not connected' for a closed handle's attributes
+    def _closed(self, handle):
         try:
-            import cx_Oracle
-        except ImportError:
-            print 'Cannot find cx_Oracle module'
+            handle.version
+            return False
+        except driver('oracle').Error:
+            return True
 
-        try:
-            self._connection_string = "%s/%s@%s/%s" % (
-                self._getUser(),
-                self._getPasswd(),
-                self._getHost(),
-                self._getSid()
-            )
-            self._oracle = cx_Oracle.connect(self._connection_string)
-            self._oracle.autocommit = self._getAutoCommit()
-            return self._oracle
-
-        except(StandardError, cx_Oracle.Error), err:
-            raise cx_Oracle.Error(err)
-
-    connect = property(_connect, None, None, 'connect')
+
+    # transactions begin with the first statement, autocommit is switched 
+    # off meanwhile. savepoints end with the transaction, there is no 
+    # RELEASE
+    def _enter(self, handle):
+        saved = handle.autocommit
+        handle.autocommit = False
+        return saved
+
+    def _exit(self, handle, saved):
+        handle.autocommit = saved
+
+    def _release(self, handle, name):
+        pass
 
 
 # END: OracleConnection
@@ -0,0 +1,260 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import datetime
+import decimal
+import json
+import threading
+import types
+
+from y47.db.row import Record, recordClass
+
+
+# ready made converters, each is given a non NULL value
+
+def toDecimal(value):
+    """exact decimal of a number or numeric string, floats through repr so
+    0.1 stays 0.1"""
+    if isinstance(value, float):
+        return decimal.Decimal(repr(value))
+    return decimal.Decimal(value)
+
+
+_datetimes = ['%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f',
+                '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d']
+
+def toDatetime(value):
+    """datetime of an ISO 8601 string (SQLite stores them as text), other
+    values are returned as they are"""
+    if not isinstance(value, basestring):
+        return value
+
+    # the fixed width forms SQLite writes, sliced rather than strptime'd
+    try:
+        dated = value[4:5] == '-' and value[7:8] == '-'
+        if dated and len(value) == 19 and value[10] in ' T':
+            return datetime.datetime(int(value[0:4]), int(value[5:7]), 
+                        int(value[8:10]), int(value[11:13]), 
+                        int(value[14:16]), int(value[17:19]))
+        if dated and len(value) == 10:
+            return datetime.datetime(int(value[0:4]), int(value[5:7]), 
+                                    int(value[8:10]))
+    except ValueError:
+        pass
+
+    for format in _datetimes:
+        try:
+            return datetime.datetime.strptime(value, format)
+        except ValueError:
+            pass
+    raise ValueError, 'not an ISO 8601 datetime: %r' % value
+
+
+def toDate(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return toDatetime(value).date()
+
+
+def fromJSON(value):
+    if isinstance(value, basestring):
+        return json.loads(value)
+    return json.loads(readLOB(value))
+
+
+def readLOB(value):
+    """the contents of a cx_Oracle LOB (anything with read()), which is 
+    only valid until the next fetch"""
+    if hasattr(value, 'read'):
+        return value.read()
+    return value
+
+
+def toUnicode(value):
+    """utf-8 str to unicode, SQLiteConnection returns TEXT as str"""
+    if isinstance(value, str):
+        return value.decode('utf-8')
+    return value
+
+
+# ============================================================================
+
+
+def _shape(row_type):
+    if row_type in [types.DictType, types.DictionaryType]:
+        return types.DictType
+    if row_type is Record:
+        return Record
+    return types.TupleType
+
+
+class Converters(object):
+    """example:
+        import types
+        from y47.db.convert import Converters, toDecimal, toDatetime
+        from y47.db.convert import fromJSON, readLOB
+        from y47.db.cursor import OracleCursor
+        import cx_Oracle
+
+        converters = Converters()
+        converters.register(toDecimal, name='PRICE')
+        converters.register(fromJSON, name='ATTRIBUTES')
+        converters.register(readLOB, type=cx_Oracle.CLOB)
+
+        cursor = OracleCursor(connection=connection, converters=converters,
+                                row_type=types.DictionaryType)
+        print cursor.execute("SELECT ID, PRICE, ATTRIBUTES FROM ITEMS")
+        [{'ID': 1, 'PRICE': Decimal('1.5'), 'ATTRIBUTES': {u'size': 3}}]
+
+        a registry of column converters, keyed by column name (without
+        regard to case) or by the driver's type code in 
+        cursor.description (a cx_Oracle type, a MySQLdb FIELD_TYPE or set
+        like MySQLdb.NUMBER; SQLite reports no types).  a column takes 
+        its name's converter, else the first registered type that 
+        compares equal to its type code.  NULLs are never converted.
+        compile() turns a description into one generated function that
+        unpacks a row, converts just the registered columns and builds 
+        the tuple, dict or Record in a single expression, so a result 
+        pays one Python call per row whatever the number of conversions.
+        functions are cached per description, and results where no 
+        column has a converter are left to the driver untouched.  one
+        Converters can be shared by any number of cursors.
+    """
+    def __init__(self):
+        self._names = {}
+        self._types = []
+        self._lock = threading.Lock()
+        self._compiled = {}
+
+
+    def register(self, converter, name=None, type=None):
+        if (name is None) == (type is None):
+            raise ValueError, 'need one of name or type'
+
+        self._lock.acquire()
+        try:
+            if name is not None:
+                self._names[name.lower()] = converter
+            else:
+                self._types = [ (t, c) for t, c in self._types if t != type ]
+                self._types.append( (type, converter) )
+            self._compiled.clear()
+        finally:
+            self._lock.release()
+
+
+    def unregister(self, name=None, type=None):
+        self._lock.acquire()
+        try:
+            if name is not None:
+                self._names.pop(name.lower(), None)
+            if type is not None:
+                self._types = [ (t, c) for t, c in self._types if t != type ]
+            self._compiled.clear()
+        finally:
+            self._lock.release()
+
+
+    def converter(self, name, type_code=None):
+        """the converter of a column, or None"""
+        converter = self._names.get(name.lower())
+        if converter is not None:
+            return converter
+        if type_code is not None:
+            for t, c in self._types:
+                if t == type_code:
+                    return c
+        return None
+
+
+    def compile(self, description, row_type=types.TupleType, keyed=False):
+        """the row transform for a result, or None when no column has a 
+        converter. keyed is for drivers returning dicts (MySQLdb's 
+        DictCursor), columns are then read by name"""
+        shape = _shape(row_type)
+        columns = tuple([ (d[0], d[1]) for d in description ])
+        key = (columns, shape, keyed)
+        try:
+            return self._compiled[key]
+        except KeyError:
+            pass
+        except TypeError:
+            key = None
+
+        transform = self._compile(columns, shape, keyed)
+        if key is not None:
+            self._lock.acquire()
+            try:
+                self._compiled[key] = transform
+            finally:
+                self._lock.release()
+        return transform
+
+
+    def _compile(self, columns, shape, keyed):
+        names = [ name for name, type_code in columns ]
+        converters = [ self.converter(name, type_code) 
+                        for name, type_code in columns ]
+        if not [ c for c in converters if c is not None ]:
+            return None
+
+        namespace = {}
+        lines = ['def transform(row):']
+        if keyed:
+            for i, name in enumerate(names):
+                lines.append('    v%d = row[%r]' % (i, name))
+        else:
+            lines.append('    %s, = row' % ', '.join([ 'v%d' % i 
+                                            for i in range(len(names)) ]))
+
+        values = []
+        for i, converter in enumerate(converters):
+            if converter is None:
+                values.append('v%d' % i)
+            else:
+                namespace['c%d' % i] = converter
+                values.append('v%d if v%d is None else c%d(v%d)' % (i, i, 
+                                                                    i, i))
+
+        if shape is types.DictType:
+            lines.append('    return {%s}' % ', '.join([ '%r: %s' % (name, 
+                                    value) for name, value in zip(names, 
+                                    values) ]))
+        elif shape is Record:
+            namespace['record'] = recordClass(names)
+            lines.append('    return record((%s,))' % ', '.join(values))
+        else:
+            lines.append('    return (%s,)' % ', '.join(values))
+
+        exec '\n'.join(lines) in namespace
+        return namespace['transform']
+
+
+# END: Converters
@@ -26,8 +26,20 @@
 #
 #####
 
+import time
 import types
+from itertools import islice
 from y47.db import InvalidRowType
+from y47.db import instrument
+from y47.db import load
+from y47.db import pragma
+from y47.db.column import columnar
+from y47.db.connection import executed
+from y47.db.export import WRITERS, export
+from y47.db.fetch import FetchTuning
+from y47.db.driver import driver
+from y47.db.row import LazyRows, Record, recordFactory
+from y47.db.statement import StatementCache
 
 
 def _dictionaryFactory(c):
@@ -37,10 +49,291 @@ def _dictionaryFactory(c):
 
     return None
 
+
+def _lazyDictionaryFactory(c, done=None, convert=None):
+    if c:
+        if not c.description:
+            return []
+        return LazyRows(c, done=done, convert=convert)
+
+    return None
+
+
+def _convertedRows(c, transform):
+    """fetches arraysize rows at a time, converting each batch before the
+    next fetch: a cx_Oracle LOB can only be read until then"""
+    rows = []
+    while True:
+        batch = c.fetchmany(c.arraysize)
+        if not batch:
+            break
+        rows.extend( map(transform, batch) )
+    return rows
+
+
+def _recordFactory(c):
+    if c:
+        if not c.description:
+            return []
+
+        record = recordFactory(c.description)
+        return [ record(row) for row in c ]
+
+    return None
+
+
+def _rowIterator(c, batch_size, convert=None):
+    """yields rows from a driver cursor batch_size rows at a time, so only
+    one batch is ever held in memory. closes the cursor when exhausted."""
+    try:
+        while True:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                break
+
+            if convert is None:
+                for row in rows:
+                    yield row
+            else:
+                for row in rows:
+                    yield convert(row)
+    finally:
+        c.close()
+
+
+def _chunks(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list( islice(rows, chunk_size) )
+        if not chunk:
+            break
+        yield chunk
+
+# ============================================================================
+
+class BulkResult(object):
+    """returned by execute_many(), i.e.
+        result = cursor.execute_many(sql, rows)
+        print result.rows, result.chunks, result.rows_per_second
+    """
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+        self.elapsed = 0.0
+
+    def _getRowsPerSecond(self):
+        if not self.elapsed:
+            return 0.0
+        return self.rows / self.elapsed
+
+    rows_per_second = property(_getRowsPerSecond, None, None, 
+                        'rows_per_second property')
+
+    def __repr__(self):
+        return '<BulkResult rows=%d chunks=%d elapsed=%.3fs %.0f rows/s>' % (
+                self.rows, self.chunks, self.elapsed, self.rows_per_second)
+
+
 # ============================================================================
 
 class Cursor(object):
+    def __init__(self, statement_cache=0, converters=None):
+        self._statements = None
+        if statement_cache:
+            self._statements = StatementCache(statement_cache)
+        self._converters = converters
+
+        self._instruments = []
+        self._hooks = None
+        self._started = self._sent = 0.0
+
     def _execute(self, sql, args): raise NotImplementedError
+    def _iterate(self, sql, args, batch_size): raise NotImplementedError
+
+    # transaction control for _executeMany, per driver
+    def _begin(self, cursor): raise NotImplementedError
+    def _commit(self, cursor): raise NotImplementedError
+    def _rollback(self, cursor): raise NotImplementedError
+
+    # bind placeholders for _importFile, per driver
+    def _placeholders(self, count): raise NotImplementedError
+
+
+    def _executeMany(self, sql, rows, chunk_size=1000):
+        """sends rows (any iterable) through the driver's executemany 
+        chunk_size rows at a time, each chunk in its own transaction. a 
+        failing chunk is rolled back, earlier chunks stay committed."""
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        result = BulkResult()
+        cursor = self._connection.cursor()
+        start = time.time()
+        try:
+            for chunk in _chunks(rows, chunk_size):
+                self._begin(cursor)
+                try:
+                    cursor.executemany(sql, chunk)
+                    self._commit(cursor)
+                except:
+                    self._rollback(cursor)
+                    raise
+
+                result.rows += len(chunk)
+                result.chunks += 1
+        finally:
+            result.elapsed = time.time() - start
+            cursor.close()
+
+        return result
+
+
+    # instrumentation, see y47.db.instrument. instruments added here see
+    # this cursor only, instrument.install() adds one for every cursor
+    def addInstrument(self, hook):
+        self._instruments.append(hook)
+
+    def removeInstrument(self, hook):
+        self._instruments.remove(hook)
+
+
+    def _send(self, cursor, sql, args):
+        self._hooks = None
+        if self._instruments or instrument._installed:
+            self._hooks = self._instruments + instrument._installed
+
+        if self._hooks:
+            for hook in self._hooks:
+                hook.before(self, sql, args)
+            self._started = time.time()
+
+        if args:
+            cursor.execute(sql, args)
+        else:
+            cursor.execute(sql)
+
+        if self._hooks:
+            self._sent = time.time()
+
+
+    def _received(self, sql, args, rows):
+        # counts towards an open group commit transaction, see Transaction
+        executed(self._connection)
+
+        if not self._hooks:
+            return rows
+
+        hooks, sent = self._hooks, self._sent
+        execute_time = sent - self._started
+
+        def report(rows):
+            fetch_time = time.time() - sent
+            count = rows and len(rows) or 0
+            size = instrument.estimateSize(rows)
+            for hook in hooks:
+                hook.after(self, sql, args, execute_time, fetch_time, count,
+                            size)
+
+        # counting a lazy result would fetch all of it, it is reported once
+        # the caller has, with the fetch time up to then
+        if isinstance(rows, LazyRows):
+            rows.add_done_callback(report)
+        else:
+            report(rows)
+        return rows
+
+
+    # column converters, see y47.db.convert.Converters
+    def _getConverters(self):
+        return self._converters
+
+    def _setConverters(self, converters=None):
+        self._converters = converters
+
+    converters = property(_getConverters, _setConverters, None, 
+                        'converters property')
+
+
+    def _transform(self, c, row_type, keyed=False):
+        """the compiled row transform for an executed driver cursor, or 
+        None"""
+        if self._converters is None or not c.description:
+            return None
+        return self._converters.compile(c.description, row_type, keyed)
+
+
+    # streaming reads (columns, export) on plain tuples from the driver
+    def _streamCursor(self, batch_size):
+        """a driver cursor returning plain tuples, for streaming reads"""
+        return self._connection.cursor()
+
+
+    def _stream(self, sql, args, batch_size):
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        cursor = self._streamCursor(batch_size)
+        if args:
+            cursor.execute(sql, args)
+        else:
+            cursor.execute(sql)
+
+        return cursor
+
+
+    def columns(self, sql, args=None, batch_size=1000, numpy=True):
+        """returns {column name: array.array, NumPy array or list}, see 
+        y47.db.column.columnar"""
+        return columnar(self._stream(sql, args, batch_size), batch_size, numpy)
+
+
+    def export(self, sql, args=None, path=None, format='csv', 
+                batch_size=1000, buffer_size=1 << 20, encoding='utf-8'):
+        """streams the result to a file, see y47.db.export.export"""
+        if not path:
+            raise ValueError, 'path not set'
+        if format not in WRITERS:
+            raise ValueError, 'format not in %s' % sorted(WRITERS.keys())
+
+        return export(self._stream(sql, args, batch_size), path, format, 
+                        batch_size, buffer_size, encoding)
+
+
+    # bulk load from a csv file, see y47.db.load
+    def _importFile(self, table, path, columns=None, batch_size=1000,
+                    header=True):
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        names = load.columnNames(path, columns, header)
+        sql = load.insertStatement(table, names, 
+                                    self._placeholders(len(names)))
+        return self._executeMany(sql, load.readCSV(path, header), batch_size)
+
+
+    # statement cache, statement_cache=N keeps the driver cursors of the N
+    # most recently used statements
+    def _getStatements(self):
+        return self._statements
+
+    statements = property(_getStatements, None, None, 
+                        'statement cache (None when disabled)')
+
+
+    def _clearStatements(self):
+        if self._statements is not None:
+            self._statements.clear()
+
+
+    def _newCursor(self, sql):
+        return self._connection.cursor()
+
+
+    def _prepare(self, sql):
+        if self._statements is None:
+            return self._newCursor(sql)
+
+        return self._statements.get(sql, self._newCursor)
 
 
 # ============================================================================
@@ -73,13 +366,44 @@ class SQLiteCursor(Cursor):
         results = cursor.execute("SELECT * FROM test WHERE name=?", ('Glenn',))
         for result in results:
 	        print result['name']
+
+
+        streaming example, rows are fetched batch_size at a time instead of
+        all at once
+
+        for row in cursor.iterate("SELECT * FROM test", batch_size=500):
+            print row['name']
+
+
+        bulk insert example, rows can be any iterable or generator
+
+        rows = ( (i, 'name%d' % i) for i in xrange(1000000) )
+        result = cursor.execute_many("INSERT INTO test VALUES (?, ?)", rows,
+                                        chunk_size=10000)
+        print result.rows_per_second
+
+
+        csv import example, the header row names the columns
+
+        result = cursor.import_file('test', 'test.csv', batch_size=10000)
+        print result
+        <BulkResult rows=1000000 chunks=100 elapsed=2.412s 414594 rows/s>
+
+
+        column converter example, see y47.db.convert.Converters
+
+        from y47.db.convert import Converters, toDatetime
+        converters = Converters()
+        converters.register(toDatetime, name='created')
+        cursor = SQLiteCursor(connection=connection, converters=converters)
     """
-    def __init__(self, connection=None, row_type=types.TupleType): 
-        Cursor.__init__(self)
+    def __init__(self, connection=None, row_type=types.TupleType,
+                statement_cache=0, converters=None): 
+        Cursor.__init__(self, statement_cache, converters)
         self._connection = connection
         self._row_type = row_type
         self._row_types = [types.DictType, types.DictionaryType, 
-                            types.TupleType]
+                            types.TupleType, Record]
 
         self._cursor = None
 
@@ -88,6 +412,7 @@ class SQLiteCursor(Cursor):
         return self._connection
 
     def _setConnection(self, connection):
+        self._clearStatements()
         self._connection = connection
 
     connection = property(_getConnection, _setConnection, None, 
@@ -98,42 +423,120 @@ class SQLiteCursor(Cursor):
         return self._row_type
 
     def _setRowType(self, row_type=types.TupleType):
+        self._clearStatements()
         self._row_type = row_type
 
     row_type = property(_getRowType, _setRowType, None, 'row_type property')
 
 
+    # the row factory is set on the driver cursor, not the connection, so
+    # other cursors sharing the connection keep sqlite's native tuples
+    def _newCursor(self, sql):
+        cursor = self._connection.cursor()
+        if self._getRowType() in [types.DictType, types.DictionaryType]:
+            cursor.row_factory = driver('sqlite').Row
+        else:
+            cursor.row_factory = None
+        return cursor
+
+
+    def _streamCursor(self, batch_size):
+        cursor = self._connection.cursor()
+        cursor.row_factory = None
+        return cursor
+
+
     def _execute(self, sql, args=None):
         if not self._getConnection():
             raise ValueError, 'connection not set'
 
-        # setup the cursor
-        if self._getRowType() in [types.DictType, types.DictionaryType]:
-            try:
-                import sqlite
-            except ImportError:
-                try:
-                    import sqlite3 as sqlite
-                except ImportError:
-                    print 'Cannot find SQLite module'
+        self._cursor = self._prepare(sql)
 
-            self._connection.row_factory = sqlite.Row
+        self._send(self._cursor, sql, args)
 
+        transform = self._transform(self._cursor, self._getRowType())
+        if transform is not None:
+            return self._received(sql, args, 
+                                map(transform, self._cursor.fetchall()))
 
-        self._cursor = self._connection.cursor()
+        if self._getRowType() is Record:
+            return self._received(sql, args, _recordFactory(self._cursor))
+
+        return self._received(sql, args, self._cursor.fetchall())
+
+
+    def _iterate(self, sql, args=None, batch_size=1000):
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        cursor = self._newCursor(sql)
 
         if args:
-            self._cursor.execute(sql, args)
+            cursor.execute(sql, args)
         else:
-            self._cursor.execute(sql)
+            cursor.execute(sql)
+
+        transform = self._transform(cursor, self._getRowType())
+        if transform is not None:
+            return _rowIterator(cursor, batch_size, transform)
+
+        if self._getRowType() is Record:
+            return _rowIterator(cursor, batch_size, 
+                                recordFactory(cursor.description))
 
-        return self._cursor.fetchall()
+        return _rowIterator(cursor, batch_size)
 
 
     def execute(self, sql, args=None):
         return self._execute(sql, args)
 
 
+    def iterate(self, sql, args=None, batch_size=1000):
+        return self._iterate(sql, args, batch_size)
+
+
+    # with isolation_level None (autocommit) sqlite would commit every row
+    def _begin(self, cursor):
+        if self._connection.isolation_level is None:
+            cursor.execute('BEGIN')
+
+    def _commit(self, cursor):
+        if self._connection.isolation_level is None:
+            cursor.execute('COMMIT')
+        else:
+            self._connection.commit()
+
+    def _rollback(self, cursor):
+        if self._connection.isolation_level is None:
+            cursor.execute('ROLLBACK')
+        else:
+            self._connection.rollback()
+
+
+    def execute_many(self, sql, rows, chunk_size=1000):
+        return self._executeMany(sql, rows, chunk_size)
+
+
+    def _placeholders(self, count):
+        return ['?'] * count
+
+
+    def import_file(self, table, path, columns=None, batch_size=1000,
+                    header=True):
+        """loads a csv file into table, batch_size rows per executemany
+        and transaction, with the pragma.BULK_LOAD pragmas (journal_mode,
+        synchronous) set until it is done. columns default to the header
+        row. returns a BulkResult"""
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        saved = pragma.setPragmas(self._connection, pragma.BULK_LOAD)
+        try:
+            return self._importFile(table, path, columns, batch_size, header)
+        finally:
+            pragma.setPragmas(self._connection, saved)
+
+
 # END: SQLiteCursor
 # ============================================================================
 
@@ -150,8 +553,8 @@ class SQLiteDictionaryCursor(Cursor):
         for result in results:
 	        print result['name']
     """
-    def __init__(self, connection=None): 
-        Cursor.__init__(self)
+    def __init__(self, connection=None, statement_cache=0, converters=None): 
+        Cursor.__init__(self, statement_cache, converters)
         self._connection = connection
         self._row_type = types.DictionaryType
         self._row_types = [types.DictType, types.DictionaryType]
@@ -163,12 +566,25 @@ class SQLiteDictionaryCursor(Cursor):
         return self._connection
 
     def _setConnection(self, connection):
+        self._clearStatements()
         self._connection = connection
 
     connection = property(_getConnection, _setConnection, None, 
                         'connection property')
 
 
+    def _newCursor(self, sql):
+        cursor = self._connection.cursor()
+        cursor.row_factory = driver('sqlite').Row
+        return cursor
+
+
+    def _streamCursor(self, batch_size):
+        cursor = self._connection.cursor()
+        cursor.row_factory = None
+        return cursor
+
+
     def _execute(self, sql, args=None):
         if not self._getConnection():
             raise ValueError, 'connection not set'
@@ -178,29 +594,44 @@ class SQLiteDictionaryCursor(Cursor):
             raise InvalidRowType(self._row_type, self._row_types, 
                                 'Invalid Rowtype')
             
-        try:
-            import sqlite
-        except ImportError:
-            try:
-                import sqlite3 as sqlite
-            except ImportError:
-                print 'Cannot find SQLite module'
+        self._cursor = self._prepare(sql)
+
+        self._send(self._cursor, sql, args)
+
+        rows = self._cursor.fetchall()
+        transform = self._transform(self._cursor, self._row_type)
+        if transform is not None:
+            rows = map(transform, rows)
+        return self._received(sql, args, rows)
+
+
+    def _iterate(self, sql, args=None, batch_size=1000):
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        if self._row_type not in self._row_types:
+            raise InvalidRowType(self._row_type, self._row_types, 
+                                'Invalid Rowtype')
 
-        self._connection.row_factory = sqlite.Row
-        self._cursor = self._connection.cursor()
+        cursor = self._newCursor(sql)
 
         if args:
-            self._cursor.execute(sql, args)
+            cursor.execute(sql, args)
         else:
-            self._cursor.execute(sql)
+            cursor.execute(sql)
 
-        return self._cursor.fetchall()
+        return _rowIterator(cursor, batch_size, 
+                            self._transform(cursor, self._row_type))
 
 
     def execute(self, sql, args=None):
         return self._execute(sql, args)
 
 
+    def iterate(self, sql, args=None, batch_size=1000):
+        return self._iterate(sql, args, batch_size)
+
+
 # END: SQLiteDictionaryCursor
 # ============================================================================
 
@@ -225,13 +656,19 @@ class MySQLCursor(Cursor):
         cursor = MySQLCursor(connection=connection, row_type=types.DictionaryType)
         cursor.execute("SELECT * FROM test")
         ({'id': 1L, 'name': 'Glenn'},)
+
+        streaming example, uses a server side cursor (SSCursor/SSDictCursor)
+
+        for row in cursor.iterate("SELECT * FROM test", batch_size=500):
+            print row['name']
     """
-    def __init__(self, connection=None, row_type=types.TupleType):
-        Cursor.__init__(self)
+    def __init__(self, connection=None, row_type=types.TupleType,
+                statement_cache=0, converters=None):
+        Cursor.__init__(self, statement_cache, converters)
         self._connection = connection
         self._row_type = row_type
         self._row_types = [types.DictType, types.DictionaryType, 
-                            types.TupleType]
+                            types.TupleType, Record]
 
         self._cursor = None
 
@@ -239,6 +676,7 @@ class MySQLCursor(Cursor):
         return self._connection
 
     def _setConnection(self, connection):
+        self._clearStatements()
         self._connection = connection
 
     connection = property(_getConnection, _setConnection, None, 
@@ -248,39 +686,142 @@ class MySQLCursor(Cursor):
         return self._row_type
 
     def _setRowType(self, row_type=types.TupleType):
+        self._clearStatements()
         self._row_type = row_type
 
     row_type = property(_getRowType, _setRowType, None, 'row_type property')
 
 
+    # MySQLdb has no server side prepared statements, the statement cache
+    # only saves creating the cursor
+    def _newCursor(self, sql):
+        if self._getRowType() in [types.DictType, types.DictionaryType]:
+            return self._connection.cursor(driver('mysql.cursors').DictCursor)
+        return self._connection.cursor()
+
+
+    def _streamCursor(self, batch_size):
+        return self._connection.cursor(driver('mysql.cursors').SSCursor)
+
+
     def _execute(self, sql, args=None):
         if not self._getConnection():
             raise ValueError, 'connection not set'
 
 
+        self._cursor = self._prepare(sql)
+        
+
+        self._send(self._cursor, sql, args)
+
+        transform = self._transform(self._cursor, self._getRowType(), 
+                    self._getRowType() in [types.DictType, types.DictionaryType])
+        if transform is not None:
+            return self._received(sql, args, 
+                                map(transform, self._cursor.fetchall()))
+
+        if self._getRowType() is Record:
+            return self._received(sql, args, _recordFactory(self._cursor))
+
+        return self._received(sql, args, self._cursor.fetchall())
+
+
+    def _iterate(self, sql, args=None, batch_size=1000):
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        # unbuffered, server side cursors so rows stay on the server
+        # until fetched
+        cursors = driver('mysql.cursors')
         if self._getRowType() in [types.DictType, types.DictionaryType]:
-            try:
-                import MySQLdb.cursors
-                self._cursor = \
-                        self._connection.cursor(MySQLdb.cursors.DictCursor)
-            except ImportError:
-                print 'could not find MySQLdb cursors'
+            cursor = self._connection.cursor(cursors.SSDictCursor)
         else:
-            self._cursor = self._connection.cursor()
-        
+            cursor = self._connection.cursor(cursors.SSCursor)
 
         if args:
-            self._cursor.execute(sql, args)
+            cursor.execute(sql, args)
         else:
-            self._cursor.execute(sql)
+            cursor.execute(sql)
+
+        transform = self._transform(cursor, self._getRowType(), 
+                    self._getRowType() in [types.DictType, types.DictionaryType])
+        if transform is not None:
+            return _rowIterator(cursor, batch_size, transform)
+
+        if self._getRowType() is Record:
+            return _rowIterator(cursor, batch_size, 
+                                recordFactory(cursor.description))
 
-        return self._cursor.fetchall()
+        return _rowIterator(cursor, batch_size)
 
 
     def execute(self, sql, args=None):
         return self._execute(sql, args)
 
 
+    def iterate(self, sql, args=None, batch_size=1000):
+        return self._iterate(sql, args, batch_size)
+
+
+    def _begin(self, cursor):
+        cursor.execute('START TRANSACTION')
+
+    def _commit(self, cursor):
+        self._connection.commit()
+
+    def _rollback(self, cursor):
+        self._connection.rollback()
+
+
+    def execute_many(self, sql, rows, chunk_size=1000):
+        return self._executeMany(sql, rows, chunk_size)
+
+
+    def _placeholders(self, count):
+        return ['%s'] * count
+
+
+    def import_file(self, table, path, columns=None, batch_size=1000,
+                    header=True, local_infile=True):
+        """loads a csv file into table with LOAD DATA LOCAL INFILE, the 
+        server parses the file in one statement (the connection needs 
+        local_infile set, see MySQLConnection). empty fields load as the
+        column's empty value, not NULL. with local_infile=False the rows 
+        go through executemany, batch_size rows per transaction. columns 
+        default to the header row. returns a BulkResult"""
+        if not local_infile:
+            return self._importFile(table, path, columns, batch_size, header)
+
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        names = load.columnNames(path, columns, header)
+        sql = ("LOAD DATA LOCAL INFILE %%s INTO TABLE %s "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                "ESCAPED BY '' LINES TERMINATED BY %%s IGNORE %d LINES (%s)" %
+                (table, header and 1 or 0, ', '.join(names)))
+
+        result = BulkResult()
+        cursor = self._connection.cursor()
+        start = time.time()
+        try:
+            self._begin(cursor)
+            try:
+                cursor.execute(sql, (path, load.lineTerminator(path)))
+                self._commit(cursor)
+            except:
+                self._rollback(cursor)
+                raise
+
+            result.rows = cursor.rowcount
+            result.chunks = 1
+        finally:
+            result.elapsed = time.time() - start
+            cursor.close()
+
+        return result
+
+
 # END: MySQLCursor
 # ============================================================================
 
@@ -296,8 +837,8 @@ class MySQLDictionaryCursor(Cursor):
         cursor.execute("SELECT * FROM test")
         ({'id': 1L, 'name': 'Glenn'},)
     """
-    def __init__(self, connection=None): 
-        Cursor.__init__(self)
+    def __init__(self, connection=None, statement_cache=0, converters=None): 
+        Cursor.__init__(self, statement_cache, converters)
         self._connection = connection
         self._row_type = types.DictionaryType
         self._row_types = [types.DictType, types.DictionaryType]
@@ -309,12 +850,21 @@ class MySQLDictionaryCursor(Cursor):
         return self._connection
 
     def _setConnection(self, connection):
+        self._clearStatements()
         self._connection = connection
 
     connection = property(_getConnection, _setConnection, None, 
                         'connection property')
 
 
+    def _newCursor(self, sql):
+        return self._connection.cursor(driver('mysql.cursors').DictCursor)
+
+
+    def _streamCursor(self, batch_size):
+        return self._connection.cursor(driver('mysql.cursors').SSCursor)
+
+
     def _execute(self, sql, args=None):
         if not self._getConnection():
             raise ValueError, 'connection not set'
@@ -324,25 +874,45 @@ class MySQLDictionaryCursor(Cursor):
             raise InvalidRowType(self._row_type, self._row_types, 
                                 'Invalid Rowtype')
             
-        try:
-            import MySQLdb.cursors
-            self._cursor = \
-                    self._connection.cursor(MySQLdb.cursors.DictCursor)
-        except ImportError:
-            print 'could not find MySQLdb cursors'
+        self._cursor = self._prepare(sql)
+
+        self._send(self._cursor, sql, args)
+
+        rows = self._cursor.fetchall()
+        transform = self._transform(self._cursor, self._row_type, True)
+        if transform is not None:
+            rows = map(transform, rows)
+        return self._received(sql, args, rows)
+
+
+    def _iterate(self, sql, args=None, batch_size=1000):
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        if self._row_type not in self._row_types:
+            raise InvalidRowType(self._row_type, self._row_types, 
+                                'Invalid Rowtype')
+
+        cursors = driver('mysql.cursors')
+        cursor = self._connection.cursor(cursors.SSDictCursor)
 
         if args:
-            self._cursor.execute(sql, args)
+            cursor.execute(sql, args)
         else:
-            self._cursor.execute(sql)
+            cursor.execute(sql)
 
-        return self._cursor.fetchall()
+        return _rowIterator(cursor, batch_size, 
+                            self._transform(cursor, self._row_type, True))
 
 
     def execute(self, sql, args=None):
         return self._execute(sql, args)
 
 
+    def iterate(self, sql, args=None, batch_size=1000):
+        return self._iterate(sql, args, batch_size)
+
+
 # END: MySQLDictionaryCursor
 # ============================================================================
 
@@ -378,20 +948,51 @@ class OracleCursor(Cursor):
 	        print result['NAME']
 	
         Glenn
+
+        streaming example, arraysize is set to batch_size
+
+        for row in cursor.iterate("SELECT * FROM TEST", batch_size=500):
+            print row['NAME']
+
+        fetch size example, see y47.db.fetch.FetchTuning
+
+        cursor = OracleCursor(connection=connection, arraysize=1000)
+        rows = cursor.execute("SELECT * FROM BIG", prefetchrows=1001)
+        print cursor.stats()['round_trips']
+
+        lazy DictionaryType rows, see y47.db.row.LazyRows
+
+        cursor = OracleCursor(connection=connection, 
+                                row_type=types.DictionaryType, lazy=True)
+        rows = cursor.execute("SELECT * FROM BIG")
+        print rows[0]['NAME']
+
+        column converter example, see y47.db.convert.Converters
+
+        from y47.db.convert import Converters, readLOB
+        converters = Converters()
+        converters.register(readLOB, type=cx_Oracle.CLOB)
+        cursor = OracleCursor(connection=connection, converters=converters)
     """
-    def __init__(self, connection=None, row_type=types.TupleType):
-        Cursor.__init__(self)
+    def __init__(self, connection=None, row_type=types.TupleType,
+                statement_cache=0, arraysize=None, prefetchrows=None,
+                adaptive=False, lazy=False, converters=None):
+        Cursor.__init__(self, statement_cache, converters)
         self._connection = connection
         self._row_type = row_type
         self._row_types = [types.DictType, types.DictionaryType, 
-                            types.TupleType]
+                            types.TupleType, Record]
+        self._fetch = FetchTuning(arraysize, prefetchrows, adaptive)
+        self._lazy = lazy
 
         self._cursor = None
+        self._rows = None
 
     def _getConnection(self):
         return self._connection
 
     def _setConnection(self, connection):
+        self._clearStatements()
         self._connection = connection
 
     connection = property(_getConnection, _setConnection, None, 
@@ -401,32 +1002,180 @@ class OracleCursor(Cursor):
         return self._row_type
 
     def _setRowType(self, row_type=types.TupleType):
+        self._clearStatements()
         self._row_type = row_type
 
     row_type = property(_getRowType, _setRowType, None, 'row_type property')
 
 
-    def _execute(self, sql, args=None):
+    # fetch sizes, see y47.db.fetch.FetchTuning
+    def _getArraysize(self):
+        return self._fetch.arraysize
+
+    def _setArraysize(self, arraysize=None):
+        self._fetch.arraysize = arraysize
+
+    arraysize = property(_getArraysize, _setArraysize, None, 
+                        'arraysize property')
+
+
+    def _getPrefetchrows(self):
+        return self._fetch.prefetchrows
+
+    def _setPrefetchrows(self, prefetchrows=None):
+        self._fetch.prefetchrows = prefetchrows
+
+    prefetchrows = property(_getPrefetchrows, _setPrefetchrows, None, 
+                        'prefetchrows property')
+
+
+    def _getAdaptive(self):
+        return self._fetch.adaptive
+
+    def _setAdaptive(self, adaptive=False):
+        self._fetch.adaptive = adaptive
+
+    adaptive = property(_getAdaptive, _setAdaptive, None, 
+                        'adaptive property')
+
+
+    def _getLazy(self):
+        return self._lazy
+
+    def _setLazy(self, lazy=False):
+        self._lazy = lazy
+
+    lazy = property(_getLazy, _setLazy, None, 'lazy property')
+
+
+    def stats(self):
+        """queries, rows, estimated round trips and bytes fetched by 
+        execute(), with the last arraysize and prefetchrows used"""
+        return self._fetch.stats()
+
+
+    # a cached cursor is prepared once, cx_Oracle skips the parse when the
+    # same statement is executed again on it
+    def _newCursor(self, sql):
+        cursor = self._connection.cursor()
+        if self._statements is not None:
+            cursor.prepare(sql)
+        return cursor
+
+
+    def _streamCursor(self, batch_size):
+        cursor = self._connection.cursor()
+        cursor.arraysize = batch_size
+        return cursor
+
+
+    def _execute(self, sql, args=None, arraysize=None, prefetchrows=None):
         if not self._getConnection():
             raise ValueError, 'connection not set'
 
 
-        self._cursor = self._connection.cursor()
+        self._cursor = self._prepare(sql)
+        self._drainRows()
+        self._fetch.apply(self._cursor, 
+                        *self._fetch.sizes(sql, arraysize, prefetchrows))
+
+        self._send(self._cursor, sql, args)
+
+        if self._lazy and self._getRowType() in [types.DictType, 
+                                                    types.DictionaryType]:
+            return self._received(sql, args, self._lazyRows(sql))
+
+        transform = self._transform(self._cursor, self._getRowType())
+        if transform is not None:
+            rows = _convertedRows(self._cursor, transform)
+        elif self._getRowType() in [types.DictType, types.DictionaryType]:
+            rows = _dictionaryFactory(self._cursor)
+        elif self._getRowType() is Record:
+            rows = _recordFactory(self._cursor)
+        else:
+            rows = self._cursor.fetchall()
+
+        self._fetch.observe(sql, self._cursor, rows)
+        return self._received(sql, args, rows)
+
+
+    # a lazy result reads from the driver cursor until it is exhausted, so
+    # the rest of it is fetched before a cached cursor is executed again
+    def _lazyRows(self, sql):
+        cursor = self._cursor
+        self._rows = _lazyDictionaryFactory(cursor, 
+                    lambda rows: self._fetch.observe(sql, cursor, rows),
+                    self._transform(cursor, types.TupleType))
+        return self._rows
+
+
+    def _drainRows(self):
+        if isinstance(self._rows, LazyRows) and \
+                self._rows._cursor is self._cursor:
+            self._rows._drain()
+        self._rows = None
+
+
+    def _iterate(self, sql, args=None, batch_size=1000):
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        cursor = self._connection.cursor()
+        cursor.arraysize = batch_size
 
         if args:
-            self._cursor.execute(sql, args)
+            cursor.execute(sql, args)
         else:
-            self._cursor.execute(sql)
+            cursor.execute(sql)
+
+        transform = self._transform(cursor, self._getRowType())
+        if transform is not None:
+            return _rowIterator(cursor, batch_size, transform)
 
         if self._getRowType() in [types.DictType, types.DictionaryType]:
-            return _dictionaryFactory(self._cursor)
+            keys = [ d[0] for d in cursor.description ]
+            return _rowIterator(cursor, batch_size, 
+                                lambda row: dict( zip(keys, row) ))
+        elif self._getRowType() is Record:
+            return _rowIterator(cursor, batch_size, 
+                                recordFactory(cursor.description))
         else:
-            return self._cursor.fetchall()
+            return _rowIterator(cursor, batch_size)
 
 
+    def execute(self, sql, args=None, arraysize=None, prefetchrows=None):
+        return self._execute(sql, args, arraysize, prefetchrows)
 
-    def execute(self, sql, args=None):
-        return self._execute(sql, args)
+
+    def iterate(self, sql, args=None, batch_size=1000):
+        return self._iterate(sql, args, batch_size)
+
+
+    # executemany is a single array bind, one round trip per chunk
+    def _begin(self, cursor):
+        pass
+
+    def _commit(self, cursor):
+        self._connection.commit()
+
+    def _rollback(self, cursor):
+        self._connection.rollback()
+
+
+    def execute_many(self, sql, rows, chunk_size=1000):
+        return self._executeMany(sql, rows, chunk_size)
+
+
+    def _placeholders(self, count):
+        return [ ':%d' % (i + 1) for i in range(count) ]
+
+
+    def import_file(self, table, path, columns=None, batch_size=1000,
+                    header=True):
+        """loads a csv file into table, batch_size rows per array bind 
+        and commit. columns default to the header row. returns a 
+        BulkResult"""
+        return self._importFile(table, path, columns, batch_size, header)
 
 
 # END: OracleCursor
@@ -445,27 +1194,96 @@ class OracleDictionaryCursor(Cursor):
         cursor.execute("SELECT * FROM TEST")
         
         [{'NAME': 'Glenn'}]
+
+        with lazy=True execute() returns a y47.db.row.LazyRows
     """
-    def __init__(self, connection=None): 
-        Cursor.__init__(self)
+    def __init__(self, connection=None, statement_cache=0, arraysize=None,
+                prefetchrows=None, adaptive=False, lazy=False, 
+                converters=None): 
+        Cursor.__init__(self, statement_cache, converters)
         self._connection = connection
         self._row_type = types.DictionaryType
         self._row_types = [types.DictType, types.DictionaryType]
+        self._fetch = FetchTuning(arraysize, prefetchrows, adaptive)
+        self._lazy = lazy
 
         self._cursor = None
+        self._rows = None
 
 
     def _getConnection(self):
         return self._connection
 
     def _setConnection(self, connection):
+        self._clearStatements()
         self._connection = connection
 
     connection = property(_getConnection, _setConnection, None, 
                         'connection property')
 
 
-    def _execute(self, sql, args=None):
+    # fetch sizes, see y47.db.fetch.FetchTuning
+    def _getArraysize(self):
+        return self._fetch.arraysize
+
+    def _setArraysize(self, arraysize=None):
+        self._fetch.arraysize = arraysize
+
+    arraysize = property(_getArraysize, _setArraysize, None, 
+                        'arraysize property')
+
+
+    def _getPrefetchrows(self):
+        return self._fetch.prefetchrows
+
+    def _setPrefetchrows(self, prefetchrows=None):
+        self._fetch.prefetchrows = prefetchrows
+
+    prefetchrows = property(_getPrefetchrows, _setPrefetchrows, None, 
+                        'prefetchrows property')
+
+
+    def _getAdaptive(self):
+        return self._fetch.adaptive
+
+    def _setAdaptive(self, adaptive=False):
+        self._fetch.adaptive = adaptive
+
+    adaptive = property(_getAdaptive, _setAdaptive, None, 
+                        'adaptive property')
+
+
+    def _getLazy(self):
+        return self._lazy
+
+    def _setLazy(self, lazy=False):
+        self._lazy = lazy
+
+    lazy = property(_getLazy, _setLazy, None, 'lazy property')
+
+
+    def stats(self):
+        """queries, rows, estimated round trips and bytes fetched by 
+        execute(), with the last arraysize and prefetchrows used"""
+        return self._fetch.stats()
+
+
+    # a cached cursor is prepared once, cx_Oracle skips the parse when the
+    # same statement is executed again on it
+    def _newCursor(self, sql):
+        cursor = self._connection.cursor()
+        if self._statements is not None:
+            cursor.prepare(sql)
+        return cursor
+
+
+    def _streamCursor(self, batch_size):
+        cursor = self._connection.cursor()
+        cursor.arraysize = batch_size
+        return cursor
+
+
+    def _execute(self, sql, args=None, arraysize=None, prefetchrows=None):
         if not self._getConnection():
             raise ValueError, 'connection not set'
 
@@ -474,18 +1292,73 @@ class OracleDictionaryCursor(Cursor):
             raise InvalidRowType(self._row_type, self._row_types, 
                                 'Invalid Rowtype')
 
-        self._cursor = self._connection.cursor()
+        self._cursor = self._prepare(sql)
+        self._drainRows()
+        self._fetch.apply(self._cursor, 
+                        *self._fetch.sizes(sql, arraysize, prefetchrows))
+
+        self._send(self._cursor, sql, args)
+
+        if self._lazy:
+            return self._received(sql, args, self._lazyRows(sql))
+
+        transform = self._transform(self._cursor, self._row_type)
+        if transform is not None:
+            rows = _convertedRows(self._cursor, transform)
+        else:
+            rows = _dictionaryFactory(self._cursor)
+        self._fetch.observe(sql, self._cursor, rows)
+        return self._received(sql, args, rows)
+
+
+    # a lazy result reads from the driver cursor until it is exhausted, so
+    # the rest of it is fetched before a cached cursor is executed again
+    def _lazyRows(self, sql):
+        cursor = self._cursor
+        self._rows = _lazyDictionaryFactory(cursor, 
+                    lambda rows: self._fetch.observe(sql, cursor, rows),
+                    self._transform(cursor, types.TupleType))
+        return self._rows
+
+
+    def _drainRows(self):
+        if isinstance(self._rows, LazyRows) and \
+                self._rows._cursor is self._cursor:
+            self._rows._drain()
+        self._rows = None
+
+
+    def _iterate(self, sql, args=None, batch_size=1000):
+        if not self._getConnection():
+            raise ValueError, 'connection not set'
+
+        if self._row_type not in self._row_types:
+            raise InvalidRowType(self._row_type, self._row_types, 
+                                'Invalid Rowtype')
+
+        cursor = self._connection.cursor()
+        cursor.arraysize = batch_size
 
         if args:
-            self._cursor.execute(sql, args)
+            cursor.execute(sql, args)
         else:
-            self._cursor.execute(sql)
+            cursor.execute(sql)
 
-        return _dictionaryFactory(self._cursor)
+        transform = self._transform(cursor, self._row_type)
+        if transform is not None:
+            return _rowIterator(cursor, batch_size, transform)
 
+        keys = [ d[0] for d in cursor.description ]
+        return _rowIterator(cursor, batch_size, 
+                            lambda row: dict( zip(keys, row) ))
 
-    def execute(self, sql, args=None):
-        return self._execute(sql, args)
+
+    def execute(self, sql, args=None, arraysize=None, prefetchrows=None):
+        return self._execute(sql, args, arraysize, prefetchrows)
+
+
+    def iterate(self, sql, args=None, batch_size=1000):
+        return self._iterate(sql, args, batch_size)
 
 
 # END: OracleDictionaryCursor
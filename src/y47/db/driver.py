@@ -0,0 +1,81 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import sys
+
+
+# backend name: modules to try, in order of preference
+_backends = {
+    'sqlite': ('sqlite3', 'sqlite'),
+    'mysql': ('MySQLdb',),
+    'mysql.cursors': ('MySQLdb.cursors',),
+    'oracle': ('cx_Oracle',),
+}
+
+# backend name: module, or None once every candidate failed to import
+_drivers = {}
+
+
+def _import(name):
+    __import__(name)
+    return sys.modules[name]
+
+
+def driver(backend):
+    """example:
+        from y47.db.driver import driver
+        sqlite = driver('sqlite')
+        print sqlite
+        <module 'sqlite3' from '/usr/lib/python2.7/sqlite3/__init__.pyc'>
+
+        resolves the DB-API module for backend ('sqlite', 'mysql', 
+        'mysql.cursors' or 'oracle') the first time it is asked for and
+        returns the cached module afterwards, so backends that are never 
+        used are never imported and failed imports are not retried on
+        every query.
+    """
+    try:
+        module = _drivers[backend]
+    except KeyError:
+        if backend not in _backends:
+            raise ValueError, 'backend not in %s' % sorted(_backends.keys())
+
+        module = None
+        for name in _backends[backend]:
+            try:
+                module = _import(name)
+                break
+            except ImportError:
+                pass
+
+        _drivers[backend] = module
+
+    if module is None:
+        raise ImportError, 'Cannot find %s module (tried %s)' % (backend, 
+                                        ', '.join(_backends[backend]))
+    return module
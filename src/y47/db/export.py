@@ -0,0 +1,222 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import csv
+import json
+import struct
+import sys
+from array import array
+
+from y47.db.column import _typecode
+
+
+def _jsonDefault(value):
+    # datetimes, decimals, LOBs...
+    if hasattr(value, 'read'):
+        value = value.read()
+    return str(value)
+
+
+class Writer(object):
+    """writes batches of rows to an open file, one batch at a time. str 
+    values are text in encoding"""
+    def __init__(self, f, encoding='utf-8'):
+        self._file = f
+        self._encoding = encoding
+
+    def begin(self, names):
+        self._names = names
+
+    def write(self, rows):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+
+class CSVWriter(Writer):
+    def begin(self, names):
+        Writer.begin(self, names)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(names)
+
+    def write(self, rows):
+        for row in rows:
+            self._writer.writerow([ isinstance(value, unicode) and 
+                                    value.encode(self._encoding) or value 
+                                    for value in row ])
+
+
+class JSONLinesWriter(Writer):
+    def write(self, rows):
+        names = self._names
+        dumps = json.dumps
+        write = self._file.write
+        encoding = self._encoding
+        for row in rows:
+            write(dumps(dict( zip(names, row) ), default=_jsonDefault, 
+                        encoding=encoding))
+            write('\n')
+
+
+# binary format, a schema followed by column-wise record batches:
+#
+#   'Y47B' version:uint8
+#   schema length:uint32 schema:json {"columns": [names]}
+#   batches, each:  rows:uint32 then per column
+#                       tag:char length:uint32 payload
+#                   tag 'l' int64s, 'd' float64s, 'o' a json list (str
+#                   values decoded from the export's encoding)
+#   rows:uint32 == 0 ends the file
+#
+# all integers are little endian
+
+MAGIC = 'Y47B'
+VERSION = 1
+
+_little = sys.byteorder == 'little'
+
+
+class BinaryWriter(Writer):
+    def begin(self, names):
+        Writer.begin(self, names)
+        schema = json.dumps({'columns': names}, encoding=self._encoding)
+        self._file.write(MAGIC + struct.pack('<BI', VERSION, len(schema)))
+        self._file.write(schema)
+
+    def _encode(self, values):
+        typecode = _typecode(values)
+        # array('l') is a C long, 4 bytes on Windows, struct packs int64s 
+        # everywhere
+        if typecode == 'l':
+            try:
+                return 'l', struct.pack('<%dq' % len(values), *values)
+            except (struct.error, OverflowError):
+                pass
+        elif typecode == 'd':
+            data = array('d', values)
+            if not _little:
+                data.byteswap()
+            return 'd', data.tostring()
+
+        return 'o', json.dumps(values, default=_jsonDefault, 
+                                encoding=self._encoding)
+
+    def write(self, rows):
+        if not rows:
+            return
+
+        self._file.write(struct.pack('<I', len(rows)))
+        for values in zip(*rows):
+            tag, payload = self._encode(values)
+            self._file.write(struct.pack('<cI', tag, len(payload)))
+            self._file.write(payload)
+
+    def end(self):
+        self._file.write(struct.pack('<I', 0))
+
+
+WRITERS = {
+    'csv': CSVWriter,
+    'jsonl': JSONLinesWriter,
+    'binary': BinaryWriter,
+}
+
+
+def readBinary(path):
+    """yields the rows of a file written with format='binary'"""
+    with open(path, 'rb') as f:
+        if f.read(4) != MAGIC:
+            raise ValueError, '%s is not a y47 binary export' % path
+
+        version, size = struct.unpack('<BI', f.read(5))
+        if version != VERSION:
+            raise ValueError, 'unsupported version %d' % version
+        names = json.loads(f.read(size))['columns']
+
+        while True:
+            count, = struct.unpack('<I', f.read(4))
+            if not count:
+                return
+
+            columns = []
+            for name in names:
+                tag, size = struct.unpack('<cI', f.read(5))
+                payload = f.read(size)
+                if tag == 'o':
+                    columns.append(json.loads(payload))
+                elif tag == 'l':
+                    columns.append(struct.unpack('<%dq' % (size // 8), 
+                                                payload))
+                else:
+                    data = array(tag)
+                    data.fromstring(payload)
+                    if not _little:
+                        data.byteswap()
+                    columns.append(data)
+
+            for row in zip(*columns):
+                yield row
+
+
+def export(c, path, format='csv', batch_size=1000, buffer_size=1 << 20,
+            encoding='utf-8'):
+    """example:
+        from y47.db.cursor import SQLiteCursor
+        cursor = SQLiteCursor(connection=connection)
+        print cursor.export("SELECT * FROM test", path='test.csv')
+        1
+
+        writes the rows of an executed driver cursor to path one fetchmany
+        batch at a time through a buffer_size buffered file, so memory use 
+        does not grow with the result.  format is 'csv' (with a header 
+        row), 'jsonl' (an object per line) or 'binary' (column-wise 
+        batches, see readBinary()).  str values are taken to be text in 
+        encoding: a str that does not decode raises UnicodeDecodeError for
+        'jsonl' and 'binary' (csv writes str as it is).  returns the number
+        of rows written and closes the cursor.
+    """
+    if format not in WRITERS:
+        raise ValueError, 'format not in %s' % sorted(WRITERS.keys())
+
+    count = 0
+    try:
+        with open(path, 'wb', buffer_size) as f:
+            writer = WRITERS[format](f, encoding)
+            writer.begin([ d[0] for d in c.description ])
+            while True:
+                rows = c.fetchmany(batch_size)
+                if not rows:
+                    break
+                writer.write(rows)
+                count += len(rows)
+            writer.end()
+    finally:
+        c.close()
+
+    return count
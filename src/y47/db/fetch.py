@@ -0,0 +1,176 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from collections import OrderedDict
+
+from y47.db.instrument import estimateSize
+
+
+# cx_Oracle's defaults
+ARRAYSIZE = 100
+PREFETCHROWS = 2
+
+
+def estimateRoundTrips(rows, arraysize, prefetchrows):
+    """round trips to execute and fetch rows rows: the execute returns the
+    first prefetchrows rows, then each fetch arraysize more, and the fetch
+    that comes back short ends it"""
+    if rows < prefetchrows:
+        return 1
+    return 2 + (rows - prefetchrows) // max(arraysize, 1)
+
+
+class FetchTuning(object):
+    """example:
+        from y47.db.cursor import OracleCursor
+        cursor = OracleCursor(connection=connection, arraysize=1000,
+                                prefetchrows=1001)
+        rows = cursor.execute("SELECT * FROM BIG")
+
+        # per query
+
+        rows = cursor.execute("SELECT * FROM HUGE", arraysize=5000)
+
+        # or sized from what earlier runs of the same statement returned
+
+        cursor = OracleCursor(connection=connection, adaptive=True)
+        for i in range(10):
+            cursor.execute("SELECT * FROM BIG WHERE DAY=:1", (i,))
+        print cursor.stats()
+        {'queries': 10, 'rows': 500000, 'round_trips': 16, 'bytes': 61440000,
+         'arraysize': 8533, 'prefetchrows': 8533}
+
+        arraysize is the number of rows cx_Oracle fetches per round trip,
+        prefetchrows the number returned with the execute itself (cx_Oracle
+        8+).  None keeps the driver's default (100 and 2).  adaptive sizes
+        each statement from its last result: enough rows for target_bytes
+        per round trip, or the whole result plus one when it is smaller so
+        it comes back with the execute, between min_arraysize and 
+        max_arraysize.  sizes given to execute() win over adaptive ones,
+        which win over the cursor's.  round trips are estimated from the
+        row counts and the sizes in use, see estimateRoundTrips().
+    """
+    def __init__(self, arraysize=None, prefetchrows=None, adaptive=False, 
+                target_bytes=1 << 20, min_arraysize=100, max_arraysize=50000,
+                capacity=1000):
+        self.arraysize = arraysize
+        self.prefetchrows = prefetchrows
+        self.adaptive = adaptive
+        self.target_bytes = target_bytes
+        self.min_arraysize = min_arraysize
+        self.max_arraysize = max_arraysize
+
+        # sql: adaptive arraysize, least recently used first
+        self._capacity = capacity
+        self._sizes = OrderedDict()
+
+        self.reset()
+
+
+    def reset(self):
+        self.queries = 0
+        self.rows = 0
+        self.round_trips = 0
+        self.bytes = 0
+        self.last = (None, None)
+
+
+    def sizes(self, sql, arraysize=None, prefetchrows=None):
+        """(arraysize, prefetchrows) for sql, None for the driver default"""
+        if self.adaptive and sql in self._sizes:
+            size = self._sizes[sql]
+            if arraysize is None:
+                arraysize = size
+            if prefetchrows is None:
+                prefetchrows = size
+
+        if arraysize is None:
+            arraysize = self.arraysize
+        if prefetchrows is None:
+            prefetchrows = self.prefetchrows
+        return arraysize, prefetchrows
+
+
+    def apply(self, cursor, arraysize=None, prefetchrows=None):
+        """sets the sizes on a driver cursor before it is executed, None 
+        sets the driver default back: a cursor from the statement cache 
+        still has the sizes of its last execute"""
+        if arraysize is None:
+            arraysize = ARRAYSIZE
+        cursor.arraysize = arraysize
+        # prefetchrows is new in cx_Oracle 8
+        if hasattr(cursor, 'prefetchrows'):
+            if prefetchrows is None:
+                prefetchrows = PREFETCHROWS
+            cursor.prefetchrows = prefetchrows
+
+
+    def observe(self, sql, cursor, rows):
+        """records a fetched result, rows are the rows as fetched"""
+        count = rows and len(rows) or 0
+        size = estimateSize(rows)
+        arraysize = getattr(cursor, 'arraysize', ARRAYSIZE)
+        prefetchrows = getattr(cursor, 'prefetchrows', PREFETCHROWS)
+
+        self.queries += 1
+        self.rows += count
+        self.bytes += size
+        self.round_trips += estimateRoundTrips(count, arraysize, prefetchrows)
+        self.last = (arraysize, prefetchrows)
+
+        if self.adaptive:
+            self._learn(sql, count, size)
+
+
+    def _learn(self, sql, count, size):
+        if count:
+            arraysize = min(self.target_bytes // max(size // count, 1), 
+                            count + 1)
+        else:
+            arraysize = self.min_arraysize
+        arraysize = max(self.min_arraysize, min(arraysize, 
+                                                self.max_arraysize))
+
+        self._sizes.pop(sql, None)
+        self._sizes[sql] = arraysize
+        while len(self._sizes) > self._capacity:
+            self._sizes.popitem(last=False)
+
+
+    def stats(self):
+        return {
+            'queries': self.queries,
+            'rows': self.rows,
+            'round_trips': self.round_trips,
+            'bytes': self.bytes,
+            'arraysize': self.last[0],
+            'prefetchrows': self.last[1],
+        }
+
+
+# END: FetchTuning
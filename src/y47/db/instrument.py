@@ -0,0 +1,245 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import math
+import re
+import threading
+
+from y47.db.row import DictRow
+
+
+# instruments every cursor reports to, see install()
+_installed = []
+
+# rows sampled by estimateSize()
+SAMPLE = 100
+
+
+def install(instrument):
+    """reports every cursor's queries to instrument"""
+    _installed.append(instrument)
+
+def uninstall(instrument):
+    _installed.remove(instrument)
+
+
+def estimateSize(rows):
+    """a rough size in bytes of a result set, from up to SAMPLE rows: the
+    length of strings and 8 bytes for any other value"""
+    if not rows:
+        return 0
+
+    sample = rows[:SAMPLE]
+    size = 0
+    for row in sample:
+        if isinstance(row, (dict, DictRow)):
+            row = row.values()
+        for value in row:
+            if value is None:
+                continue
+            elif isinstance(value, basestring):
+                size += len(value)
+            else:
+                size += 8
+
+    return size * len(rows) // len(sample)
+
+
+_strings = re.compile(r"'(?:[^']|'')*'")
+_numbers = re.compile(r'(?<![\w:$])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b')
+_lists = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_space = re.compile(r'\s+')
+
+def normalize(sql):
+    """collapses a statement to its shape, i.e. literals become ? and 
+    IN (?, ?, ?) lists become (...), so timings group by statement"""
+    sql = _strings.sub('?', sql)
+    sql = _numbers.sub('?', sql)
+    sql = _lists.sub('(...)', sql)
+    return _space.sub(' ', sql).strip()
+
+
+class Instrument(object):
+    """example:
+        from y47.db.instrument import Instrument
+        class SlowQueries(Instrument):
+            def after(self, cursor, sql, args, execute_time, fetch_time,
+                        rows, size):
+                if execute_time + fetch_time > 1.0:
+                    print 'slow:', sql
+
+        cursor.addInstrument(SlowQueries())
+
+        base class for instruments, before() is called ahead of the driver's
+        execute, after() once the rows are fetched and converted with the 
+        seconds spent in each, the row count and an estimated size in bytes
+    """
+    def before(self, cursor, sql, args):
+        pass
+
+    def after(self, cursor, sql, args, execute_time, fetch_time, rows, size):
+        pass
+
+
+# END: Instrument
+
+
+class Histogram(object):
+    """log scale histogram of durations, buckets grow by 2 ** (1/8.) (about
+    9%), so percentiles are within 9% in a fixed amount of memory"""
+    _base = math.log(2 ** (1 / 8.))
+    _floor = 1e-6
+
+    def __init__(self):
+        self._buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+    def add(self, seconds):
+        bucket = 0
+        if seconds > self._floor:
+            bucket = int( math.ceil(math.log(seconds / self._floor) / 
+                                        self._base) )
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+
+        rank = max(1, int( math.ceil(self.count * p / 100.0) ))
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return min(self.max, self._floor * math.exp(bucket * 
+                                                            self._base))
+        return self.max
+
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.count and self.total / self.count or 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+# END: Histogram
+
+
+class HistogramCollector(Instrument):
+    """example:
+        from y47.db import instrument
+        collector = instrument.HistogramCollector()
+        instrument.install(collector)
+        ...
+        print collector.report()
+
+        keeps execute, fetch and total time histograms plus row and byte
+        counts per normalized statement
+    """
+    def __init__(self):
+        Instrument.__init__(self)
+        self._lock = threading.Lock()
+        self._statements = {}
+
+
+    def after(self, cursor, sql, args, execute_time, fetch_time, rows, size):
+        key = normalize(sql)
+        self._lock.acquire()
+        try:
+            try:
+                stats = self._statements[key]
+            except KeyError:
+                stats = self._statements[key] = {
+                    'execute': Histogram(), 
+                    'fetch': Histogram(), 
+                    'total': Histogram(),
+                    'rows': 0, 
+                    'bytes': 0,
+                }
+
+            stats['execute'].add(execute_time)
+            stats['fetch'].add(fetch_time)
+            stats['total'].add(execute_time + fetch_time)
+            stats['rows'] += rows
+            stats['bytes'] += size
+        finally:
+            self._lock.release()
+
+
+    def dump(self):
+        """{statement: {'count', 'rows', 'bytes', 'execute', 'fetch', 
+        'total'}}, the timings as Histogram.summary() dictionaries"""
+        self._lock.acquire()
+        try:
+            result = {}
+            for key, stats in self._statements.items():
+                result[key] = {
+                    'count': stats['total'].count,
+                    'rows': stats['rows'],
+                    'bytes': stats['bytes'],
+                    'execute': stats['execute'].summary(),
+                    'fetch': stats['fetch'].summary(),
+                    'total': stats['total'].summary(),
+                }
+            return result
+        finally:
+            self._lock.release()
+
+
+    def report(self):
+        lines = ['%8s %10s %10s %10s %10s  %s' % ('count', 'p50 ms', 'p95 ms',
+                                        'p99 ms', 'fetch p50', 'statement')]
+        stats = self.dump()
+        for key in sorted(stats, key=lambda k: -stats[k]['total']['p99']):
+            total = stats[key]['total']
+            lines.append('%8d %10.3f %10.3f %10.3f %10.3f  %s' % (
+                total['count'], total['p50'] * 1e3, total['p95'] * 1e3,
+                total['p99'] * 1e3, stats[key]['fetch']['p50'] * 1e3, key))
+        return '\n'.join(lines)
+
+
+    def reset(self):
+        self._lock.acquire()
+        try:
+            self._statements.clear()
+        finally:
+            self._lock.release()
+
+
+# END: HistogramCollector
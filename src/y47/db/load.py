@@ -0,0 +1,69 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import csv
+
+
+def columnNames(path, columns=None, header=True):
+    """columns, or the header row of the csv file at path when not set"""
+    if not columns and header:
+        with open(path, 'rb') as f:
+            columns = next(csv.reader(f), None)
+
+    if not columns:
+        raise ValueError, 'columns not set'
+
+    return list(columns)
+
+
+def readCSV(path, header=True, buffer_size=1 << 20):
+    """yields the rows of a csv file one at a time, skipping the header row
+    when header is set. empty fields are read as None (NULL), the way 
+    export() writes them."""
+    with open(path, 'rb', buffer_size) as f:
+        reader = csv.reader(f)
+        if header:
+            next(reader, None)
+
+        for row in reader:
+            yield tuple([ value or None for value in row ])
+
+
+def lineTerminator(path):
+    """'\\r\\n' or '\\n', whichever ends the first line of path"""
+    with open(path, 'rb') as f:
+        if f.readline().endswith('\r\n'):
+            return '\r\n'
+    return '\n'
+
+
+def insertStatement(table, names, placeholders):
+    """INSERT for table and names. names are not escaped, they may come
+    from the header row, so only load files you trust"""
+    return 'INSERT INTO %s (%s) VALUES (%s)' % (table, ', '.join(names), 
+                                                ', '.join(placeholders))
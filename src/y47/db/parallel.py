@@ -0,0 +1,272 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import multiprocessing
+import types
+from itertools import imap
+
+from y47.db.cursor import OracleCursor, OracleDictionaryCursor
+from y47.db.row import Record, mergeRows, recordClass
+from y47.db.spec import ConnectionSpec
+from y47.db.util import checkColumn
+
+
+PARTITIONINGS = ['modulo', 'range']
+
+
+def _partition(task):
+    """runs in a worker process: connect, execute one partition, return
+    (column names, rows) with the rows converted in this process"""
+    connection, cursor_class, row_type, sql, args = task
+
+    # a ConnectionSpec keeps one connection per worker process
+    if isinstance(connection, ConnectionSpec):
+        handle = connection.connect()
+    else:
+        handle = connection._reconnect()
+
+    try:
+        if row_type is None:
+            cursor = cursor_class(connection=handle)
+        else:
+            cursor = cursor_class(connection=handle, row_type=row_type)
+
+        rows = cursor.execute(sql, args) or []
+        names = [ d[0] for d in cursor._cursor.description ]
+    finally:
+        if not isinstance(connection, ConnectionSpec):
+            handle.close()
+
+    # sqlite3.Row does not pickle
+    if rows and not isinstance(rows[0], (tuple, dict)):
+        rows = [ dict( zip(row.keys(), row) ) for row in rows ]
+
+    return names, list(rows)
+
+
+class ParallelQuery(object):
+    """example:
+        from y47.db.connection import SQLiteConnection
+        from y47.db.cursor import SQLiteCursor
+        from y47.db.parallel import ParallelQuery
+
+        query = ParallelQuery(connection=SQLiteConnection(database='big.db'),
+                                cursor_class=SQLiteCursor, key='id',
+                                partitions=8)
+        rows = query.execute("SELECT id, name FROM test WHERE name LIKE ?",
+                                ('G%',))
+
+        # or, one partition at a time as the workers finish
+
+        for row in query.iterate("SELECT * FROM test", order_by='id'):
+            print row
+
+        query.close()
+
+        the query runs as partitions subqueries, each on a process of the 
+        pool, i.e. SELECT * FROM (sql) p WHERE ABS(id) % 8 = 3.  every worker 
+        connects for itself from the pickled connection settings (so not
+        to ':memory:') and converts its rows, so row conversion is spread
+        over processes.  connection is a Connection, connected for each 
+        partition, or a y47.db.spec.ConnectionSpec, connected once per 
+        worker process. 
+        partitioning is 'modulo' (ABS(key) % partitions, negative keys 
+        included) or 'range' (equal width ranges between bounds, i.e. 
+        bounds=(1, 1000000), taken from MIN/MAX(key) when not set).  key 
+        must be a numeric column of the result, rows where it is NULL go 
+        with the first partition (the last on Oracle, where NULLs sort 
+        last, so range partitions ordered on key still concatenate).  with 
+        order_by (a column name of the result) the partitions are sorted by 
+        the database and merged in order, without it rows come back a 
+        partition at a time, in the order the partitions finish.
+    """
+    def __init__(self, connection=None, cursor_class=None, key=None, 
+                partitions=4, partitioning='modulo', bounds=None, 
+                processes=None, row_type=None):
+        if partitioning not in PARTITIONINGS:
+            raise ValueError, 'partitioning not in %s' % PARTITIONINGS
+        if partitions < 1:
+            raise ValueError, 'need partitions >= 1'
+
+        self._connection = connection
+        self._cursor_class = cursor_class
+        self._key = key
+        self._partitions = partitions
+        self._partitioning = partitioning
+        self._bounds = bounds
+        self._processes = processes or partitions
+        self._row_type = row_type
+
+        self._pool = None
+
+
+    def _getPool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self._processes)
+        return self._pool
+
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
+    def _check(self):
+        if self._connection is None:
+            raise ValueError, 'connection not set'
+        if self._cursor_class is None:
+            raise ValueError, 'cursor_class not set'
+        if not self._key:
+            raise ValueError, 'key not set'
+
+
+    def _oracle(self):
+        return issubclass(self._cursor_class, (OracleCursor, 
+                                                OracleDictionaryCursor))
+
+
+    # SQLite and MySQL give a negative remainder for a negative key, which
+    # would match no partition
+    def _modulo(self, i):
+        if self._oracle():
+            return 'MOD(ABS(%s), %d) = %d' % (self._key, self._partitions, i)
+        return 'ABS(%s) %% %d = %d' % (self._key, self._partitions, i)
+
+
+    # the partition NULL keys go with, where they sort in an ordered scan
+    def _nullPartition(self):
+        if self._oracle():
+            return self._partitions - 1
+        return 0
+
+
+    def _getBounds(self, sql, args):
+        if self._bounds is not None:
+            return self._bounds
+
+        names, rows = _partition( (self._connection, self._cursor_class, 
+                None, 'SELECT MIN(%s), MAX(%s) FROM (%s) p' % (self._key, 
+                self._key, sql), args) )
+        row = rows[0]
+        if isinstance(row, dict):
+            row = [ row[name] for name in names ]
+        return row[0], row[1]
+
+
+    def _range(self, i, low, high):
+        low, high = float(low), float(high)
+        width = (high - low) / self._partitions
+        predicates = []
+        if i > 0:
+            predicates.append('%s >= %r' % (self._key, low + width * i))
+        if i < self._partitions - 1:
+            predicates.append('%s < %r' % (self._key, low + width * (i + 1)))
+        return ' AND '.join(predicates) or '1 = 1'
+
+
+    def _statements(self, sql, args, order_by):
+        if self._partitioning == 'range':
+            low, high = self._getBounds(sql, args)
+
+        statements = []
+        for i in range(self._partitions):
+            if self._partitioning == 'range':
+                if low is None:
+                    predicate = '1 = 1'
+                else:
+                    predicate = self._range(i, low, high)
+            else:
+                predicate = self._modulo(i)
+
+            if i == self._nullPartition():
+                predicate = '(%s OR %s IS NULL)' % (predicate, self._key)
+
+            statement = 'SELECT * FROM (%s) p WHERE %s' % (sql, predicate)
+            if order_by:
+                statement += ' ORDER BY %s' % order_by
+            statements.append(statement)
+
+        return statements
+
+
+    # Record rows pickle through Record.__reduce__, several times slower
+    # than tuples, so workers send tuples and Records are made here
+    def _workerRowType(self):
+        if self._row_type is Record:
+            return types.TupleType
+        return self._row_type
+
+
+    def _convert(self, partial):
+        names, rows = partial
+        if self._row_type is Record:
+            rows = map(recordClass(names), rows)
+        return names, rows
+
+
+    def _results(self, tasks, order_by):
+        pool = self._getPool()
+
+        # range partitions sorted on their own key are already in order
+        if order_by and not (self._partitioning == 'range' and 
+                                order_by == self._key):
+            partials = map(self._convert, pool.map(_partition, tasks))
+            for row in mergeRows(partials, order_by):
+                yield row
+        elif order_by:
+            for names, rows in imap(self._convert, 
+                                    pool.imap(_partition, tasks)):
+                for row in rows:
+                    yield row
+        else:
+            for names, rows in imap(self._convert, 
+                                    pool.imap_unordered(_partition, tasks)):
+                for row in rows:
+                    yield row
+
+
+    def iterate(self, sql, args=None, order_by=None):
+        """yields the rows of each partition as its worker finishes, or in
+        order_by order once all have finished"""
+        self._check()
+        if order_by:
+            checkColumn(order_by)
+
+        tasks = [ (self._connection, self._cursor_class, 
+                    self._workerRowType(), statement, args) 
+                    for statement in self._statements(sql, args, order_by) ]
+        return self._results(tasks, order_by)
+
+
+    def execute(self, sql, args=None, order_by=None):
+        return list(self.iterate(sql, args, order_by))
+
+
+# END: ParallelQuery
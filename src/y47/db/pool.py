@@ -0,0 +1,268 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import threading
+import time
+from contextlib import contextmanager
+
+from y47.db import PoolTimeout
+
+
+class ConnectionPool(object):
+    """example:
+        from y47.db.connection import SQLiteConnection
+        from y47.db.cursor import SQLiteCursor
+        from y47.db.pool import ConnectionPool
+
+        # sqlite connections change threads inside a pool
+        sqlite = SQLiteConnection(database=r'sqlite.db', 
+                                    check_same_thread=False)
+        pool = ConnectionPool(connection=sqlite, min_size=2, max_size=8)
+
+        connection = pool.checkout(timeout=5)
+        try:
+            cursor = SQLiteCursor(connection=connection)
+            print cursor.execute("SELECT * FROM test")
+        finally:
+            pool.checkin(connection)
+
+        # or, with less typing
+
+        with pool.connection() as connection:
+            cursor = SQLiteCursor(connection=connection)
+            print cursor.execute("SELECT * FROM test")
+
+        pool.close()
+
+        connection is any y47.db.connection.Connection, it is only used as
+        a factory (connection._reconnect()) and for health checks 
+        (connection._ping()).  Idle connections older than max_idle seconds
+        are closed while the pool holds more than min_size.  checkout() 
+        blocks up to timeout seconds (None waits forever) once max_size 
+        connections are in use and raises PoolTimeout.
+    """
+    def __init__(self, connection=None, min_size=1, max_size=10, timeout=None,
+                max_idle=300, check=True):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError, 'need 0 <= min_size <= max_size, max_size >= 1'
+
+        self._connection = connection
+        self._min_size = min_size
+        self._max_size = max_size
+        self._timeout = timeout
+        self._max_idle = max_idle
+        self._check = check
+
+        self._lock = threading.Condition(threading.Lock())
+        self._idle = []     # [(connection, last used)], oldest first
+        self._used = {}     # id(connection): connection
+        self._size = 0
+        self._closed = False
+
+        if self._connection is not None:
+            for i in range(self._min_size):
+                handle = self._open()
+                self._lock.acquire()
+                try:
+                    self._size += 1
+                    self._idle.append((handle, time.time()))
+                finally:
+                    self._lock.release()
+
+
+    def _getSize(self):
+        return self._size
+
+    size = property(_getSize, None, None, 'connections open')
+
+
+    def _getIdle(self):
+        return len(self._idle)
+
+    idle = property(_getIdle, None, None, 'connections waiting in the pool')
+
+
+    def _open(self):
+        if self._connection is None:
+            raise ValueError, 'connection not set'
+
+        return self._connection._reconnect()
+
+
+    def _close(self, handle):
+        try:
+            handle.close()
+        except Exception:
+            pass
+
+
+    def _healthy(self, handle):
+        try:
+            self._connection._ping(handle)
+            return True
+        except Exception:
+            return False
+
+
+    # called with the lock held, returns the handles for the caller to 
+    # close once it has released the lock (a close is a driver round trip)
+    def _evict(self):
+        now = time.time()
+        evicted = []
+        while self._idle and self._size > self._min_size and \
+                now - self._idle[0][1] > self._max_idle:
+            handle, used = self._idle.pop(0)
+            self._size -= 1
+            evicted.append(handle)
+        return evicted
+
+
+    def checkout(self, timeout=None):
+        if timeout is None:
+            timeout = self._timeout
+
+        deadline = None
+        if timeout is not None:
+            deadline = time.time() + timeout
+
+        handle = None
+        evicted = []
+        self._lock.acquire()
+        try:
+            while True:
+                if self._closed:
+                    raise ValueError, 'pool is closed'
+
+                evicted.extend(self._evict())
+                if self._idle:
+                    handle, used = self._idle.pop()
+                    break
+
+                if self._size < self._max_size:
+                    self._size += 1
+                    break
+
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise PoolTimeout(timeout, 
+                                'no connection available after %ss' % timeout)
+
+                self._lock.wait(remaining)
+        finally:
+            self._lock.release()
+            for old in evicted:
+                self._close(old)
+
+        try:
+            if handle is not None and self._check and \
+                    not self._healthy(handle):
+                self._close(handle)
+                handle = None
+
+            if handle is None:
+                handle = self._open()
+
+        except:
+            self._lock.acquire()
+            try:
+                self._size -= 1
+                self._lock.notify()
+            finally:
+                self._lock.release()
+            raise
+
+        self._lock.acquire()
+        try:
+            self._used[id(handle)] = handle
+        finally:
+            self._lock.release()
+
+        return handle
+
+
+    def checkin(self, handle, discard=False):
+        self._lock.acquire()
+        try:
+            if self._used.pop(id(handle), None) is None:
+                raise ValueError, 'connection does not belong to this pool'
+        finally:
+            self._lock.release()
+
+        # still counted in size, so no other checkout opens in its place
+        if not discard:
+            try:
+                handle.rollback()
+            except Exception:
+                discard = True
+
+        self._lock.acquire()
+        try:
+            if discard or self._closed:
+                self._size -= 1
+                closing = [handle]
+            else:
+                self._idle.append((handle, time.time()))
+                closing = []
+
+            closing.extend(self._evict())
+            self._lock.notify()
+        finally:
+            self._lock.release()
+
+        for old in closing:
+            self._close(old)
+
+
+    @contextmanager
+    def connection(self, timeout=None):
+        handle = self.checkout(timeout)
+        try:
+            yield handle
+        finally:
+            self.checkin(handle)
+
+
+    def close(self):
+        self._lock.acquire()
+        try:
+            self._closed = True
+            closing = [ handle for handle, used in self._idle ]
+            self._size -= len(closing)
+            self._idle = []
+
+            self._lock.notifyAll()
+        finally:
+            self._lock.release()
+
+        for handle in closing:
+            self._close(handle)
+
+
+# END: ConnectionPool
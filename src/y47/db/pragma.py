@@ -0,0 +1,87 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+# SQLite tuning profiles for SQLiteConnection(profile=...). settings are
+# applied in order, busy_timeout first so switching the journal mode waits
+# on other connections instead of failing
+PROFILES = {
+    # WAL readers never block on the writer, a large page cache and 
+    # memory mapped reads
+    'read_heavy': [
+        ('busy_timeout', 5000),
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -65536),
+        ('mmap_size', 268435456),
+        ('temp_store', 'MEMORY'),
+    ],
+    # WAL with synchronous=NORMAL only syncs at checkpoints, commits 
+    # append to the log. writes go through the page cache, not the map
+    'write_heavy': [
+        ('busy_timeout', 5000),
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -32768),
+        ('mmap_size', 0),
+        ('temp_store', 'MEMORY'),
+    ],
+    # no fsync and the rollback journal in memory. a crash during the load
+    # can corrupt the database, use it for loads that can be rerun
+    'bulk_load': [
+        ('busy_timeout', 5000),
+        ('journal_mode', 'MEMORY'),
+        ('synchronous', 'OFF'),
+        ('cache_size', -262144),
+        ('mmap_size', 0),
+        ('temp_store', 'MEMORY'),
+    ],
+}
+
+
+# set by SQLiteCursor.import_file for the duration of a load only
+BULK_LOAD = [('journal_mode', 'MEMORY'), ('synchronous', 'OFF')]
+
+
+def setPragmas(connection, settings):
+    """sets each (pragma, value) of settings on a sqlite connection and 
+    returns the previous values in the same form, i.e.
+
+        saved = setPragmas(connection, BULK_LOAD)
+        try:
+            ...
+        finally:
+            setPragmas(connection, saved)
+    """
+    saved = []
+    for name, value in settings:
+        # some pragmas return nothing, i.e. mmap_size on ':memory:'
+        row = connection.execute('PRAGMA %s' % name).fetchone()
+        if row is not None:
+            saved.append( (name, row[0]) )
+        connection.execute('PRAGMA %s=%s' % (name, value))
+    return saved
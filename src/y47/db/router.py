@@ -0,0 +1,347 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import re
+import threading
+import time
+
+from y47.db.driver import driver
+from y47.db.pool import ConnectionPool
+from y47.db.util import VERB, increment
+
+
+_locking = re.compile(r'\bFOR\s+(?:UPDATE|SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b',
+                        re.I)
+
+READS = ['SELECT', 'SHOW', 'DESCRIBE', 'DESC', 'EXPLAIN']
+
+
+def isRead(sql):
+    """True for statements a replica can answer: SELECT/SHOW/DESCRIBE/
+    EXPLAIN without a locking clause (FOR UPDATE, LOCK IN SHARE MODE)"""
+    match = VERB.match(sql)
+    if not match or match.group(1).upper() not in READS:
+        return False
+    return not _locking.search(sql)
+
+
+class Router(object):
+    """example:
+        from y47.db.connection import MySQLConnection
+        from y47.db.cursor import MySQLCursor
+        from y47.db.router import Router
+
+        router = Router(
+            primary=MySQLConnection(host='db1', user='y47', passwd='secret',
+                                    database='y47'),
+            replicas=[ MySQLConnection(host=host, user='y47', 
+                                    passwd='secret', database='y47')
+                        for host in ['db2', 'db3'] ],
+            max_size=20)
+
+        with router.session() as session:
+            cursor = MySQLCursor(connection=session)
+            cursor.execute("SELECT * FROM test")            # a replica
+            cursor.execute("UPDATE test SET name=%s", ('Glenn',))  # primary
+            session.commit()
+            cursor.execute("SELECT * FROM test")            # primary
+
+        router.close()
+
+        a session stands in for a driver connection, any cursor class works
+        on it.  each read (see isRead()) goes to the replica with the fewest
+        requests in flight, through a ConnectionPool of max_size per 
+        target, and everything else to the primary.  the first write pins 
+        the session to one primary connection, which then serves all of 
+        its statements: the session reads its own writes and keeps its 
+        transaction.  with pin_seconds the pin is dropped that many 
+        seconds after the last write once the work is committed (allowing
+        for replication lag), with None it lasts until the session is 
+        closed.  without replicas everything goes to the primary.
+    """
+    def __init__(self, primary=None, replicas=None, max_size=10, timeout=None,
+                pin_seconds=None):
+        if primary is None:
+            raise ValueError, 'primary not set'
+
+        self._primary = ConnectionPool(connection=primary, min_size=0,
+                                        max_size=max_size, timeout=timeout)
+        self._replicas = [ ConnectionPool(connection=replica, min_size=0, 
+                                        max_size=max_size, timeout=timeout)
+                            for replica in replicas or [] ]
+        self._outstanding = [0] * len(self._replicas)
+        self._next = 0
+        self._lock = threading.Lock()
+        self._pin_seconds = pin_seconds
+
+        self.reads = 0
+        self.writes = 0
+        self.pinned_reads = 0
+
+
+    def _getPinSeconds(self):
+        return self._pin_seconds
+
+    def _setPinSeconds(self, pin_seconds=None):
+        self._pin_seconds = pin_seconds
+
+    pin_seconds = property(_getPinSeconds, _setPinSeconds, None, 
+                        'pin_seconds property')
+
+
+    def session(self):
+        return RoutingSession(self)
+
+
+    def _acquireReplica(self):
+        """(replica index, connection) of the least busy replica, ties 
+        taken in turn"""
+        self._lock.acquire()
+        try:
+            count = len(self._replicas)
+            order = [ (self._next + n) % count for n in range(count) ]
+            i = min(order, key=lambda n: self._outstanding[n])
+            self._next = (i + 1) % count
+            self._outstanding[i] += 1
+            self.reads += 1
+        finally:
+            self._lock.release()
+
+        try:
+            return i, self._replicas[i].checkout()
+        except:
+            self._done(i)
+            raise
+
+
+    def _releaseReplica(self, i, handle):
+        try:
+            self._replicas[i].checkin(handle)
+        finally:
+            self._done(i)
+
+
+    def _done(self, i):
+        self._lock.acquire()
+        try:
+            self._outstanding[i] -= 1
+        finally:
+            self._lock.release()
+
+
+    def stats(self):
+        return {
+            'reads': self.reads,
+            'writes': self.writes,
+            'pinned_reads': self.pinned_reads,
+            'outstanding': list(self._outstanding),
+        }
+
+
+    def close(self):
+        self._primary.close()
+        for replica in self._replicas:
+            replica.close()
+
+
+# END: Router
+
+
+class RoutingSession(object):
+    """the connection a cursor sees, see Router"""
+    def __init__(self, router):
+        self._router = router
+        self._pinned = None
+        self._uncommitted = False
+        self._written = 0.0
+
+
+    def _getPinned(self):
+        return self._pinned is not None
+
+    pinned = property(_getPinned, None, None, 'pinned to the primary')
+
+
+    def cursor(self, cursorclass=None):
+        return _RoutedCursor(self, cursorclass)
+
+
+    def _unpin(self):
+        handle, self._pinned = self._pinned, None
+        self._uncommitted = False
+        self._router._primary.checkin(handle)
+
+
+    def _route(self, sql):
+        """(connection, release) for sql, release() is called when the 
+        statement's result is no longer needed"""
+        router = self._router
+        read = isRead(sql)
+
+        if self._pinned is not None and read and not self._uncommitted and \
+                router._pin_seconds is not None and \
+                time.time() - self._written >= router._pin_seconds:
+            self._unpin()
+
+        if self._pinned is None and read:
+            if not router._replicas:
+                increment(router, 'reads')
+                handle = router._primary.checkout()
+                return handle, lambda: router._primary.checkin(handle)
+
+            i, handle = router._acquireReplica()
+            return handle, lambda: router._releaseReplica(i, handle)
+
+        if read:
+            increment(router, 'pinned_reads')
+        else:
+            increment(router, 'writes')
+            self._uncommitted = True
+            self._written = time.time()
+
+        if self._pinned is None:
+            self._pinned = router._primary.checkout()
+        return self._pinned, None
+
+
+    def commit(self):
+        if self._pinned is not None:
+            self._pinned.commit()
+        self._uncommitted = False
+        self._written = time.time()
+
+
+    def rollback(self):
+        if self._pinned is not None:
+            self._pinned.rollback()
+        self._uncommitted = False
+
+
+    def close(self):
+        """returns the pinned connection, rolling back uncommitted work"""
+        if self._pinned is not None:
+            self._unpin()
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# END: RoutingSession
+
+
+class _RoutedCursor(object):
+    """a driver cursor that picks its connection on each execute. 
+    attributes set before then (row_factory, arraysize...) are passed on 
+    to the driver cursor"""
+    def __init__(self, session, cursorclass=None):
+        self.__dict__['_session'] = session
+        self.__dict__['_cursorclass'] = cursorclass
+        self.__dict__['_settings'] = {}
+        self.__dict__['_cursor'] = None
+        self.__dict__['_release'] = None
+
+
+    def __setattr__(self, name, value):
+        self._settings[name] = value
+        if self._cursor is not None:
+            setattr(self._cursor, name, value)
+
+    def __getattr__(self, name):
+        if self._cursor is None:
+            if name in self._settings:
+                return self._settings[name]
+            raise AttributeError(name)
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+    # unbuffered (server side) cursors hold their connection until closed,
+    # buffered results are read by execute() and it is released at once
+    def _unbuffered(self):
+        if self._cursorclass is None:
+            return False
+        return issubclass(self._cursorclass, 
+                        driver('mysql.cursors').CursorUseResultMixIn)
+
+
+    def _finish(self):
+        release = self._release
+        self.__dict__['_release'] = None
+        if release is not None:
+            release()
+
+
+    def _run(self, method, sql, args):
+        self._finish()
+        handle, release = self._session._route(sql)
+        try:
+            if self._cursorclass is None:
+                cursor = handle.cursor()
+            else:
+                cursor = handle.cursor(self._cursorclass)
+            for name, value in self._settings.items():
+                setattr(cursor, name, value)
+
+            if args is None:
+                result = getattr(cursor, method)(sql)
+            else:
+                result = getattr(cursor, method)(sql, args)
+        except:
+            if release is not None:
+                release()
+            raise
+
+        self.__dict__['_cursor'] = cursor
+        self.__dict__['_release'] = release
+        if not self._unbuffered():
+            self._finish()
+        return result
+
+
+    def execute(self, sql, args=None):
+        return self._run('execute', sql, args)
+
+    def executemany(self, sql, rows):
+        return self._run('executemany', sql, rows)
+
+
+    def close(self):
+        try:
+            if self._cursor is not None:
+                self._cursor.close()
+        finally:
+            self._finish()
+
+
+# END: _RoutedCursor
@@ -0,0 +1,348 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import heapq
+import re
+from operator import itemgetter
+
+
+_identifier = re.compile(r'^[A-Za-z][A-Za-z0-9_]*$')
+
+# column names: Record subclass
+_records = {}
+
+
+class Record(tuple):
+    """example:
+        from y47.db.cursor import OracleCursor
+        from y47.db.row import Record
+        cursor = OracleCursor(connection=connection, row_type=Record)
+        results = cursor.execute("SELECT ID, NAME FROM TEST")
+        print results[0]
+        Record(ID=1, NAME='Glenn')
+        print results[0][1], results[0]['NAME'], results[0].NAME
+        Glenn Glenn Glenn
+
+        Record is the row_type, the rows are subclasses generated once per 
+        set of column names (cursor.description). they are plain tuples 
+        with no per row __dict__, so a row costs what a tuple costs while 
+        columns can still be read by index, by name or as attributes.
+    """
+    __slots__ = ()
+
+    _fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, basestring):
+            try:
+                key = self._index[key]
+            except KeyError:
+                raise KeyError(key)
+        return tuple.__getitem__(self, key)
+
+    def __repr__(self):
+        return 'Record(%s)' % ', '.join([ '%s=%r' % (name, value) 
+                                    for name, value in zip(self._fields, self) ])
+
+    def __reduce__(self):
+        return (_rebuild, (self._fields, tuple(self)))
+
+    def keys(self):
+        return list(self._fields)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except (KeyError, IndexError):
+            return default
+
+    def asDict(self):
+        return dict( zip(self._fields, self) )
+
+
+# END: Record
+
+
+class DictRow(object):
+    """a read only dictionary view of one row tuple, see LazyRows. the 
+    column index is shared by every row of a result, so a row costs one
+    small object over the driver's tuple"""
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index, values):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[self._index[key]]
+
+    def get(self, key, default=None):
+        try:
+            return self._values[self._index[key]]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self._index
+
+    has_key = __contains__
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        return self._index.keys()
+
+    def values(self):
+        return [ self._values[i] for i in self._index.itervalues() ]
+
+    def items(self):
+        return [ (key, self._values[i]) for key, i in self._index.iteritems() ]
+
+    iterkeys = __iter__
+
+    def itervalues(self):
+        return iter(self.values())
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def asDict(self):
+        return dict(self.items())
+
+    copy = asDict
+
+    def __eq__(self, other):
+        if isinstance(other, DictRow):
+            other = other.asDict()
+        return self.asDict() == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.asDict())
+
+
+# END: DictRow
+
+
+class LazyRows(object):
+    """example:
+        import types
+        from y47.db.cursor import OracleCursor
+        cursor = OracleCursor(connection=connection, 
+                                row_type=types.DictionaryType, lazy=True)
+        rows = cursor.execute("SELECT * FROM BIG")
+        for row in rows[:10]:
+            print row['NAME']
+        print len(rows)
+
+        the result of a lazy execute(): rows come from the driver cursor 
+        arraysize at a time as they are indexed, sliced or iterated, and 
+        stay tuples.  the column names are read once, and a row is turned
+        into a dictionary (a DictRow view) only when it is used, 
+        row.asDict() copies it into a real dict.  convert, a tuple to 
+        tuple function (see y47.db.convert), is applied to each batch as 
+        it is fetched, before the next fetch invalidates its LOBs.  len(),
+        negative indexes and slices fetch the rest of the result, a result
+        that is only partly used leaves the rest on the server.
+        done(rows), and each add_done_callback() callback, is called with
+        the tuples once all are fetched.
+    """
+    def __init__(self, cursor, batch_size=None, done=None, convert=None):
+        self._cursor = cursor
+        self._batch_size = batch_size or cursor.arraysize
+        self._done = []
+        if done is not None:
+            self._done.append(done)
+        self._convert = convert
+        self._keys = [ d[0] for d in cursor.description ]
+        self._index = {}
+        for i, name in enumerate(self._keys):
+            self._index[name] = i
+        self._rows = []
+
+
+    def _getKeys(self):
+        return list(self._keys)
+
+    keys = property(_getKeys, None, None, 'column names')
+
+
+    def _getFetched(self):
+        return len(self._rows)
+
+    fetched = property(_getFetched, None, None, 'rows fetched so far')
+
+
+    def _fetch(self, count=None):
+        """fetches until count rows are held, or all of them"""
+        while self._cursor is not None and \
+                (count is None or len(self._rows) < count):
+            rows = self._cursor.fetchmany(self._batch_size)
+            if not rows:
+                self._cursor = None
+                for done in self._done:
+                    done(self._rows)
+                break
+            if self._convert is not None:
+                rows = map(self._convert, rows)
+            self._rows.extend(rows)
+
+
+    def add_done_callback(self, done):
+        """calls done(rows) once every row is fetched, at once if they 
+        already are"""
+        if self._cursor is None:
+            done(self._rows)
+        else:
+            self._done.append(done)
+
+
+    def _row(self, row):
+        return DictRow(self._index, row)
+
+
+    def _drain(self):
+        self._fetch()
+
+
+    def __len__(self):
+        self._fetch()
+        return len(self._rows)
+
+    def __nonzero__(self):
+        self._fetch(1)
+        return bool(self._rows)
+
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            if i.stop is None or i.stop < 0 or (i.start or 0) < 0 or \
+                    (i.step or 1) < 0:
+                self._fetch()
+            else:
+                self._fetch(i.stop)
+            return [ self._row(row) for row in self._rows[i] ]
+
+        if i < 0:
+            self._fetch()
+        else:
+            self._fetch(i + 1)
+        return self._row(self._rows[i])
+
+
+    def __iter__(self):
+        i = 0
+        while True:
+            if i >= len(self._rows):
+                self._fetch(i + self._batch_size)
+                if i >= len(self._rows):
+                    return
+            yield self._row(self._rows[i])
+            i += 1
+
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+# END: LazyRows
+
+
+def recordClass(names):
+    """returns the Record subclass for a sequence of column names, created
+    on first use and cached afterwards"""
+    names = tuple(names)
+    try:
+        return _records[names]
+    except KeyError:
+        pass
+
+    index = {}
+    attributes = {'__slots__': (), '_fields': names, '_index': index}
+    for i, name in enumerate(names):
+        if name in index:
+            continue
+
+        index[name] = i
+        if _identifier.match(name) and not hasattr(Record, name):
+            attributes[name] = property(itemgetter(i))
+
+    record = type('Record', (Record,), attributes)
+    _records[names] = record
+    return record
+
+
+def recordFactory(description):
+    """returns the Record subclass for a DB-API cursor.description"""
+    return recordClass([ d[0] for d in description ])
+
+
+def _keyed(n, names, rows, order_by):
+    column = None
+    for i, row in enumerate(rows):
+        if column is None:
+            if isinstance(row, (dict, DictRow)):
+                column = order_by
+            elif order_by in names:
+                column = list(names).index(order_by)
+            else:
+                raise ValueError, 'order_by %r not in the columns %s' % (
+                                    order_by, list(names))
+        yield row[column], n, i, row
+
+
+def mergeRows(partials, order_by):
+    """merges (column names, rows) partials, each sorted on order_by, into
+    one sorted sequence of rows.  rows may be iterators, they are read as
+    the merge goes"""
+    heap = [ _keyed(n, names, rows, order_by) 
+                for n, (names, rows) in enumerate(partials) ]
+
+    for value, n, i, row in heapq.merge(*heap):
+        yield row
+
+
+def _rebuild(names, values):
+    return recordClass(names)(values)
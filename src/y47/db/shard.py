@@ -0,0 +1,452 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import glob
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from Queue import Queue
+
+from y47.db.asynchronous import Executor
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+from y47.db.row import mergeRows
+from y47.db.util import checkColumn, increment
+
+
+COMBINE = ['count', 'sum', 'min', 'max']
+
+_function = re.compile(r'^\s*(COUNT|SUM|TOTAL|MIN|MAX)\s*\(', re.I)
+
+
+def _combiner(name):
+    """the combine function for a column named COUNT(*), SUM(x)..."""
+    match = _function.match(name)
+    if match is None:
+        return 'sum'
+    function = match.group(1).lower()
+    if function == 'total':
+        return 'sum'
+    return function
+
+
+def _combine(function, values):
+    values = [ value for value in values if value is not None ]
+    if not values:
+        if function == 'count':
+            return 0
+        return None
+    if function in ['count', 'sum']:
+        return sum(values)
+    if function == 'min':
+        return min(values)
+    return max(values)
+
+
+class _Shard(object):
+    """an open shard. users counts the threads holding or waiting for it,
+    only unused shards are closed by the LRU"""
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+        self.users = 0
+        self.lock = threading.Lock()
+
+
+class ShardManager(object):
+    """example:
+        from y47.db.shard import ShardManager
+
+        # one database file per tenant: tenants/acme.db, tenants/globex.db
+        shards = ShardManager(directory='tenants', pattern='%s.db', 
+                                capacity=64, max_workers=8)
+
+        print shards.execute('acme', "SELECT COUNT(*) FROM orders")
+        [(1042,)]
+
+        # every shard, rows of each shard as soon as it is done
+        for row in shards.iterate_all("SELECT * FROM orders WHERE total > ?",
+                                        (100,)):
+            print row
+
+        # every shard, merged on a column
+        rows = shards.execute_all("SELECT id, placed FROM orders", 
+                                        order_by='placed')
+
+        # COUNT/SUM/MIN/MAX of every shard combined
+        print shards.aggregate("SELECT COUNT(*), SUM(total) FROM orders")
+        [(203117, 9120231.5)]
+        print shards.aggregate("SELECT status, COUNT(*) FROM orders "
+                                "GROUP BY status", group_by=['status'])
+        [(u'open', 1021), (u'shipped', 202096)]
+
+        shards.close()
+
+        maps a shard key to the database file pattern % key in directory,
+        or with shards=N, hashes keys (crc32) over N files pattern % 0 to
+        pattern % (N-1).  at most capacity databases are kept open, the
+        least recently used idle one is closed to open another.  each open
+        database is used by one thread at a time. 
+        queries over all shards (or a list of shards) run on a pool of
+        max_workers threads, one query per shard.  iterate_all() yields 
+        the rows of each shard as it finishes, with order_by (a column 
+        name of the result, ascending) each shard is sorted by SQLite and 
+        read batch_size rows at a time while the shards are merged in 
+        order, every shard stays open (over capacity if need be) until 
+        the merge is done.  aggregate() combines one row per shard (or per 
+        group_by group) column by column: COUNT and SUM columns are added,
+        MIN and MAX taken, other columns (and aliased aggregates without 
+        combine, i.e. combine=['count', 'max']) are added.  AVG does not
+        combine, select SUM and COUNT instead.  the remaining options are 
+        passed to SQLiteConnection, i.e. read_only=True or a profile.
+    """
+    def __init__(self, directory='.', pattern='%s.db', shards=None, 
+                capacity=32, max_workers=8, cursor_class=SQLiteCursor,
+                row_type=None, executor=None, **options):
+        if capacity < 1:
+            raise ValueError, 'capacity must be >= 1'
+        if shards is not None and shards < 1:
+            raise ValueError, 'need shards >= 1'
+
+        self._directory = directory
+        self._pattern = pattern
+        self._shards = shards
+        self._capacity = capacity
+        self._cursor_class = cursor_class
+        self._row_type = row_type
+        self._options = options
+
+        self._max_workers = max_workers
+        self._own_executor = executor is None
+        self._executor = executor
+
+        self._lock = threading.Lock()
+        self._open = OrderedDict()      # shard: _Shard, most recent last
+
+        self.opens = 0
+        self.hits = 0
+        self.evictions = 0
+
+
+    def _getCapacity(self):
+        return self._capacity
+
+    capacity = property(_getCapacity, None, None, 'capacity property')
+
+
+    def _getCursorClass(self):
+        return self._cursor_class
+
+    def _setCursorClass(self, cursor_class=SQLiteCursor):
+        self._cursor_class = cursor_class
+
+    cursor_class = property(_getCursorClass, _setCursorClass, None, 
+                        'cursor_class property')
+
+
+    def _getRowType(self):
+        return self._row_type
+
+    def _setRowType(self, row_type=None):
+        self._row_type = row_type
+
+    row_type = property(_getRowType, _setRowType, None, 'row_type property')
+
+
+    def _getExecutor(self):
+        if self._executor is None:
+            self._executor = Executor(self._max_workers)
+        return self._executor
+
+
+    def shard(self, key):
+        """the shard key is stored in"""
+        if self._shards is None:
+            return key
+        return (zlib.crc32(str(key)) & 0xffffffff) % self._shards
+
+
+    def path(self, shard):
+        return os.path.join(self._directory, self._pattern % (shard,))
+
+
+    def shards(self):
+        """every shard: 0 to shards-1, or the files in directory matching
+        pattern"""
+        if self._shards is not None:
+            return range(self._shards)
+
+        prefix, suffix = self._pattern.split('%s')
+        names = [ os.path.basename(name) for name in glob.glob(
+                    os.path.join(self._directory, prefix + '*' + suffix) ) ]
+        return sorted([ name[len(prefix):len(name) - len(suffix)] 
+                        for name in names ])
+
+
+    # ------------------------------------------------------------------------
+
+    def _evict(self):
+        """closes least recently used idle shards down to capacity, with 
+        the lock held"""
+        for shard in list(self._open.keys()):
+            if len(self._open) <= self._capacity:
+                break
+            entry = self._open[shard]
+            if entry.users:
+                continue
+            del self._open[shard]
+            self.evictions += 1
+            if entry.handle is not None:
+                entry.handle.close()
+
+
+    def _acquire(self, shard):
+        self._lock.acquire()
+        try:
+            entry = self._open.pop(shard, None)
+            if entry is None:
+                entry = _Shard(self.path(shard))
+            else:
+                self.hits += 1
+            self._open[shard] = entry
+            entry.users += 1
+            self._evict()
+        finally:
+            self._lock.release()
+
+        entry.lock.acquire()
+        try:
+            if entry.handle is None:
+                entry.handle = SQLiteConnection(database=entry.path, 
+                        check_same_thread=False, **self._options)._reconnect()
+                increment(self, 'opens')
+        except:
+            self._release(entry)
+            raise
+
+        return entry
+
+
+    def _release(self, entry):
+        entry.lock.release()
+        self._lock.acquire()
+        try:
+            entry.users -= 1
+            self._evict()
+        finally:
+            self._lock.release()
+
+
+    @contextmanager
+    def connection(self, key):
+        """the driver connection of key's shard, for this thread only
+        until the block ends"""
+        entry = self._acquire(self.shard(key))
+        try:
+            yield entry.handle
+        finally:
+            self._release(entry)
+
+
+    def _cursor(self, handle):
+        if self._row_type is None:
+            return self._cursor_class(connection=handle)
+        return self._cursor_class(connection=handle, row_type=self._row_type)
+
+
+    def _query(self, shard, sql, args, cursor=None):
+        """(column names, rows) of sql on shard"""
+        entry = self._acquire(shard)
+        try:
+            if cursor is None:
+                cursor = self._cursor(entry.handle)
+            else:
+                cursor = cursor(connection=entry.handle)
+            rows = cursor.execute(sql, args) or []
+            names = [ d[0] for d in cursor._cursor.description or [] ]
+        finally:
+            self._release(entry)
+        return names, rows
+
+
+    def execute(self, key, sql, args=None):
+        """sql on key's shard"""
+        return self._query(self.shard(key), sql, args)[1]
+
+
+    # ------------------------------------------------------------------------
+
+    def _submit(self, sql, args, shards, cursor=None):
+        if shards is None:
+            shards = self.shards()
+        executor = self._getExecutor()
+        return [ executor.submit(self._query, shard, sql, args, cursor)
+                    for shard in shards ]
+
+
+    def _stream(self, handle, sql, args, order_by, batch_size):
+        """(column names, rows) of sql sorted on order_by, the rows read 
+        as they are iterated"""
+        probe = handle.cursor()
+        try:
+            probe.execute('SELECT * FROM (%s) LIMIT 0' % sql, args or ())
+            names = [ d[0] for d in probe.description or [] ]
+        finally:
+            probe.close()
+
+        sql = 'SELECT * FROM (%s) ORDER BY %s' % (sql, order_by)
+        return names, self._cursor(handle).iterate(sql, args, batch_size)
+
+
+    def _merged(self, sql, args, order_by, shards, batch_size):
+        if shards is None:
+            shards = self.shards()
+
+        # taken in one order, so two merges do not wait on each other
+        entries = []
+        partials = []
+        try:
+            for shard in sorted(shards):
+                entries.append(self._acquire(shard))
+                partials.append(self._stream(entries[-1].handle, sql, args, 
+                                            order_by, batch_size))
+            for row in mergeRows(partials, order_by):
+                yield row
+        finally:
+            for names, rows in partials:
+                rows.close()
+            for entry in entries:
+                self._release(entry)
+
+
+    def iterate_all(self, sql, args=None, order_by=None, shards=None, 
+                    batch_size=1000):
+        """yields the rows of every shard (or of shards), see ShardManager"""
+        if order_by:
+            checkColumn(order_by)
+            for row in self._merged(sql, args, order_by, shards, batch_size):
+                yield row
+            return
+
+        futures = self._submit(sql, args, shards)
+        done = Queue()
+        for future in futures:
+            future.add_done_callback(done.put)
+        for n in range(len(futures)):
+            names, rows = done.get().result()
+            for row in rows:
+                yield row
+
+
+    def execute_all(self, sql, args=None, order_by=None, shards=None):
+        return list(self.iterate_all(sql, args, order_by, shards))
+
+
+    def aggregate(self, sql, args=None, group_by=None, combine=None, 
+                    shards=None):
+        """combines sql's aggregate rows over every shard (or shards) into
+        tuples, see ShardManager"""
+        group_by = group_by or []
+        for name in group_by:
+            checkColumn(name)
+        if combine is not None:
+            for function in combine:
+                if function not in COMBINE:
+                    raise ValueError, 'combine not in %s' % COMBINE
+
+        groups = OrderedDict()
+        functions = None
+        keys = []
+        for future in self._submit(sql, args, shards, SQLiteCursor):
+            names, rows = future.result()
+            if functions is None and names:
+                for name in group_by:
+                    if name not in names:
+                        raise ValueError, 'group_by %r not in the columns %s'\
+                                % (name, names)
+                keys = sorted([ names.index(name) for name in group_by ])
+                if combine is None:
+                    functions = [ _combiner(name) for name in names ]
+                else:
+                    functions = list(combine)
+                    if len(functions) != len(names) - len(keys):
+                        raise ValueError, 'need one combine per column'
+                    for i in keys:
+                        functions.insert(i, None)
+
+            for row in rows:
+                group = tuple([ row[i] for i in keys ])
+                groups.setdefault(group, []).append(row)
+
+        if functions is None:
+            return []
+
+        result = []
+        for group, rows in groups.items():
+            result.append(tuple([ rows[0][i] if i in keys else 
+                        _combine(function, [ row[i] for row in rows ])
+                        for i, function in enumerate(functions) ]))
+        if group_by:
+            result.sort()
+        return result
+
+
+    # ------------------------------------------------------------------------
+
+    def stats(self):
+        return {
+            'open': len(self._open),
+            'opens': self.opens,
+            'hits': self.hits,
+            'evictions': self.evictions,
+        }
+
+
+    def close(self):
+        """closes every open shard not in use, and the worker threads when
+        they are the ShardManager's own"""
+        self._lock.acquire()
+        try:
+            for shard, entry in list(self._open.items()):
+                if entry.users:
+                    continue
+                del self._open[shard]
+                if entry.handle is not None:
+                    entry.handle.close()
+        finally:
+            self._lock.release()
+
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+# END: ShardManager
@@ -0,0 +1,121 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from collections import OrderedDict
+
+
+class StatementCache(object):
+    """example:
+        from y47.db.cursor import OracleCursor
+        cursor = OracleCursor(connection=connection, statement_cache=50)
+        for i in range(1000):
+            cursor.execute("SELECT * FROM TEST WHERE ID=:1", (i,))
+        print cursor.statements.stats()
+        {'capacity': 50, 'size': 1, 'hits': 999, 'misses': 1, 
+         'evictions': 0}
+
+        a least recently used cache of driver cursors keyed by sql text. 
+        the driver cursor for a statement is created (and prepared, where
+        the driver supports it) on the first miss and reused afterwards,
+        so the driver does not re-parse hot statements.  the least recently
+        used cursor is closed once more than capacity statements are cached.
+    """
+    def __init__(self, capacity=100):
+        if capacity < 1:
+            raise ValueError, 'capacity must be >= 1'
+
+        self._capacity = capacity
+        self._cursors = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    def _getCapacity(self):
+        return self._capacity
+
+    def _setCapacity(self, capacity):
+        if capacity < 1:
+            raise ValueError, 'capacity must be >= 1'
+
+        self._capacity = capacity
+        self._evict()
+
+    capacity = property(_getCapacity, _setCapacity, None, 'capacity property')
+
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def __contains__(self, sql):
+        return sql in self._cursors
+
+
+    def _evict(self):
+        while len(self._cursors) > self._capacity:
+            sql, cursor = self._cursors.popitem(last=False)
+            self.evictions += 1
+            cursor.close()
+
+
+    def get(self, sql, factory):
+        """returns the cached cursor for sql, calling factory(sql) to create
+        it on a miss"""
+        try:
+            cursor = self._cursors.pop(sql)
+            self.hits += 1
+        except KeyError:
+            cursor = factory(sql)
+            self.misses += 1
+
+        self._cursors[sql] = cursor
+        self._evict()
+        return cursor
+
+
+    def clear(self):
+        while self._cursors:
+            sql, cursor = self._cursors.popitem()
+            try:
+                cursor.close()
+            except Exception:
+                pass
+
+
+    def stats(self):
+        return {
+            'capacity': self._capacity,
+            'size': len(self._cursors),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+# END: StatementCache
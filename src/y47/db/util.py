@@ -0,0 +1,53 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+import re
+
+
+# the first word of a statement, after any opening parentheses
+VERB = re.compile(r'^\s*\(*\s*(\w+)')
+
+_column = re.compile(r'^[A-Za-z_]\w*$')
+
+
+def increment(owner, name):
+    """adds one to owner's name counter (i.e. a hits attribute) under 
+    owner._lock"""
+    owner._lock.acquire()
+    try:
+        setattr(owner, name, getattr(owner, name) + 1)
+    finally:
+        owner._lock.release()
+
+
+def checkColumn(name):
+    """raises ValueError unless name is a bare column name of a result, 
+    i.e. an order_by, not 'x DESC' or 't.x'"""
+    if not isinstance(name, basestring) or not _column.match(name):
+        raise ValueError, '%r is not a column name of the result (no ' \
+                'direction or table name)' % (name,)
@@ -0,0 +1,177 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db import FutureTimeout
+from y47.db.asynchronous import Executor, Future
+from y47.db.asynchronous import AsyncSQLiteConnection, AsyncSQLiteCursor
+import threading
+import time
+import unittest
+
+
+# Executor (5)
+class TestExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = Executor(max_workers=2)
+
+    def testMaxWorkersInvalid(self):
+        with self.assertRaises(ValueError):
+            Executor(max_workers=0)
+
+    def testSubmitResult(self):
+        self.assertEqual(self.executor.submit(pow, 2, 10).result(), 1024)
+
+    def testSubmitException(self):
+        future = self.executor.submit(int, 'foo')
+        with self.assertRaises(ValueError):
+            future.result()
+        self.assertTrue(isinstance(future.exception(), ValueError))
+
+    def testWorkersBounded(self):
+        futures = [ self.executor.submit(time.sleep, 0.01) 
+                    for i in range(10) ]
+        for future in futures:
+            future.result()
+        self.assertEqual(len(self.executor._workers), 2)
+
+    def testResultTimeout(self):
+        event = threading.Event()
+        future = self.executor.submit(event.wait)
+        with self.assertRaises(FutureTimeout):
+            future.result(timeout=0.01)
+        event.set()
+        future.result()
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+
+# Future (1)
+class TestFuture(unittest.TestCase):
+    def testDoneCallback(self):
+        done = []
+        future = Future()
+        future.add_done_callback(done.append)
+        self.assertEqual(done, [])
+        future._run(pow, (2, 2), {})
+        self.assertEqual(done, [future])
+        future.add_done_callback(done.append)
+        self.assertEqual(len(done), 2)
+
+
+# AsyncSQLiteCursor (11)
+class TestAsyncSQLiteCursor(unittest.TestCase):
+    def setUp(self):
+        self.executor = Executor(max_workers=4)
+        self.connection = AsyncSQLiteConnection(database=':memory:',
+                                                executor=self.executor)
+        self.cursor = AsyncSQLiteCursor(connection=self.connection)
+        self.cursor.execute("CREATE TABLE test (id INTEGER, name TEXT)")
+        self.cursor.execute_many("INSERT INTO test VALUES (?, ?)",
+                            [ (i, 'name%d' % i) for i in range(100) ])
+
+    def testExecuteConnectionNotSet(self):
+        with self.assertRaises(ValueError):
+            AsyncSQLiteCursor().execute("SELECT 1")
+
+    def testExecute(self):
+        future = self.cursor.execute("SELECT name FROM test WHERE id=?", (7,))
+        self.assertEqual(future.result(), [('name7',)])
+
+    def testManyInFlight(self):
+        futures = [ self.cursor.execute("SELECT id FROM test WHERE id=?", (i,))
+                    for i in range(100) ]
+        self.assertEqual([ f.result()[0][0] for f in futures ], range(100))
+
+    def testSerializedPerConnection(self):
+        self.cursor.execute("DELETE FROM test")
+        futures = [ self.cursor.execute("INSERT INTO test VALUES (?, 'x')", 
+                    (i,)) for i in range(20) ]
+        count = self.cursor.execute("SELECT COUNT(*) FROM test")
+        self.assertEqual(count.result()[0][0], 20)
+        self.assertEqual([ f.result() for f in futures ], [[]] * 20)
+
+    def testIterate(self):
+        rows = self.cursor.iterate("SELECT id FROM test ORDER BY id", 
+                                    batch_size=30)
+        self.assertEqual([ row[0] for row in rows ], range(100))
+
+    def testIterateHoldsConnection(self):
+        rows = self.cursor.iterate("SELECT id FROM test ORDER BY id", 
+                                    batch_size=30)
+        self.assertEqual(len(rows.next_batch().result()), 30)
+        count = self.cursor.execute("SELECT COUNT(*) FROM test")
+        time.sleep(0.05)
+        self.assertFalse(count.done())
+        self.assertEqual(len(list(rows)), 70)
+        self.assertEqual(count.result(), [(100,)])
+
+    def testIterateCloseReleases(self):
+        rows = self.cursor.iterate("SELECT id FROM test", batch_size=10)
+        rows.next_batch().result()
+        count = self.cursor.execute("SELECT COUNT(*) FROM test")
+        rows.close().result()
+        self.assertEqual(count.result(timeout=1), [(100,)])
+
+    def testIterateWaitsForEarlierCalls(self):
+        delete = self.cursor.execute("DELETE FROM test WHERE id >= 50")
+        rows = self.cursor.iterate("SELECT id FROM test", batch_size=10)
+        self.assertEqual(len(list(rows)), 50)
+        self.assertTrue(delete.done())
+
+    def testIterateBreakReleases(self):
+        for row in self.cursor.iterate("SELECT id FROM test", batch_size=10):
+            break
+        count = self.cursor.execute("SELECT COUNT(*) FROM test")
+        self.assertEqual(count.result(timeout=3), [(100,)])
+
+    def testIterateDroppedReleases(self):
+        rows = self.cursor.iterate("SELECT id FROM test", batch_size=10)
+        rows.next_batch().result()
+        del rows
+        count = self.cursor.execute("SELECT COUNT(*) FROM test")
+        self.assertEqual(count.result(timeout=3), [(100,)])
+
+    def testIterateBatches(self):
+        rows = self.cursor.iterate("SELECT id FROM test", batch_size=60)
+        self.assertEqual(len(rows.next_batch().result()), 60)
+        self.assertEqual(len(rows.next_batch().result()), 40)
+        self.assertEqual(rows.next_batch().result(), [])
+
+    def tearDown(self):
+        self.connection.close().result()
+        self.executor.shutdown()
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running asynchronous tests...'
+    unittest.main()
+
+# ============================================================================
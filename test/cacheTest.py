@@ -0,0 +1,179 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db.cache import CachingCursor, ResultCache, readTables, writeTable
+from y47.db.cache import mainStatement
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+import time
+import types
+import unittest
+
+
+# readTables/writeTable (7)
+class TestTables(unittest.TestCase):
+    def testReadSingle(self):
+        self.assertEqual(readTables("SELECT * FROM test WHERE id=?"), 
+                            set(['test']))
+
+    def testReadJoinsAndLists(self):
+        sql = """SELECT * FROM main.Test t, other AS o 
+                 JOIN `third` ON t.id = third.id"""
+        self.assertEqual(readTables(sql), set(['test', 'other', 'third']))
+
+    def testReadSubquery(self):
+        sql = "SELECT * FROM (SELECT id FROM inner_table) AS x"
+        self.assertEqual(readTables(sql), set(['inner_table']))
+
+    def testWriteTables(self):
+        self.assertEqual(writeTable("INSERT INTO Test VALUES (1)"), 'test')
+        self.assertEqual(writeTable("insert or replace into test values (1)"),
+                            'test')
+        self.assertEqual(writeTable("UPDATE test SET id=1"), 'test')
+        self.assertEqual(writeTable("DELETE FROM test"), 'test')
+        self.assertEqual(writeTable("REPLACE INTO test VALUES (1)"), 'test')
+
+    def testWriteQualified(self):
+        self.assertEqual(writeTable('UPDATE "main"."test" SET id=1'), 'test')
+
+    def testMainStatement(self):
+        self.assertEqual(mainStatement("WITH d AS (SELECT 1) DELETE FROM t"),
+                        "DELETE FROM t")
+        self.assertEqual(mainStatement("WITH RECURSIVE selected(n) AS "
+                        "(SELECT ')insert(') SELECT * FROM selected"),
+                        "SELECT * FROM selected")
+        self.assertEqual(mainStatement("UPDATE t SET a=1"), "UPDATE t SET a=1")
+
+    def testWriteUnknown(self):
+        self.assertEqual(writeTable("CREATE TABLE test (id INTEGER)"), None)
+
+
+# ResultCache (5)
+class TestResultCache(unittest.TestCase):
+    def testCapacityInvalid(self):
+        with self.assertRaises(ValueError):
+            ResultCache(capacity=0)
+
+    def testGetPut(self):
+        self.cache = ResultCache()
+        self.assertEqual(self.cache.get('a'), (False, None))
+        self.cache.put('a', [1], set(['test']))
+        self.assertEqual(self.cache.get('a'), (True, [1]))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def testLruEviction(self):
+        self.cache = ResultCache(capacity=2)
+        self.cache.put('a', 1, set())
+        self.cache.put('b', 2, set())
+        self.cache.get('a')
+        self.cache.put('c', 3, set())
+        self.assertEqual(self.cache.get('b'), (False, None))
+        self.assertEqual(self.cache.get('a'), (True, 1))
+        self.assertEqual(self.cache.evictions, 1)
+
+    def testTtl(self):
+        self.cache = ResultCache(ttl=0.01)
+        self.cache.put('a', 1, set())
+        time.sleep(0.02)
+        self.assertEqual(self.cache.get('a'), (False, None))
+        self.assertEqual(self.cache.expirations, 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def testInvalidate(self):
+        self.cache = ResultCache()
+        self.cache.put('a', 1, set(['test']))
+        self.cache.put('b', 2, set(['test', 'other']))
+        self.cache.put('c', 3, set(['other']))
+        self.assertEqual(self.cache.invalidate('TEST'), 2)
+        self.assertEqual(self.cache.get('c'), (True, 3))
+        self.assertEqual(self.cache.invalidate('test'), 0)
+
+
+# CachingCursor (8)
+class TestCachingCursor(unittest.TestCase):
+    def setUp(self):
+        self.connection = SQLiteConnection(database=':memory:').connect
+        self.connection.execute("CREATE TABLE test (id INTEGER, name TEXT)")
+        self.connection.execute("INSERT INTO test VALUES (1, 'Glenn')")
+        self.cursor = CachingCursor(SQLiteCursor(connection=self.connection))
+
+    def testCursorNotSet(self):
+        with self.assertRaises(ValueError):
+            CachingCursor().execute("SELECT 1")
+
+    def testSelectIsCached(self):
+        first = self.cursor.execute("SELECT name FROM test WHERE id=?", [1])
+        second = self.cursor.execute("SELECT name FROM test WHERE id=?", (1,))
+        self.assertTrue(first is second)
+        self.assertEqual(self.cursor.cache.hits, 1)
+
+    def testKeyIncludesRowType(self):
+        self.cursor.execute("SELECT * FROM test")
+        self.cursor.cursor.row_type = types.DictionaryType
+        results = self.cursor.execute("SELECT * FROM test")
+        self.assertEqual(results[0]['name'], 'Glenn')
+
+    def testWriteInvalidatesTable(self):
+        self.cursor.execute("SELECT name FROM test WHERE id=1")
+        self.cursor.execute("UPDATE test SET name='Norton' WHERE id=1")
+        results = self.cursor.execute("SELECT name FROM test WHERE id=1")
+        self.assertEqual(results[0][0], 'Norton')
+
+    def testExecuteManyInvalidatesTable(self):
+        self.cursor.execute("SELECT COUNT(*) FROM test")
+        self.cursor.execute_many("INSERT INTO test VALUES (?, ?)", 
+                                    [(2, 'a'), (3, 'b')])
+        self.assertEqual(self.cursor.execute("SELECT COUNT(*) FROM test")[0][0],
+                            3)
+
+    def testWithSelectIsCached(self):
+        sql = "WITH d AS (SELECT 1 AS id) SELECT name FROM test JOIN d USING(id)"
+        self.assertTrue(self.cursor.execute(sql) is self.cursor.execute(sql))
+
+    def testWithDeleteInvalidatesTable(self):
+        self.cursor.execute("SELECT * FROM test")
+        self.cursor.execute("WITH d AS (SELECT 1) "
+                            "DELETE FROM test WHERE id IN d")
+        self.assertEqual(self.cursor.execute("SELECT * FROM test"), [])
+
+    def testOtherStatementClearsCache(self):
+        self.cursor.execute("SELECT * FROM test")
+        self.cursor.execute("CREATE TABLE other (id INTEGER)")
+        self.assertEqual(len(self.cursor.cache), 0)
+
+    def tearDown(self):
+        self.connection.close()
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running cache tests...'
+    unittest.main()
+
+# ============================================================================
@@ -0,0 +1,100 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db import column
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor, SQLiteDictionaryCursor
+from array import array
+import unittest
+
+
+# columns (7)
+class TestColumns(unittest.TestCase):
+    def setUp(self):
+        self.connection = SQLiteConnection(database=':memory:').connect
+        self.connection.execute(
+                "CREATE TABLE test (id INTEGER, value REAL, name TEXT, n)")
+        self.connection.executemany("INSERT INTO test VALUES (?, ?, ?, ?)",
+                [ (i, i * 0.5, 'name%d' % i, i) for i in range(10) ])
+        self.cursor = SQLiteCursor(connection=self.connection)
+
+    def testConnectionNotSet(self):
+        with self.assertRaises(ValueError):
+            SQLiteCursor().columns("SELECT * FROM test")
+
+    def testColumnOrder(self):
+        columns = self.cursor.columns("SELECT * FROM test", numpy=False)
+        self.assertEqual(columns.keys(), ['id', 'value', 'name', 'n'])
+
+    def testArrayColumns(self):
+        columns = self.cursor.columns("SELECT * FROM test ORDER BY id", 
+                                        batch_size=3, numpy=False)
+        self.assertEqual(columns['id'], array('l', range(10)))
+        self.assertEqual(columns['value'], 
+                            array('d', [ i * 0.5 for i in range(10) ]))
+        self.assertEqual(columns['name'], [ 'name%d' % i for i in range(10) ])
+
+    def testNullFallsBackToList(self):
+        self.connection.execute("INSERT INTO test VALUES (10, 5.0, 'x', NULL)")
+        columns = self.cursor.columns("SELECT n FROM test ORDER BY id", 
+                                        batch_size=4, numpy=False)
+        self.assertEqual(columns['n'], range(10) + [None])
+
+    def testMixedTypesFallBackToList(self):
+        self.connection.execute("INSERT INTO test VALUES (10, 5.0, 'x', 'y')")
+        columns = self.cursor.columns("SELECT n FROM test ORDER BY id", 
+                                        batch_size=4, numpy=False)
+        self.assertEqual(columns['n'], range(10) + ['y'])
+
+    def testDictionaryCursorColumns(self):
+        self.cursor = SQLiteDictionaryCursor(connection=self.connection)
+        columns = self.cursor.columns("SELECT id FROM test ORDER BY id",
+                                        numpy=False)
+        self.assertEqual(list(columns['id']), range(10))
+
+    def testNumpy(self):
+        numpy = column._importNumpy()
+        columns = self.cursor.columns("SELECT id, name FROM test ORDER BY id")
+        if numpy is None:
+            self.assertEqual(columns['id'], array('l', range(10)))
+        else:
+            self.assertTrue(isinstance(columns['id'], numpy.ndarray))
+            self.assertEqual(columns['id'].tolist(), range(10))
+        self.assertEqual(columns['name'][0], 'name0')
+
+    def tearDown(self):
+        self.connection.close()
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running column tests...'
+    unittest.main()
+
+# ============================================================================
@@ -26,8 +26,14 @@
 #
 #####
 
+from y47.db import DatabaseException
+from y47.db import connection as connection_module
 from y47.db.connection import Connection, SQLiteConnection
 from y47.db.connection import MySQLConnection, OracleConnection
+from y47.db.cursor import SQLiteCursor
+from y47.db.driver import driver
+import pickle
+import threading
 import unittest
 
 
@@ -43,7 +49,201 @@ class TestConnection(unittest.TestCase):
             self.connection._connect()
 
 
-# SQLiteConnection (12)
+class CountingDriver(object):
+    """the sqlite driver, counting connect() calls"""
+    def __init__(self, module):
+        self.module = module
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.module, name)
+
+    def connect(self, *args, **kwargs):
+        with self.lock:
+            self.calls += 1
+        return self.module.connect(*args, **kwargs)
+
+
+class FlakyConnection(SQLiteConnection):
+    """fails the first failures connects, like a server coming back up"""
+    def __init__(self, failures):
+        SQLiteConnection.__init__(self, database=':memory:')
+        self.failures = failures
+        self.calls = 0
+
+    def _connect(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise driver('sqlite').OperationalError('database is locked')
+        return SQLiteConnection._connect(self)
+
+
+# Connection lifecycle (18)
+class TestConnectionLifecycle(unittest.TestCase):
+    def setUp(self):
+        self.sqlite = SQLiteConnection(database=FILENAME)
+
+    def testOpenIsCached(self):
+        db = self.sqlite.open()
+        self.assertTrue(self.sqlite.open() is db)
+        self.assertTrue(self.sqlite.connect is db)
+
+    def testCloseReopens(self):
+        db = self.sqlite.open()
+        self.sqlite.close()
+        self.assertFalse(self.sqlite.open() is db)
+
+    def testContextManager(self):
+        with SQLiteConnection(database=FILENAME) as db:
+            self.assertEqual(db.execute('SELECT name FROM test').fetchone(),
+                            ('Glenn',))
+        with self.assertRaises(driver('sqlite').ProgrammingError):
+            db.execute('SELECT 1')
+
+    def testReconnectWhenDead(self):
+        self.sqlite.ping_interval = 0
+        db = self.sqlite.open()
+        db.close()
+        self.assertFalse(self.sqlite.open() is db)
+        self.assertEqual(self.sqlite.open().execute('SELECT 1').fetchone(),
+                        (1,))
+
+    def testClosedHandleReplaced(self):
+        db = self.sqlite.connect
+        db.close()
+        self.assertFalse(self.sqlite.connect is db)
+        self.assertEqual(self.sqlite.connect.execute('SELECT 1').fetchone(),
+                        (1,))
+
+    def testPingInterval(self):
+        pings = []
+        self.sqlite._ping = pings.append
+        self.sqlite.ping_interval = 60
+        db = self.sqlite.open()
+        self.assertTrue(self.sqlite.open() is db)
+        self.assertEqual(pings, [])
+        self.sqlite.ping_interval = 0
+        self.assertTrue(self.sqlite.open() is db)
+        self.assertEqual(pings, [db])
+
+    def testSettingDropsHandle(self):
+        db = self.sqlite.open()
+        self.sqlite.mmap_size = 1 << 20
+        with self.assertRaises(driver('sqlite').ProgrammingError):
+            db.execute('SELECT 1')
+        self.assertEqual(self.sqlite.open().execute('PRAGMA mmap_size'
+                        ).fetchone(), (1 << 20,))
+
+    def testCloseClosesEveryThread(self):
+        sqlite = SQLiteConnection(database=FILENAME, check_same_thread=False)
+        handles = []
+        thread = threading.Thread(target=lambda: handles.append(sqlite.open()))
+        thread.start()
+        thread.join()
+        sqlite.close()
+        with self.assertRaises(driver('sqlite').ProgrammingError):
+            handles[0].execute('SELECT 1')
+
+    def testOtherThreadReconnectsAfterClose(self):
+        opened, closed = threading.Event(), threading.Event()
+        handles = []
+        def work():
+            handles.append(self.sqlite.open())
+            opened.set()
+            closed.wait()
+            handles.append(self.sqlite.open())
+        thread = threading.Thread(target=work)
+        thread.start()
+        opened.wait()
+        self.sqlite.close()
+        closed.set()
+        thread.join()
+        self.assertFalse(handles[1] is handles[0])
+
+    def testHandlePerThread(self):
+        handles = []
+        thread = threading.Thread(target=lambda: 
+                                    handles.append(self.sqlite.open()))
+        thread.start()
+        thread.join()
+        self.assertFalse(self.sqlite.open() is handles[0])
+
+    def testDriverConnectCallsUnderLoad(self):
+        counting = CountingDriver(driver('sqlite'))
+        saved = connection_module.driver
+        connection_module.driver = lambda backend: counting
+        try:
+            def work():
+                for i in range(200):
+                    cursor = SQLiteCursor(connection=self.sqlite.connect)
+                    cursor.execute('SELECT * FROM test')
+
+            threads = [ threading.Thread(target=work) for i in range(8) ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.sqlite.close()
+        finally:
+            connection_module.driver = saved
+
+        self.assertEqual(counting.calls, 8)
+
+    def testRetriesWithBackoff(self):
+        flaky = FlakyConnection(failures=2)
+        flaky.backoff = 0.001
+        self.assertEqual(flaky.open().execute('SELECT 1').fetchone(), (1,))
+        self.assertEqual(flaky.calls, 3)
+
+    def testRetriesExhausted(self):
+        flaky = FlakyConnection(failures=10)
+        flaky.retries = 2
+        flaky.backoff = 0
+        with self.assertRaises(DatabaseException):
+            flaky.open()
+        self.assertEqual(flaky.calls, 3)
+
+    def testPermanentErrorNotRetried(self):
+        counting = CountingDriver(driver('sqlite'))
+        saved = connection_module.driver
+        connection_module.driver = lambda backend: counting
+        try:
+            sqlite = SQLiteConnection(database='missing/test.db')
+            sqlite.backoff = 10
+            with self.assertRaises(DatabaseException):
+                sqlite.open()
+        finally:
+            connection_module.driver = saved
+        self.assertEqual(counting.calls, 1)
+
+    def testConnectRaisesDriverError(self):
+        sqlite = SQLiteConnection(database='missing/test.db')
+        with self.assertRaises(driver('sqlite').OperationalError):
+            sqlite._connect()
+
+    def testValueErrorNotRetried(self):
+        with self.assertRaises(ValueError):
+            SQLiteConnection().open()
+
+    def testPickleDropsHandle(self):
+        db = self.sqlite.open()
+        sqlite = pickle.loads(pickle.dumps(self.sqlite))
+        self.assertEqual(sqlite.database, FILENAME)
+        self.assertFalse(sqlite.open() is db)
+        sqlite.close()
+
+    def testDefaults(self):
+        self.assertEqual((self.sqlite.retries, self.sqlite.backoff, 
+                        self.sqlite.ping_interval), (3, 0.1, 30))
+
+    def tearDown(self):
+        self.sqlite.close()
+
+
+# ============================================================================
+
+# SQLiteConnection (24)
 class TestSQLiteConnection(unittest.TestCase):
 
     # database from __init__
@@ -120,9 +320,101 @@ class TestSQLiteConnection(unittest.TestCase):
         db.close()
 
 
+    # cached_statements
+    def testCachedStatementsDefault(self):
+        self.sqlite = SQLiteConnection()
+        self.assertEqual(self.sqlite.cached_statements, 100)
+
+    def testCachedStatementsProperty(self):
+        self.sqlite = SQLiteConnection(database=':memory:')
+        self.sqlite.cached_statements = 10
+        self.assertEqual(self.sqlite.cached_statements, 10)
+        self.assertTrue('sqlite3.Connection' in repr(self.sqlite.connect))
+
+
+    # profile
+    def testProfileDefault(self):
+        self.sqlite = SQLiteConnection()
+        self.assertEqual(self.sqlite.profile, None)
+
+    def testProfileNotInProfiles(self):
+        with self.assertRaises(ValueError):
+            self.sqlite = SQLiteConnection(profile='FOO')
+
+    def testProfileReadHeavy(self):
+        import os, shutil, tempfile
+        tmp = tempfile.mkdtemp()
+        try:
+            self.sqlite = SQLiteConnection(database=os.path.join(tmp, 'p.db'),
+                                            profile='read_heavy')
+            db = self.sqlite.connect
+            self.assertEqual(db.execute('PRAGMA journal_mode').fetchone(),
+                            ('wal',))
+            self.assertEqual(db.execute('PRAGMA synchronous').fetchone(),
+                            (1,))
+            self.assertEqual(db.execute('PRAGMA busy_timeout').fetchone(),
+                            (5000,))
+            db.close()
+        finally:
+            shutil.rmtree(tmp)
+
+    def testProfileBulkLoad(self):
+        self.sqlite = SQLiteConnection(database=':memory:')
+        self.sqlite.profile = 'bulk_load'
+        db = self.sqlite.connect
+        self.assertEqual(db.execute('PRAGMA synchronous').fetchone(), (0,))
+        self.assertEqual(db.execute('PRAGMA cache_size').fetchone(), 
+                        (-262144,))
+        db.close()
+
+
+    # read_only, immutable, mmap_size
+    def testReadOnlyDefault(self):
+        self.sqlite = SQLiteConnection()
+        self.assertEqual((self.sqlite.read_only, self.sqlite.immutable,
+                        self.sqlite.mmap_size), (False, False, None))
+
+    def testReadOnlyMemory(self):
+        self.sqlite = SQLiteConnection(database=':memory:', read_only=True)
+        with self.assertRaises(ValueError):
+            self.sqlite.connect
+
+    def testReadOnlyURI(self):
+        from y47.db.connection import _readOnlyURI
+        self.assertEqual(_readOnlyURI('/tmp/a b.db', immutable=True),
+                        'file:/tmp/a%20b.db?mode=ro&immutable=1')
+
+    def testReadOnly(self):
+        self.sqlite = SQLiteConnection(database=FILENAME, read_only=True,
+                                        immutable=True)
+        db = self.sqlite.connect
+        self.assertEqual(db.execute('SELECT name FROM test').fetchone(),
+                        ('Glenn',))
+        with self.assertRaises(Exception):
+            db.execute("INSERT INTO test VALUES (2, 'Glenn')")
+        db.close()
+
+    def testReadOnlyFileDoesNotExist(self):
+        import os.path
+        f = 'filedoesnotexist.db'
+        self.sqlite = SQLiteConnection(database=f, read_only=True)
+        self.sqlite.retries = 0
+        with self.assertRaises(DatabaseException):
+            self.sqlite.connect
+        self.assertEqual(os.path.isfile(f), False)
+
+    def testMmapSize(self):
+        self.sqlite = SQLiteConnection(database=FILENAME, read_only=True,
+                                        mmap_size=1 << 20)
+        db = self.sqlite.connect
+        self.assertEqual(db.execute('PRAGMA mmap_size').fetchone(), 
+                        (1 << 20,))
+        db.close()
+
+
 # ============================================================================
 
-# MySQLConnection (25)
+# MySQLConnection (27)
 class TestMySQLConnection(unittest.TestCase):
 
     # host from __init__
@@ -270,6 +562,17 @@ class TestMySQLConnection(unittest.TestCase):
         db.close()
 
 
+    # local_infile
+    def testLocalInfileIsOffByDefault(self):
+        self.connection = MySQLConnection()
+        self.assertEqual(self.connection.local_infile, 0)
+
+    def testLocalInfileProperty(self):
+        self.connection = MySQLConnection()
+        self.connection.local_infile = 1
+        self.assertEqual(self.connection.local_infile, 1)
+
+
 # ============================================================================
 
 # OracleConnection (26)
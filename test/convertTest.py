@@ -0,0 +1,270 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db.connection import SQLiteConnection
+from y47.db.convert import Converters, toDecimal, toDatetime, toDate
+from y47.db.convert import fromJSON, readLOB, toUnicode
+from y47.db.cursor import SQLiteCursor, SQLiteDictionaryCursor
+from y47.db.cursor import OracleCursor, OracleDictionaryCursor
+from y47.db.row import Record
+from fakeOracle import FakeOracleConnection, FakeOracleCursor
+import datetime
+import decimal
+import types
+import unittest
+
+
+class FakeLOB(object):
+    def __init__(self, value):
+        self._value = value
+
+    def read(self):
+        return self._value
+
+
+class ExpiringLOB(FakeLOB):
+    """a LOB that, like cx_Oracle's, cannot be read after the next fetch"""
+    valid = True
+
+    def read(self):
+        if not self.valid:
+            raise ValueError, 'LOB variable no longer valid after ' \
+                                'subsequent fetch'
+        return self._value
+
+
+class ExpiringLOBCursor(FakeOracleCursor):
+    def fetchmany(self, count=None):
+        for row in getattr(self, '_fetched', []):
+            row[1].valid = False
+        rows = [ (i, ExpiringLOB(value)) for i, value in 
+                    FakeOracleCursor.fetchmany(self, count) ]
+        self._fetched = rows
+        return rows
+
+
+class ExpiringLOBConnection(FakeOracleConnection):
+    cursor_class = ExpiringLOBCursor
+
+
+# converters (6)
+class TestConverterFunctions(unittest.TestCase):
+    def testToDecimal(self):
+        self.assertEqual(toDecimal(0.1), decimal.Decimal('0.1'))
+        self.assertEqual(toDecimal('12.50'), decimal.Decimal('12.50'))
+        self.assertEqual(toDecimal(3), decimal.Decimal(3))
+
+    def testToDatetime(self):
+        self.assertEqual(toDatetime('2012-03-04 05:06:07'), 
+                        datetime.datetime(2012, 3, 4, 5, 6, 7))
+        self.assertEqual(toDatetime('2012-03-04T05:06:07.5'), 
+                        datetime.datetime(2012, 3, 4, 5, 6, 7, 500000))
+        with self.assertRaises(ValueError):
+            toDatetime('yesterday')
+
+    def testToDate(self):
+        self.assertEqual(toDate('2012-03-04'), datetime.date(2012, 3, 4))
+        self.assertEqual(toDate(datetime.datetime(2012, 3, 4, 5)), 
+                        datetime.date(2012, 3, 4))
+
+    def testFromJSON(self):
+        self.assertEqual(fromJSON('{"a": [1, 2]}'), {'a': [1, 2]})
+        self.assertEqual(fromJSON(FakeLOB('[1]')), [1])
+
+    def testReadLOB(self):
+        self.assertEqual(readLOB(FakeLOB('text')), 'text')
+        self.assertEqual(readLOB('text'), 'text')
+
+    def testToUnicode(self):
+        self.assertEqual(toUnicode('caf\xc3\xa9'), u'caf\xe9')
+
+
+DESCRIPTION = [('ID', 'NUMBER'), ('PRICE', 'NUMBER'), ('NAME', 'STRING')]
+
+
+# Converters (9)
+class TestConverters(unittest.TestCase):
+    def setUp(self):
+        self.converters = Converters()
+        self.converters.register(toDecimal, name='price')
+
+    def testNeedNameOrType(self):
+        with self.assertRaises(ValueError):
+            self.converters.register(int)
+        with self.assertRaises(ValueError):
+            self.converters.register(int, name='ID', type='NUMBER')
+
+    def testNoConverters(self):
+        self.assertEqual(Converters().compile(DESCRIPTION), None)
+
+    def testByName(self):
+        transform = self.converters.compile(DESCRIPTION)
+        self.assertEqual(transform((1, '1.5', 'a')), 
+                        (1, decimal.Decimal('1.5'), 'a'))
+
+    def testNullNotConverted(self):
+        transform = self.converters.compile(DESCRIPTION)
+        self.assertEqual(transform((1, None, 'a')), (1, None, 'a'))
+
+    def testByTypeNameFirst(self):
+        self.converters.register(float, type='NUMBER')
+        transform = self.converters.compile(DESCRIPTION)
+        self.assertEqual(transform(('1', '1.5', 'a')), 
+                        (1.0, decimal.Decimal('1.5'), 'a'))
+
+    def testRowShapes(self):
+        row = (1, '1.5', 'a')
+        transform = self.converters.compile(DESCRIPTION, types.DictType)
+        self.assertEqual(transform(row), {'ID': 1, 'NAME': 'a',
+                        'PRICE': decimal.Decimal('1.5')})
+        transform = self.converters.compile(DESCRIPTION, Record)
+        self.assertEqual(transform(row).PRICE, decimal.Decimal('1.5'))
+
+    def testKeyed(self):
+        transform = self.converters.compile(DESCRIPTION, types.DictType, 
+                                            keyed=True)
+        self.assertEqual(transform({'ID': 1, 'PRICE': '2', 'NAME': 'a'}), 
+                        {'ID': 1, 'PRICE': decimal.Decimal(2), 'NAME': 'a'})
+
+    def testCompiledOnce(self):
+        self.assertTrue(self.converters.compile(DESCRIPTION) is 
+                        self.converters.compile(DESCRIPTION))
+
+    def testUnregister(self):
+        self.converters.unregister(name='PRICE')
+        self.assertEqual(self.converters.compile(DESCRIPTION), None)
+
+
+# Cursor converters (9)
+class TestCursorConverters(unittest.TestCase):
+    def setUp(self):
+        self.connection = SQLiteConnection(database=':memory:').connect
+        self.connection.execute('CREATE TABLE items(id INTEGER, '
+                                'created TEXT, attributes TEXT)')
+        self.connection.execute("INSERT INTO items VALUES(1, "
+                        "'2012-03-04 05:06:07', '{\"size\": 3}')")
+        self.connection.execute("INSERT INTO items VALUES(2, NULL, NULL)")
+        self.converters = Converters()
+        self.converters.register(toDatetime, name='created')
+        self.converters.register(fromJSON, name='attributes')
+
+    def testTuples(self):
+        cursor = SQLiteCursor(connection=self.connection, 
+                                converters=self.converters)
+        self.assertEqual(cursor.execute('SELECT * FROM items'), [
+                        (1, datetime.datetime(2012, 3, 4, 5, 6, 7), 
+                        {'size': 3}), (2, None, None)])
+
+    def testDictionaries(self):
+        for cursor in [SQLiteDictionaryCursor(connection=self.connection, 
+                                                converters=self.converters),
+                        SQLiteCursor(connection=self.connection, 
+                                        converters=self.converters,
+                                        row_type=types.DictionaryType)]:
+            rows = cursor.execute('SELECT id, attributes FROM items')
+            self.assertEqual(rows[0], {'id': 1, 'attributes': {'size': 3}})
+
+    def testRecords(self):
+        cursor = SQLiteCursor(connection=self.connection, row_type=Record,
+                                converters=self.converters)
+        row = cursor.execute('SELECT id, created FROM items')[0]
+        self.assertEqual(row.created.year, 2012)
+
+    def testIterate(self):
+        cursor = SQLiteCursor(connection=self.connection, 
+                                converters=self.converters)
+        rows = list(cursor.iterate('SELECT attributes FROM items', 
+                                    batch_size=1))
+        self.assertEqual(rows, [({'size': 3},), (None,)])
+
+    def testUnconvertedColumns(self):
+        cursor = SQLiteCursor(connection=self.connection, 
+                                converters=self.converters)
+        self.assertEqual(cursor.execute('SELECT id FROM items'), 
+                        [(1,), (2,)])
+
+    def testOracleTypes(self):
+        converters = Converters()
+        converters.register(readLOB, type='CLOB')
+        connection = FakeOracleConnection([(1, FakeLOB('text'))], 
+                                        [('ID', 'NUMBER'), ('DOC', 'CLOB')])
+        cursor = OracleCursor(connection=connection, converters=converters)
+        self.assertEqual(cursor.execute('SELECT * FROM DOCS'), [(1, 'text')])
+        cursor = OracleCursor(connection=connection, converters=converters,
+                                row_type=types.DictionaryType, lazy=True)
+        self.assertEqual(cursor.execute('SELECT * FROM DOCS')[0]['DOC'], 
+                        'text')
+
+    def _lobs(self):
+        converters = Converters()
+        converters.register(readLOB, type='CLOB')
+        return converters, ExpiringLOBConnection(
+                    [ (i, '{"id": %d}' % i) for i in range(250) ],
+                    [('ID', 'NUMBER'), ('DOC', 'CLOB')])
+
+    def testLOBsReadBeforeNextFetch(self):
+        converters, connection = self._lobs()
+        cursor = OracleCursor(connection=connection, converters=converters)
+        rows = cursor.execute('SELECT * FROM DOCS')
+        self.assertEqual(len(rows), 250)
+        self.assertEqual(rows[-1], (249, '{"id": 249}'))
+        cursor = OracleDictionaryCursor(connection=connection, 
+                                        converters=converters)
+        self.assertEqual(cursor.execute('SELECT * FROM DOCS')[0]['DOC'],
+                        '{"id": 0}')
+
+    def testLazyLOBsReadBeforeNextFetch(self):
+        converters, connection = self._lobs()
+        cursor = OracleCursor(connection=connection, converters=converters,
+                                row_type=types.DictionaryType, lazy=True)
+        rows = cursor.execute('SELECT * FROM DOCS')
+        self.assertEqual(rows[0]['DOC'], '{"id": 0}')
+        self.assertEqual(rows[249]['DOC'], '{"id": 249}')
+        self.assertEqual(rows[0]['DOC'], '{"id": 0}')
+
+    def testLazyConvertsOnce(self):
+        converters = Converters()
+        converters.register(fromJSON, name='DOC')
+        connection = FakeOracleConnection([(1, '{"id": 1}')], 
+                                        [('ID', 'NUMBER'), ('DOC', 'CLOB')])
+        cursor = OracleCursor(connection=connection, converters=converters,
+                                row_type=types.DictionaryType, lazy=True)
+        rows = cursor.execute('SELECT * FROM DOCS')
+        self.assertTrue(rows[0]['DOC'] is rows[0]['DOC'])
+
+    def tearDown(self):
+        self.connection.close()
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running convert tests...'
+    unittest.main()
+
+# ============================================================================
@@ -57,7 +57,7 @@ class TestCursor(unittest.TestCase):
 # ============================================================================
 
 
-# SQLiteCursor (10)
+# SQLiteCursor (17)
 class TestSQLiteCursor(unittest.TestCase):
     def setUp(self):
         self.connection = SQLiteConnection(database=FILENAME).connect
@@ -115,6 +115,66 @@ class TestSQLiteCursor(unittest.TestCase):
         self.assertEqual(results[0][1], 'Glenn')
 
 
+    # iterate
+    def testIterateConnectionNotSet(self):
+        self.cursor = SQLiteCursor()
+        with self.assertRaises(ValueError):
+            self.cursor.iterate("SELECT * FROM test")
+
+    def testIterateName(self):
+        self.cursor = SQLiteCursor(connection=self.connection)
+        results = list(self.cursor.iterate("SELECT * FROM test WHERE name=?",
+                                    ('Glenn',), batch_size=1))
+        self.assertEqual(results[0][1], 'Glenn')
+
+
+    # execute_many
+    def testExecuteManyConnectionNotSet(self):
+        self.cursor = SQLiteCursor()
+        with self.assertRaises(ValueError):
+            self.cursor.execute_many("INSERT INTO test VALUES (?, ?)", [])
+
+    def testExecuteManyGenerator(self):
+        memory = SQLiteConnection(database=':memory:').connect
+        memory.execute("CREATE TABLE bulk (id INTEGER PRIMARY KEY, name TEXT)")
+        self.cursor = SQLiteCursor(connection=memory)
+        rows = ( (i, 'name%d' % i) for i in range(25) )
+        result = self.cursor.execute_many("INSERT INTO bulk VALUES (?, ?)",
+                                            rows, chunk_size=10)
+        self.assertEqual((result.rows, result.chunks), (25, 3))
+        self.assertEqual(self.cursor.execute("SELECT COUNT(*) FROM bulk")[0][0],
+                            25)
+
+    def testExecuteManyRollsBackFailedChunk(self):
+        memory = SQLiteConnection(database=':memory:').connect
+        memory.execute("CREATE TABLE bulk (id INTEGER PRIMARY KEY, name TEXT)")
+        self.cursor = SQLiteCursor(connection=memory)
+        rows = [ (i, 'name') for i in range(10) ] + [ (0, 'duplicate') ]
+        with self.assertRaises(Exception):
+            self.cursor.execute_many("INSERT INTO bulk VALUES (?, ?)", rows,
+                                        chunk_size=4)
+        self.assertEqual(self.cursor.execute("SELECT COUNT(*) FROM bulk")[0][0],
+                            8)
+
+
+    # row factory is per cursor
+    def testDictionaryRowsLeaveConnectionAlone(self):
+        SQLiteDictionaryCursor(connection=self.connection).execute(
+                                                    "SELECT * FROM test")
+        SQLiteCursor(connection=self.connection, 
+                row_type=types.DictionaryType).execute("SELECT * FROM test")
+        self.assertEqual(self.connection.row_factory, None)
+
+    def testTupleRowsAfterDictionaryRows(self):
+        dictionary = SQLiteDictionaryCursor(connection=self.connection)
+        self.cursor = SQLiteCursor(connection=self.connection)
+        dictionary.execute("SELECT * FROM test")
+        results = self.cursor.execute("SELECT * FROM test")
+        self.assertTrue(type(results[0]) is types.TupleType)
+        self.assertEqual(dictionary.execute("SELECT * FROM test")[0]['name'],
+                            'Glenn')
+
+
     def tearDown(self):
         self.connection = None
         del self.connection
@@ -123,7 +183,7 @@ class TestSQLiteCursor(unittest.TestCase):
 # ============================================================================
 
 
-# SQLiteDictionaryCursor (7)
+# SQLiteDictionaryCursor (9)
 class TestSQLiteDictionaryCursor(unittest.TestCase):
     def setUp(self):
         self.connection = SQLiteConnection(database=FILENAME).connect
@@ -165,6 +225,19 @@ class TestSQLiteDictionaryCursor(unittest.TestCase):
         self.assertEqual(results[0]['name'], 'Glenn')
 
 
+    # iterate
+    def testIterateConnectionNotSet(self):
+        self.cursor = SQLiteDictionaryCursor()
+        with self.assertRaises(ValueError):
+            self.cursor.iterate("SELECT * FROM test")
+
+    def testIterateName(self):
+        self.cursor = SQLiteDictionaryCursor(connection=self.connection)
+        results = list(self.cursor.iterate("SELECT * FROM test WHERE name=?",
+                                    ('Glenn',), batch_size=1))
+        self.assertEqual(results[0]['name'], 'Glenn')
+
+
     def tearDown(self):
         self.connection = None
         del self.connection
@@ -173,7 +246,7 @@ class TestSQLiteDictionaryCursor(unittest.TestCase):
 # ============================================================================
 
 
-# MySQLCursor (10)
+# MySQLCursor (13)
 class TestMySQLCursor(unittest.TestCase):
     def setUp(self):
         self.connection = MySQLConnection(host='localhost', user='y47test', 
@@ -230,6 +303,26 @@ class TestMySQLCursor(unittest.TestCase):
         self.assertEqual(results[0][1], 'Glenn')
 
 
+    # iterate
+    def testIterateConnectionNotSet(self):
+        self.cursor = MySQLCursor()
+        with self.assertRaises(ValueError):
+            self.cursor.iterate("SELECT * FROM test")
+
+    def testIterateName(self):
+        self.cursor = MySQLCursor(connection=self.connection)
+        results = list(self.cursor.iterate("SELECT * FROM test WHERE name=%s",
+                                    ('Glenn',), batch_size=1))
+        self.assertEqual(results[0][1], 'Glenn')
+
+
+    # execute_many
+    def testExecuteManyConnectionNotSet(self):
+        self.cursor = MySQLCursor()
+        with self.assertRaises(ValueError):
+            self.cursor.execute_many("INSERT INTO test VALUES (%s)", [])
+
+
     def tearDown(self):
         self.connection = None
         del self.connection
@@ -238,7 +331,7 @@ class TestMySQLCursor(unittest.TestCase):
 # ============================================================================
 
 
-# MySQLDictionaryCursor (7)
+# MySQLDictionaryCursor (9)
 class TestMySQLDictionaryCursor(unittest.TestCase):
     def setUp(self):
         self.connection = MySQLConnection(host='localhost', user='y47test', 
@@ -281,6 +374,19 @@ class TestMySQLDictionaryCursor(unittest.TestCase):
         self.assertEqual(results[0]['name'], 'Glenn')
 
 
+    # iterate
+    def testIterateConnectionNotSet(self):
+        self.cursor = MySQLDictionaryCursor()
+        with self.assertRaises(ValueError):
+            self.cursor.iterate("SELECT * FROM test")
+
+    def testIterateName(self):
+        self.cursor = MySQLDictionaryCursor(connection=self.connection)
+        results = list(self.cursor.iterate("SELECT * FROM test WHERE name=%s",
+                                    ('Glenn',), batch_size=1))
+        self.assertEqual(results[0]['name'], 'Glenn')
+
+
     def tearDown(self):
         self.connection = None
         del self.connection
@@ -289,7 +395,7 @@ class TestMySQLDictionaryCursor(unittest.TestCase):
 # ============================================================================
 
 
-# OracleCursor (9)
+# OracleCursor (12)
 class TestOracleCursor(unittest.TestCase):
     def setUp(self):
         self.connection = OracleConnection(host='127.0.0.1', user='y47test', 
@@ -342,6 +448,26 @@ class TestOracleCursor(unittest.TestCase):
         self.assertEqual(results[0][0], 'Glenn')
 
 
+    # iterate
+    def testIterateConnectionNotSet(self):
+        self.cursor = OracleCursor()
+        with self.assertRaises(ValueError):
+            self.cursor.iterate("SELECT * FROM test")
+
+    def testIterateName(self):
+        self.cursor = OracleCursor(connection=self.connection)
+        results = list(self.cursor.iterate("SELECT * FROM test", 
+                                            batch_size=1))
+        self.assertEqual(results[0][0], 'Glenn')
+
+
+    # execute_many
+    def testExecuteManyConnectionNotSet(self):
+        self.cursor = OracleCursor()
+        with self.assertRaises(ValueError):
+            self.cursor.execute_many("INSERT INTO test VALUES (:1)", [])
+
+
     def tearDown(self):
         self.connection = None
         del self.connection
@@ -350,7 +476,7 @@ class TestOracleCursor(unittest.TestCase):
 # ============================================================================
 
 
-# OracleDictionaryCursor (6)
+# OracleDictionaryCursor (8)
 class TestOracleDictionaryCursor(unittest.TestCase):
     def setUp(self):
         self.connection = OracleConnection(host='127.0.0.1', user='y47test', 
@@ -387,6 +513,19 @@ class TestOracleDictionaryCursor(unittest.TestCase):
         self.assertEqual(results[0]["NAME"], 'Glenn')
 
 
+    # iterate
+    def testIterateConnectionNotSet(self):
+        self.cursor = OracleDictionaryCursor()
+        with self.assertRaises(ValueError):
+            self.cursor.iterate("SELECT * FROM test")
+
+    def testIterateName(self):
+        self.cursor = OracleDictionaryCursor(connection=self.connection)
+        results = list(self.cursor.iterate("SELECT * FROM test", 
+                                            batch_size=1))
+        self.assertEqual(results[0]["NAME"], 'Glenn')
+
+
     def tearDown(self):
         self.connection = None
         del self.connection
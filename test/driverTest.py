@@ -0,0 +1,75 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db import driver as drivers
+from y47.db.driver import driver
+import unittest
+
+
+# driver (5)
+class TestDriver(unittest.TestCase):
+    def testSQLiteDriver(self):
+        self.assertTrue(driver('sqlite').__name__ in ['sqlite3', 'sqlite'])
+
+    def testDriverIsCached(self):
+        self.assertTrue(driver('sqlite') is driver('sqlite'))
+        self.assertTrue(drivers._drivers['sqlite'] is driver('sqlite'))
+
+    def testUnknownBackend(self):
+        with self.assertRaises(ValueError):
+            driver('foo')
+
+    def testMissingDriverRaisesImportError(self):
+        drivers._backends['missing'] = ('y47_missing_module',)
+        try:
+            with self.assertRaises(ImportError):
+                driver('missing')
+            self.assertTrue(drivers._drivers['missing'] is None)
+            with self.assertRaises(ImportError):
+                driver('missing')
+        finally:
+            del drivers._backends['missing']
+            drivers._drivers.pop('missing', None)
+
+    def testDottedBackend(self):
+        drivers._backends['dotted'] = ('os.path',)
+        try:
+            import os.path
+            self.assertTrue(driver('dotted') is os.path)
+        finally:
+            del drivers._backends['dotted']
+            drivers._drivers.pop('dotted', None)
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running driver tests...'
+    unittest.main()
+
+# ============================================================================
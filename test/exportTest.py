@@ -0,0 +1,137 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+from y47.db.export import readBinary
+import csv
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+
+ROWS = [ (i, i * 0.5, 'name%d' % i, None) for i in range(25) ]
+
+
+# export (10)
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.connection = SQLiteConnection(database=':memory:').connect
+        self.connection.execute(
+                "CREATE TABLE test (id INTEGER, value REAL, name TEXT, n)")
+        self.connection.executemany("INSERT INTO test VALUES (?, ?, ?, ?)",
+                                    ROWS)
+        self.cursor = SQLiteCursor(connection=self.connection)
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+
+    def testPathNotSet(self):
+        with self.assertRaises(ValueError):
+            self.cursor.export("SELECT * FROM test")
+
+    def testUnknownFormat(self):
+        with self.assertRaises(ValueError):
+            self.cursor.export("SELECT * FROM test", path=self.path,
+                                format='xml')
+
+    def testConnectionNotSet(self):
+        with self.assertRaises(ValueError):
+            SQLiteCursor().export("SELECT * FROM test", path=self.path)
+
+    def testCSV(self):
+        count = self.cursor.export("SELECT * FROM test WHERE id < ?", (3,),
+                                    path=self.path, batch_size=2)
+        self.assertEqual(count, 3)
+        with open(self.path, 'rb') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['id', 'value', 'name', 'n'])
+        self.assertEqual(rows[3], ['2', '1.0', 'name2', ''])
+
+    def testCSVUnicode(self):
+        self.connection.execute("UPDATE test SET name=? WHERE id=0", 
+                                (u'caf\xe9',))
+        self.cursor.export("SELECT name FROM test WHERE id=0", path=self.path)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(list(csv.reader(f))[1], ['caf\xc3\xa9'])
+
+    def testJSONLines(self):
+        count = self.cursor.export("SELECT * FROM test", path=self.path,
+                                    format='jsonl', batch_size=10)
+        with open(self.path) as f:
+            rows = [ json.loads(line) for line in f ]
+        self.assertEqual(count, 25)
+        self.assertEqual(rows[4], {'id': 4, 'value': 2.0, 'name': 'name4', 
+                                    'n': None})
+
+    def testBinaryRoundTrip(self):
+        count = self.cursor.export("SELECT * FROM test", path=self.path,
+                                    format='binary', batch_size=7)
+        self.assertEqual(count, 25)
+        self.assertEqual(list(readBinary(self.path)), ROWS)
+
+    def testBinaryInt64(self):
+        big = [ (1 << 40,), (-(1 << 62),), (7,) ]
+        self.connection.execute("CREATE TABLE big (id INTEGER)")
+        self.connection.executemany("INSERT INTO big VALUES (?)", big)
+        self.cursor.export("SELECT id FROM big", path=self.path, 
+                            format='binary')
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        self.assertTrue(struct.pack('<cI', 'l', 24) + 
+                        struct.pack('<3q', *[ row[0] for row in big ]) in data)
+        self.assertEqual(list(readBinary(self.path)), big)
+
+    def testEncoding(self):
+        self.connection.execute("UPDATE test SET name=? WHERE id=0", 
+                                ('caf\xe9',))
+        self.cursor.export("SELECT name FROM test WHERE id=0", path=self.path,
+                            format='jsonl', encoding='latin-1')
+        with open(self.path) as f:
+            self.assertEqual(json.loads(f.readline()), {'name': u'caf\xe9'})
+
+    def testNotUTF8(self):
+        self.connection.execute("UPDATE test SET name=? WHERE id=0", 
+                                ('caf\xe9',))
+        with self.assertRaises(UnicodeDecodeError):
+            self.cursor.export("SELECT name FROM test WHERE id=0", 
+                                path=self.path, format='binary')
+
+    def tearDown(self):
+        self.connection.close()
+        os.remove(self.path)
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running export tests...'
+    unittest.main()
+
+# ============================================================================
@@ -0,0 +1,85 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+# a stand-in for cx_Oracle, shared by the tests of the Oracle cursors
+
+
+class FakeOracleCursor(object):
+    """a cx_Oracle cursor over a fixed result. records the sizes set when
+    execute() was called and counts fetchmany calls"""
+    def __init__(self, rows, description=None):
+        self._rows = rows
+        self._position = 0
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.description = description or [('ID', None), ('NAME', None)]
+        self.executed = []
+        self.fetches = 0
+
+    def prepare(self, sql):
+        pass
+
+    def execute(self, sql, args=None):
+        self.executed.append( (self.arraysize, self.prefetchrows) )
+        self._position = 0
+
+    def fetchmany(self, count=None):
+        self.fetches += 1
+        rows = self._rows[self._position:self._position + 
+                            (count or self.arraysize)]
+        self._position += len(rows)
+        return rows
+
+    # arraysize rows per round trip, as cx_Oracle does
+    def fetchall(self):
+        rows = []
+        while True:
+            batch = self.fetchmany(self.arraysize)
+            if not batch:
+                return rows
+            rows.extend(batch)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        pass
+
+
+class FakeOracleConnection(object):
+    cursor_class = FakeOracleCursor
+
+    def __init__(self, rows, description=None):
+        self.rows = rows
+        self.description = description
+        self.cursors = []
+
+    def cursor(self):
+        cursor = self.cursor_class(self.rows, self.description)
+        self.cursors.append(cursor)
+        return cursor
@@ -0,0 +1,140 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db.cursor import OracleCursor, OracleDictionaryCursor
+from y47.db.fetch import FetchTuning, estimateRoundTrips
+from fakeOracle import FakeOracleConnection, FakeOracleCursor
+import unittest
+
+
+ROWS = [ (i, 'name%06d' % i) for i in range(1000) ]
+
+
+# estimateRoundTrips (3)
+class TestEstimateRoundTrips(unittest.TestCase):
+    def testPrefetchedWithExecute(self):
+        self.assertEqual(estimateRoundTrips(5, 100, 10), 1)
+
+    def testDefaults(self):
+        self.assertEqual(estimateRoundTrips(1000, 100, 2), 11)
+
+    def testExactMultiple(self):
+        self.assertEqual(estimateRoundTrips(200, 100, 0), 4)
+
+
+# ============================================================================
+
+# FetchTuning (10)
+class TestFetchTuning(unittest.TestCase):
+    def setUp(self):
+        self.connection = FakeOracleConnection(ROWS)
+
+    def testDriverDefaults(self):
+        cursor = OracleCursor(connection=self.connection)
+        cursor.execute("SELECT * FROM TEST")
+        self.assertEqual(self.connection.cursors[0].executed, [(100, 2)])
+        self.assertEqual(cursor.stats()['round_trips'], 11)
+
+    def testCursorSizes(self):
+        cursor = OracleCursor(connection=self.connection, arraysize=500,
+                                prefetchrows=501)
+        cursor.execute("SELECT * FROM TEST")
+        self.assertEqual(self.connection.cursors[0].executed, [(500, 501)])
+        self.assertEqual(cursor.stats()['round_trips'], 2)
+
+    def testQuerySizesWin(self):
+        cursor = OracleCursor(connection=self.connection, arraysize=500)
+        cursor.execute("SELECT * FROM TEST", arraysize=2000, 
+                        prefetchrows=2000)
+        self.assertEqual(self.connection.cursors[0].executed, [(2000, 2000)])
+        self.assertEqual(cursor.stats()['round_trips'], 1)
+
+    def testCachedCursorSizesReset(self):
+        cursor = OracleCursor(connection=self.connection, statement_cache=1)
+        cursor.execute("SELECT * FROM TEST", arraysize=2000, 
+                        prefetchrows=2000)
+        cursor.execute("SELECT * FROM TEST")
+        self.assertEqual(self.connection.cursors[0].executed, 
+                        [(2000, 2000), (100, 2)])
+
+    def testProperties(self):
+        cursor = OracleDictionaryCursor(connection=self.connection)
+        cursor.arraysize = 250
+        cursor.prefetchrows = 10
+        cursor.adaptive = True
+        self.assertEqual((cursor.arraysize, cursor.prefetchrows, 
+                        cursor.adaptive), (250, 10, True))
+
+    def testStats(self):
+        cursor = OracleDictionaryCursor(connection=self.connection)
+        rows = cursor.execute("SELECT * FROM TEST")
+        cursor.execute("SELECT * FROM TEST")
+        stats = cursor.stats()
+        self.assertEqual(rows[1], {'ID': 1, 'NAME': 'name000001'})
+        self.assertEqual((stats['queries'], stats['rows'], stats['arraysize'],
+                        stats['prefetchrows']), (2, 2000, 100, 2))
+        self.assertEqual(stats['bytes'], 2000 * 18)
+
+    def testAdaptiveWholeResult(self):
+        cursor = OracleCursor(connection=self.connection, adaptive=True,
+                                statement_cache=1)
+        cursor.execute("SELECT * FROM TEST")
+        cursor.execute("SELECT * FROM TEST")
+        self.assertEqual(self.connection.cursors[0].executed, 
+                        [(100, 2), (1001, 1001)])
+        self.assertEqual(cursor.stats()['round_trips'], 11 + 1)
+
+    def testAdaptiveTargetBytes(self):
+        tuning = FetchTuning(adaptive=True, target_bytes=1800)
+        cursor = FakeOracleCursor(ROWS)
+        tuning.observe('SELECT', cursor, ROWS)
+        self.assertEqual(tuning.sizes('SELECT'), (100, 100))
+        tuning.target_bytes = 18000
+        tuning.observe('SELECT', cursor, ROWS)
+        self.assertEqual(tuning.sizes('SELECT'), (1000, 1000))
+
+    def testAdaptiveIsPerStatement(self):
+        tuning = FetchTuning(adaptive=True, arraysize=300)
+        tuning.observe('SELECT 1', FakeOracleCursor(ROWS), ROWS)
+        self.assertEqual(tuning.sizes('SELECT 2'), (300, None))
+
+    def testAdaptiveCapacity(self):
+        tuning = FetchTuning(adaptive=True, capacity=2)
+        for sql in ['SELECT 1', 'SELECT 2', 'SELECT 3']:
+            tuning.observe(sql, FakeOracleCursor(ROWS), ROWS)
+        self.assertEqual(tuning.sizes('SELECT 1'), (None, None))
+        self.assertEqual(tuning.sizes('SELECT 3'), (1001, 1001))
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running fetch tests...'
+    unittest.main()
+
+# ============================================================================
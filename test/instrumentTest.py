@@ -0,0 +1,136 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db import instrument
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+from y47.db.instrument import Histogram, HistogramCollector, Instrument
+import types
+import unittest
+
+
+class Recorder(Instrument):
+    def __init__(self):
+        Instrument.__init__(self)
+        self.calls = []
+
+    def before(self, cursor, sql, args):
+        self.calls.append(('before', sql, args))
+
+    def after(self, cursor, sql, args, execute_time, fetch_time, rows, size):
+        self.calls.append(('after', sql, rows, size))
+        self.times = (execute_time, fetch_time)
+
+
+# helpers (4)
+class TestHelpers(unittest.TestCase):
+    def testNormalize(self):
+        self.assertEqual(instrument.normalize(
+            "SELECT *  FROM test\n WHERE id = 10 AND name='it''s'"),
+            "SELECT * FROM test WHERE id = ? AND name=?")
+
+    def testNormalizeLists(self):
+        self.assertEqual(instrument.normalize(
+            "SELECT * FROM t2 WHERE id IN (1, 2, 3) AND x=:1"),
+            "SELECT * FROM t2 WHERE id IN (...) AND x=:1")
+
+    def testEstimateSize(self):
+        self.assertEqual(instrument.estimateSize(None), 0)
+        self.assertEqual(instrument.estimateSize([(1, 'abcd', None)] * 10), 
+                            120)
+        self.assertEqual(instrument.estimateSize([{'a': 'xy'}]), 2)
+
+    def testHistogramPercentiles(self):
+        histogram = Histogram()
+        for i in range(1, 101):
+            histogram.add(i / 1000.0)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.percentile(50), 0.050, delta=0.005)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.009)
+        self.assertEqual(histogram.percentile(100), 0.1)
+
+
+# Cursor instruments (5)
+class TestCursorInstruments(unittest.TestCase):
+    def setUp(self):
+        self.connection = SQLiteConnection(database=':memory:').connect
+        self.connection.execute("CREATE TABLE test (id INTEGER, name TEXT)")
+        self.connection.execute("INSERT INTO test VALUES (1, 'Glenn')")
+        self.cursor = SQLiteCursor(connection=self.connection)
+        self.recorder = Recorder()
+
+    def testBeforeAfter(self):
+        self.cursor.addInstrument(self.recorder)
+        self.cursor.execute("SELECT * FROM test WHERE id=?", (1,))
+        self.assertEqual(self.recorder.calls, [
+            ('before', "SELECT * FROM test WHERE id=?", (1,)),
+            ('after', "SELECT * FROM test WHERE id=?", 1, 13)])
+        self.assertTrue(min(self.recorder.times) >= 0)
+
+    def testRemoveInstrument(self):
+        self.cursor.addInstrument(self.recorder)
+        self.cursor.removeInstrument(self.recorder)
+        self.cursor.execute("SELECT * FROM test")
+        self.assertEqual(self.recorder.calls, [])
+
+    def testInstall(self):
+        instrument.install(self.recorder)
+        try:
+            self.cursor.execute("SELECT * FROM test")
+        finally:
+            instrument.uninstall(self.recorder)
+        self.assertEqual(len(self.recorder.calls), 2)
+
+    def testDictionaryRows(self):
+        self.cursor.row_type = types.DictionaryType
+        self.cursor.addInstrument(self.recorder)
+        self.cursor.execute("SELECT * FROM test")
+        self.assertEqual(self.recorder.calls[-1][2], 1)
+
+    def testHistogramCollector(self):
+        collector = HistogramCollector()
+        self.cursor.addInstrument(collector)
+        for i in range(10):
+            self.cursor.execute("SELECT * FROM test WHERE id=%d" % i)
+        stats = collector.dump()
+        self.assertEqual(stats.keys(), ["SELECT * FROM test WHERE id=?"])
+        self.assertEqual(stats["SELECT * FROM test WHERE id=?"]['count'], 10)
+        self.assertEqual(stats["SELECT * FROM test WHERE id=?"]['rows'], 1)
+        self.assertTrue('SELECT * FROM test WHERE id=?' in collector.report())
+
+    def tearDown(self):
+        self.connection.close()
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running instrument tests...'
+    unittest.main()
+
+# ============================================================================
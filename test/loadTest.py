@@ -0,0 +1,145 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db import load
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor, MySQLCursor, OracleCursor
+import os
+import tempfile
+import unittest
+
+
+def _tempfile(suffix=''):
+    fd, path = tempfile.mkstemp(suffix)
+    os.close(fd)
+    return path
+
+
+# load (6)
+class TestLoad(unittest.TestCase):
+    def setUp(self):
+        self.path = _tempfile()
+        with open(self.path, 'wb') as f:
+            f.write('id,name\r\n1,Glenn\r\n2,\r\n')
+
+    def testColumnNamesFromHeader(self):
+        self.assertEqual(load.columnNames(self.path), ['id', 'name'])
+
+    def testColumnNamesNotSet(self):
+        with self.assertRaises(ValueError):
+            load.columnNames(self.path, header=False)
+
+    def testReadCSV(self):
+        self.assertEqual(list(load.readCSV(self.path)), 
+                        [('1', 'Glenn'), ('2', None)])
+
+    def testLineTerminator(self):
+        self.assertEqual(load.lineTerminator(self.path), '\r\n')
+        with open(self.path, 'wb') as f:
+            f.write('id,name\n')
+        self.assertEqual(load.lineTerminator(self.path), '\n')
+
+    def testInsertStatement(self):
+        self.assertEqual(load.insertStatement('test', ['id', 'name'], 
+                                            OracleCursor()._placeholders(2)),
+                        'INSERT INTO test (id, name) VALUES (:1, :2)')
+
+    def testMySQLPlaceholders(self):
+        self.assertEqual(MySQLCursor()._placeholders(2), ['%s', '%s'])
+
+    def tearDown(self):
+        os.remove(self.path)
+
+
+# ============================================================================
+
+# SQLiteCursor.import_file (6)
+class TestSQLiteImportFile(unittest.TestCase):
+    def setUp(self):
+        self.database = _tempfile('.db')
+        self.connection = SQLiteConnection(database=self.database).connect
+        self.connection.execute("CREATE TABLE test (id INTEGER, name TEXT)")
+        self.cursor = SQLiteCursor(connection=self.connection)
+        self.path = _tempfile()
+        with open(self.path, 'wb') as f:
+            f.write('id,name\r\n')
+            for i in range(25):
+                f.write('%d,name%d\r\n' % (i, i))
+
+    def testConnectionNotSet(self):
+        with self.assertRaises(ValueError):
+            SQLiteCursor().import_file('test', self.path)
+
+    def testImportFile(self):
+        result = self.cursor.import_file('test', self.path, batch_size=10)
+        self.assertEqual((result.rows, result.chunks), (25, 3))
+        self.assertEqual(self.cursor.execute(
+                        "SELECT * FROM test WHERE id=24"), [(24, 'name24')])
+
+    def testImportFileColumns(self):
+        with open(self.path, 'wb') as f:
+            f.write('Glenn,1\r\n')
+        self.cursor.import_file('test', self.path, columns=['name', 'id'],
+                                header=False)
+        self.assertEqual(self.cursor.execute("SELECT * FROM test"), 
+                        [(1, 'Glenn')])
+
+    def testExportImportRoundTrip(self):
+        self.connection.execute("INSERT INTO test VALUES (1, NULL)")
+        self.connection.commit()
+        self.cursor.export("SELECT * FROM test", path=self.path)
+        self.connection.execute("DELETE FROM test")
+        self.cursor.import_file('test', self.path)
+        self.assertEqual(self.cursor.execute("SELECT * FROM test"), 
+                        [(1, None)])
+
+    def testPragmasRestored(self):
+        self.cursor.import_file('test', self.path)
+        self.assertEqual(self.cursor.execute("PRAGMA journal_mode"), 
+                        [('delete',)])
+        self.assertEqual(self.cursor.execute("PRAGMA synchronous"), [(2,)])
+
+    def testPragmasRestoredOnError(self):
+        with self.assertRaises(Exception):
+            self.cursor.import_file('missing', self.path)
+        self.assertEqual(self.cursor.execute("PRAGMA journal_mode"), 
+                        [('delete',)])
+
+    def tearDown(self):
+        self.connection.close()
+        os.remove(self.database)
+        os.remove(self.path)
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running load tests...'
+    unittest.main()
+
+# ============================================================================
@@ -0,0 +1,160 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor, SQLiteDictionaryCursor
+from y47.db.cursor import OracleCursor
+from y47.db.parallel import ParallelQuery
+from y47.db.row import Record
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+
+ROWS = [ (i, 'name%d' % i) for i in range(1, 101) ] + [ (None, 'null') ]
+
+
+# ParallelQuery (14)
+class TestParallelQuery(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.sqlite = SQLiteConnection(database=os.path.join(self.tmp, 
+                                                            'parallel.db'))
+        connection = self.sqlite.connect
+        connection.execute("CREATE TABLE test (id INTEGER, name TEXT)")
+        connection.executemany("INSERT INTO test VALUES (?, ?)", ROWS)
+        connection.commit()
+        connection.close()
+        self.query = ParallelQuery(connection=self.sqlite, 
+                                    cursor_class=SQLiteCursor, key='id',
+                                    partitions=3, processes=2)
+
+    def testPicklesWithoutHandle(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self.sqlite)).database,
+                        self.sqlite.database)
+
+    def testPartitioningNotInPartitionings(self):
+        with self.assertRaises(ValueError):
+            ParallelQuery(partitioning='FOO')
+
+    def testKeyNotSet(self):
+        with self.assertRaises(ValueError):
+            ParallelQuery(connection=self.sqlite, cursor_class=SQLiteCursor
+                            ).execute("SELECT * FROM test")
+
+    def testModulo(self):
+        rows = self.query.execute("SELECT * FROM test")
+        self.assertEqual(sorted(rows), sorted(ROWS))
+
+    def testModuloOrdered(self):
+        rows = self.query.execute("SELECT * FROM test WHERE id > ?", (50,),
+                                    order_by='id')
+        self.assertEqual(rows, ROWS[50:100])
+
+    def testOracleModulo(self):
+        query = ParallelQuery(cursor_class=OracleCursor, key='ID', 
+                                partitions=4)
+        self.assertEqual(query._modulo(3), 'MOD(ABS(ID), 4) = 3')
+
+    def testModuloNegativeKeys(self):
+        connection = self.sqlite._connect()
+        negative = [ (i, 'minus%d' % -i) for i in range(-10, 0) ]
+        connection.executemany("INSERT INTO test VALUES (?, ?)", negative)
+        connection.commit()
+        connection.close()
+        query = ParallelQuery(connection=self.sqlite, 
+                                cursor_class=SQLiteCursor, key='id',
+                                partitions=4)
+        self.assertEqual(sorted(query.execute("SELECT * FROM test")), 
+                        sorted(ROWS + negative))
+        query.close()
+
+    def testNullPartition(self):
+        statements = self.query._statements("SELECT * FROM test", None, None)
+        self.assertTrue(statements[0].endswith('OR id IS NULL)'))
+        self.assertFalse('IS NULL' in statements[-1])
+
+    def testOracleNullPartition(self):
+        query = ParallelQuery(cursor_class=OracleCursor, key='ID', 
+                                partitions=4)
+        statements = query._statements("SELECT * FROM test", None, 'ID')
+        self.assertFalse('IS NULL' in statements[0])
+        self.assertTrue(statements[-1].endswith('OR ID IS NULL) ORDER BY ID'))
+
+    def testRange(self):
+        query = ParallelQuery(connection=self.sqlite, 
+                                cursor_class=SQLiteCursor, key='id',
+                                partitions=4, partitioning='range')
+        self.assertEqual(query.execute("SELECT * FROM test", order_by='id'),
+                        ROWS[-1:] + ROWS[:-1])
+        query.close()
+
+    def testRangeBounds(self):
+        query = ParallelQuery(connection=self.sqlite, 
+                                cursor_class=SQLiteCursor, key='id',
+                                partitions=2, partitioning='range', 
+                                bounds=(1, 10))
+        self.assertEqual(sorted(query.execute("SELECT * FROM test")), 
+                        sorted(ROWS))
+        query.close()
+
+    def testDictionaryRows(self):
+        query = ParallelQuery(connection=self.sqlite, 
+                                cursor_class=SQLiteDictionaryCursor, key='id')
+        rows = query.execute("SELECT * FROM test", order_by='name')
+        self.assertEqual(rows[0], {'id': 1, 'name': 'name1'})
+        self.assertEqual(len(rows), len(ROWS))
+        query.close()
+
+    def testRecordRows(self):
+        query = ParallelQuery(connection=self.sqlite, 
+                                cursor_class=SQLiteCursor, key='id',
+                                row_type=Record)
+        rows = query.execute("SELECT * FROM test WHERE id < 4", order_by='id')
+        self.assertEqual([ row.name for row in rows ], 
+                        ['name1', 'name2', 'name3'])
+        query.close()
+
+    def testIterate(self):
+        rows = self.query.iterate("SELECT name, id FROM test")
+        self.assertEqual(len(list(rows)), len(ROWS))
+
+    def tearDown(self):
+        self.query.close()
+        shutil.rmtree(self.tmp)
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running parallel tests...'
+    unittest.main()
+
+# ============================================================================
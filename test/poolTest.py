@@ -0,0 +1,175 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db import PoolTimeout
+from y47.db.connection import SQLiteConnection
+from y47.db.pool import ConnectionPool
+import os
+import tempfile
+import threading
+import unittest
+
+
+class SlowHandle(object):
+    """a driver connection whose rollback waits for release"""
+    def __init__(self, entered, release):
+        self.entered = entered
+        self.release = release
+
+    def rollback(self):
+        self.entered.set()
+        self.release.wait()
+
+    def close(self):
+        pass
+
+
+class SlowConnection(object):
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def _reconnect(self):
+        return SlowHandle(self.entered, self.release)
+
+    def _ping(self, handle):
+        pass
+
+
+# ConnectionPool (11)
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.sqlite = SQLiteConnection(database=self.filename,
+                                        check_same_thread=False)
+
+    def testInitSizeInvalid(self):
+        with self.assertRaises(ValueError):
+            ConnectionPool(connection=self.sqlite, min_size=3, max_size=2)
+
+    def testInitOpensMinSize(self):
+        self.pool = ConnectionPool(connection=self.sqlite, min_size=2)
+        self.assertEqual(self.pool.size, 2)
+        self.assertEqual(self.pool.idle, 2)
+
+    def testCheckoutReusesConnection(self):
+        self.pool = ConnectionPool(connection=self.sqlite, min_size=1)
+        first = self.pool.checkout()
+        self.pool.checkin(first)
+        second = self.pool.checkout()
+        self.assertTrue(first is second)
+        self.pool.checkin(second)
+
+    def testCheckoutGrowsToMaxSize(self):
+        self.pool = ConnectionPool(connection=self.sqlite, min_size=0,
+                                    max_size=2)
+        first = self.pool.checkout()
+        second = self.pool.checkout()
+        self.assertTrue(first is not second)
+        self.assertEqual(self.pool.size, 2)
+
+    def testCheckoutTimeout(self):
+        self.pool = ConnectionPool(connection=self.sqlite, min_size=0,
+                                    max_size=1)
+        self.pool.checkout()
+        with self.assertRaises(PoolTimeout):
+            self.pool.checkout(timeout=0.05)
+
+    def testCheckoutWaitsForCheckin(self):
+        self.pool = ConnectionPool(connection=self.sqlite, min_size=0,
+                                    max_size=1)
+        handle = self.pool.checkout()
+        timer = threading.Timer(0.05, self.pool.checkin, (handle,))
+        timer.start()
+        self.assertTrue(self.pool.checkout(timeout=5) is handle)
+        timer.join()
+
+    def testCheckinForeignConnection(self):
+        self.pool = ConnectionPool(connection=self.sqlite, min_size=0)
+        with self.assertRaises(ValueError):
+            self.pool.checkin(self.sqlite.connect)
+
+    def testIdleEviction(self):
+        self.pool = ConnectionPool(connection=self.sqlite, min_size=1,
+                                    max_size=3, max_idle=0)
+        handles = [ self.pool.checkout() for i in range(3) ]
+        for handle in handles:
+            self.pool.checkin(handle)
+        self.assertEqual(self.pool.size, 1)
+
+    def testSlowRollbackDoesNotBlockCheckout(self):
+        slow = SlowConnection()
+        self.pool = ConnectionPool(connection=slow, min_size=0, max_size=2)
+        first, second = self.pool.checkout(), self.pool.checkout()
+        slow.release.set()
+        self.pool.checkin(second)
+        slow.entered.clear()
+        slow.release.clear()
+        checkin = threading.Thread(target=self.pool.checkin, args=(first,))
+        checkin.start()
+        slow.entered.wait()
+        handles = []
+        checkout = threading.Thread(target=lambda: 
+                                    handles.append(self.pool.checkout()))
+        checkout.start()
+        checkout.join(1)
+        during = list(handles)
+        slow.release.set()
+        checkin.join()
+        checkout.join()
+        self.assertEqual(during, [second])
+
+    def testHealthCheckReplacesDeadConnection(self):
+        self.pool = ConnectionPool(connection=self.sqlite, min_size=1)
+        handle = self.pool.checkout()
+        self.pool.checkin(handle)
+        handle.close()
+        fresh = self.pool.checkout()
+        self.assertTrue(fresh is not handle)
+        self.assertEqual(fresh.execute('SELECT 1').fetchone()[0], 1)
+
+    def testConnectionContextManager(self):
+        self.pool = ConnectionPool(connection=self.sqlite, min_size=1)
+        with self.pool.connection():
+            self.assertEqual(self.pool.idle, 0)
+        self.assertEqual(self.pool.idle, 1)
+
+    def tearDown(self):
+        if hasattr(self, 'pool'):
+            self.pool.close()
+        os.remove(self.filename)
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running pool tests...'
+    unittest.main()
+
+# ============================================================================
@@ -0,0 +1,173 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor, SQLiteDictionaryCursor
+from y47.db.router import Router, isRead
+import os
+import unittest
+
+
+# primary and replica SQLite3 database files, each names its own row
+FILENAMES = ['primary.db', 'replica1.db', 'replica2.db']
+
+
+def _create(filename):
+    if os.path.exists(filename):
+        os.remove(filename)
+    connection = SQLiteConnection(database=filename).connect
+    connection.execute('CREATE TABLE test(id INTEGER PRIMARY KEY, name TEXT)')
+    connection.execute("INSERT INTO test VALUES(1, ?)", 
+                        (os.path.splitext(filename)[0],))
+    connection.commit()
+    connection.close()
+
+
+# Router (12)
+class TestRouter(unittest.TestCase):
+    def setUp(self):
+        for filename in FILENAMES:
+            _create(filename)
+        # autocommit off on the primary, as on MySQL
+        self.primary = SQLiteConnection(database=FILENAMES[0], 
+                                    autocommit='DEFERRED',
+                                    check_same_thread=False)
+        self.replicas = [ SQLiteConnection(database=filename,
+                                    check_same_thread=False)
+                        for filename in FILENAMES[1:] ]
+        self.router = Router(primary=self.primary, replicas=self.replicas)
+
+    def _name(self, cursor):
+        return cursor.execute('SELECT name FROM test WHERE id=1')[0][0]
+
+    def testPrimaryNotSet(self):
+        with self.assertRaises(ValueError):
+            Router(replicas=self.replicas)
+
+    def testIsRead(self):
+        self.assertTrue(isRead('SELECT * FROM test'))
+        self.assertTrue(isRead('  (select id FROM test) UNION (SELECT 1)'))
+        self.assertTrue(isRead('SHOW TABLES'))
+        self.assertTrue(isRead('EXPLAIN SELECT 1'))
+        self.assertFalse(isRead('SELECT * FROM test FOR UPDATE'))
+        self.assertFalse(isRead('SELECT * FROM test LOCK IN SHARE MODE'))
+        self.assertFalse(isRead("INSERT INTO test VALUES(2, 'select')"))
+        self.assertFalse(isRead('START TRANSACTION'))
+
+    def testReadGoesToReplica(self):
+        cursor = SQLiteCursor(connection=self.router.session())
+        self.assertTrue(self._name(cursor).startswith('replica'))
+        self.assertFalse(cursor.connection.pinned)
+
+    def testReadsAlternate(self):
+        cursor = SQLiteCursor(connection=self.router.session())
+        self.assertEqual(sorted([ self._name(cursor) for n in range(2) ]),
+                        ['replica1', 'replica2'])
+
+    def testLeastOutstanding(self):
+        i, handle = self.router._acquireReplica()
+        cursor = SQLiteCursor(connection=self.router.session())
+        self.assertEqual([ self._name(cursor) for n in range(2) ],
+                        [FILENAMES[2 - i][:-3]] * 2)
+        self.router._releaseReplica(i, handle)
+        self.assertEqual(self.router.stats()['outstanding'], [0, 0])
+
+    def testWritePins(self):
+        session = self.router.session()
+        cursor = SQLiteCursor(connection=session)
+        cursor.execute("UPDATE test SET name='written' WHERE id=1")
+        self.assertTrue(session.pinned)
+        self.assertEqual(self._name(cursor), 'written')
+        session.commit()
+        self.assertEqual(self._name(cursor), 'written')
+        session.close()
+        self.assertFalse(session.pinned)
+        self.assertEqual(self.router.stats()['writes'], 1)
+        self.assertEqual(self.router.stats()['pinned_reads'], 2)
+
+    def testPinSecondsUnpins(self):
+        self.router.pin_seconds = 0
+        session = self.router.session()
+        cursor = SQLiteCursor(connection=session)
+        cursor.execute("UPDATE test SET name='written' WHERE id=1")
+        self.assertEqual(self._name(cursor), 'written')
+        session.commit()
+        self.assertTrue(self._name(cursor).startswith('replica'))
+        self.assertFalse(session.pinned)
+
+    def testUncommittedStaysPinned(self):
+        self.router.pin_seconds = 0
+        session = self.router.session()
+        cursor = SQLiteCursor(connection=session)
+        cursor.execute("UPDATE test SET name='written' WHERE id=1")
+        self.assertEqual(self._name(cursor), 'written')
+        self.assertTrue(session.pinned)
+
+    def testCloseRollsBack(self):
+        with self.router.session() as session:
+            SQLiteCursor(connection=session).execute(
+                            "UPDATE test SET name='written' WHERE id=1")
+        self.assertEqual(self.router._primary.idle, 1)
+        connection = self.primary.connect
+        self.assertEqual(connection.execute(
+                        'SELECT name FROM test').fetchall(), [('primary',)])
+
+    def testNoReplicas(self):
+        router = Router(primary=self.primary)
+        cursor = SQLiteCursor(connection=router.session())
+        self.assertEqual(self._name(cursor), 'primary')
+        self.assertFalse(cursor.connection.pinned)
+        self.assertEqual(router.stats()['reads'], 1)
+        router.close()
+
+    def testDictionaryCursor(self):
+        cursor = SQLiteDictionaryCursor(connection=self.router.session())
+        row = cursor.execute('SELECT id, name FROM test')[0]
+        self.assertEqual(row['id'], 1)
+
+    def testStats(self):
+        cursor = SQLiteCursor(connection=self.router.session())
+        self._name(cursor)
+        self._name(cursor)
+        self.assertEqual(self.router.stats(), {'reads': 2, 'writes': 0, 
+                        'pinned_reads': 0, 'outstanding': [0, 0]})
+
+    def tearDown(self):
+        self.router.close()
+        self.primary.close()
+        for filename in FILENAMES:
+            os.remove(filename)
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running router tests...'
+    unittest.main()
+
+# ============================================================================
@@ -0,0 +1,267 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor, OracleCursor, OracleDictionaryCursor
+from y47.db.instrument import HistogramCollector
+from y47.db.row import Record, recordClass, recordFactory, DictRow, LazyRows
+from y47.db.row import mergeRows
+from fakeOracle import FakeOracleConnection
+import cPickle
+import types
+import unittest
+
+
+# Record (9)
+class TestRecord(unittest.TestCase):
+    def setUp(self):
+        self.record = recordClass(['id', 'name'])
+        self.row = self.record((1, 'Glenn'))
+
+    def testIsTuple(self):
+        self.assertTrue(isinstance(self.row, tuple))
+        self.assertTrue(isinstance(self.row, Record))
+        self.assertEqual(self.row, (1, 'Glenn'))
+
+    def testIndexAccess(self):
+        self.assertEqual(self.row[1], 'Glenn')
+        self.assertEqual(self.row[-1], 'Glenn')
+        self.assertEqual(self.row[0:2], (1, 'Glenn'))
+
+    def testNameAccess(self):
+        self.assertEqual(self.row['name'], 'Glenn')
+        self.assertEqual(self.row.name, 'Glenn')
+        with self.assertRaises(KeyError):
+            self.row['foo']
+
+    def testNoInstanceDict(self):
+        self.assertFalse(hasattr(self.row, '__dict__'))
+
+    def testClassIsCached(self):
+        self.assertTrue(recordClass(('id', 'name')) is self.record)
+        self.assertTrue(recordFactory([('id',), ('name',)]) is self.record)
+
+    def testReservedNames(self):
+        record = recordClass(['count', 'my column', 'id', 'id'])
+        row = record((3, 'x', 1, 2))
+        self.assertEqual(row.count(3), 1)
+        self.assertEqual(row['count'], 3)
+        self.assertEqual(row['my column'], 'x')
+        self.assertEqual(row['id'], 1)
+
+    def testAsDict(self):
+        self.assertEqual(self.row.asDict(), {'id': 1, 'name': 'Glenn'})
+        self.assertEqual(self.row.keys(), ['id', 'name'])
+        self.assertEqual(self.row.get('foo', 'bar'), 'bar')
+
+    def testRepr(self):
+        self.assertEqual(repr(self.row), "Record(id=1, name='Glenn')")
+
+    def testPickle(self):
+        row = cPickle.loads(cPickle.dumps(self.row, 2))
+        self.assertEqual(row.name, 'Glenn')
+        self.assertTrue(type(row) is self.record)
+
+
+# DictRow (4)
+class TestDictRow(unittest.TestCase):
+    def setUp(self):
+        self.row = DictRow({'ID': 0, 'NAME': 1}, (1, 'Glenn'))
+
+    def testAccess(self):
+        self.assertEqual(self.row['NAME'], 'Glenn')
+        self.assertEqual(self.row.get('FOO', 2), 2)
+        self.assertTrue('ID' in self.row)
+        with self.assertRaises(KeyError):
+            self.row['FOO']
+
+    def testEqualsDict(self):
+        self.assertEqual(self.row, {'ID': 1, 'NAME': 'Glenn'})
+        self.assertEqual([self.row], [{'ID': 1, 'NAME': 'Glenn'}])
+        self.assertNotEqual(self.row, {'ID': 2, 'NAME': 'Glenn'})
+
+    def testDictMethods(self):
+        self.assertEqual(sorted(self.row.keys()), ['ID', 'NAME'])
+        self.assertEqual(sorted(self.row.items()), [('ID', 1), 
+                        ('NAME', 'Glenn')])
+        self.assertEqual(len(self.row), 2)
+        self.assertEqual(dict(self.row), {'ID': 1, 'NAME': 'Glenn'})
+
+    def testAsDict(self):
+        row = self.row.asDict()
+        self.assertTrue(type(row) is dict)
+        row['ID'] = 2
+        self.assertEqual(self.row['ID'], 1)
+
+
+ROWS = [ (i, 'name%d' % i) for i in range(250) ]
+
+
+# LazyRows (10)
+class TestLazyRows(unittest.TestCase):
+    def setUp(self):
+        self.connection = FakeOracleConnection(ROWS)
+        self.cursor = OracleCursor(connection=self.connection, 
+                                    row_type=types.DictionaryType, lazy=True)
+
+    def testNotLazyByDefault(self):
+        rows = OracleDictionaryCursor(connection=self.connection).execute(
+                                    "SELECT * FROM TEST")
+        self.assertTrue(type(rows) is list)
+
+    def testFetchesOnDemand(self):
+        rows = self.cursor.execute("SELECT * FROM TEST")
+        self.assertTrue(isinstance(rows, LazyRows))
+        self.assertEqual(rows.fetched, 0)
+        self.assertEqual(rows[0]['NAME'], 'name0')
+        self.assertEqual(rows.fetched, 100)
+        self.assertEqual(rows[150]['ID'], 150)
+        self.assertEqual(rows.fetched, 200)
+
+    def testLen(self):
+        rows = self.cursor.execute("SELECT * FROM TEST")
+        self.assertTrue(rows)
+        self.assertEqual(len(rows), 250)
+        self.assertEqual(rows[-1]['ID'], 249)
+
+    def testSlice(self):
+        rows = self.cursor.execute("SELECT * FROM TEST")
+        self.assertEqual([ row['ID'] for row in rows[10:12] ], [10, 11])
+        self.assertEqual(rows.fetched, 100)
+        self.assertEqual([ row['ID'] for row in rows[-2:] ], [248, 249])
+        self.assertEqual([ row['ID'] for row in rows[2:0:-1] ], [2, 1])
+
+    def testIterate(self):
+        rows = self.cursor.execute("SELECT * FROM TEST")
+        for i, row in enumerate(rows):
+            if i == 5:
+                break
+        self.assertEqual(rows.fetched, 100)
+        self.assertEqual([ row['ID'] for row in rows ], range(250))
+
+    def testEqualsList(self):
+        self.connection.rows = ROWS[:2]
+        self.assertEqual(self.cursor.execute("SELECT * FROM TEST"),
+                        [{'ID': 0, 'NAME': 'name0'}, {'ID': 1, 'NAME': 'name1'}])
+
+    def testEmpty(self):
+        self.connection.rows = []
+        rows = self.cursor.execute("SELECT * FROM TEST")
+        self.assertFalse(rows)
+        self.assertEqual(list(rows), [])
+
+    def testStatsWhenDone(self):
+        rows = self.cursor.execute("SELECT * FROM TEST")
+        rows[0]
+        self.assertEqual(self.cursor.stats()['rows'], 0)
+        len(rows)
+        self.assertEqual(self.cursor.stats()['rows'], 250)
+
+    def testInstrumentWaitsForFetch(self):
+        collector = HistogramCollector()
+        self.cursor.addInstrument(collector)
+        rows = self.cursor.execute("SELECT * FROM TEST")
+        self.assertEqual(self.connection.cursors[0].fetches, 0)
+        self.assertEqual(collector.dump(), {})
+        rows[0]
+        self.assertEqual(self.connection.cursors[0].fetches, 1)
+        len(rows)
+        self.assertEqual(collector.dump()['SELECT * FROM TEST']['rows'], 250)
+
+    def testCachedCursorDrained(self):
+        cursor = OracleDictionaryCursor(connection=self.connection, 
+                                        statement_cache=10, lazy=True)
+        first = cursor.execute("SELECT * FROM TEST")
+        first[0]
+        second = cursor.execute("SELECT * FROM TEST")
+        self.assertEqual(len(self.connection.cursors), 1)
+        self.assertEqual(len(first), 250)
+        self.assertEqual(len(second), 250)
+
+
+# SQLiteCursor row_type=Record (3)
+class TestSQLiteCursorRecord(unittest.TestCase):
+    def setUp(self):
+        self.connection = SQLiteConnection(database=':memory:').connect
+        self.connection.execute("CREATE TABLE test (id INTEGER, name TEXT)")
+        self.connection.execute("INSERT INTO test VALUES (1, 'Glenn')")
+        self.cursor = SQLiteCursor(connection=self.connection, 
+                                    row_type=Record)
+
+    def testExecute(self):
+        results = self.cursor.execute("SELECT * FROM test")
+        self.assertEqual(results[0].name, 'Glenn')
+        self.assertEqual(results[0][0], 1)
+
+    def testIterate(self):
+        results = list(self.cursor.iterate("SELECT * FROM test"))
+        self.assertEqual(results[0]['name'], 'Glenn')
+
+    def testExecuteNoResultSet(self):
+        self.assertEqual(self.cursor.execute("DELETE FROM test"), [])
+
+    def tearDown(self):
+        self.connection.close()
+
+
+# mergeRows (5)
+class TestMergeRows(unittest.TestCase):
+    def testTuples(self):
+        partials = [(['id', 'name'], [(1, 'a'), (4, 'd')]),
+                    (['id', 'name'], []),
+                    (['id', 'name'], [(2, 'b'), (3, 'c')])]
+        self.assertEqual(list(mergeRows(partials, 'id')), 
+                        [(1, 'a'), (2, 'b'), (3, 'c'), (4, 'd')])
+
+    def testDicts(self):
+        partials = [(['id'], [{'id': 2}]), (['id'], [{'id': 1}, {'id': 3}])]
+        self.assertEqual([ row['id'] for row in mergeRows(partials, 'id') ],
+                        [1, 2, 3])
+
+    def testIterators(self):
+        partials = [(['id'], iter([(1,), (3,)])), (['id'], iter([(2,)]))]
+        self.assertEqual(list(mergeRows(partials, 'id')), [(1,), (2,), (3,)])
+
+    def testNotAColumn(self):
+        with self.assertRaises(ValueError):
+            list(mergeRows([(['id'], [(1,)])], 'name'))
+
+    def testTiesKeepPartialOrder(self):
+        partials = [(['id', 'name'], [(1, 'first')]),
+                    (['id', 'name'], [(1, 'second')])]
+        self.assertEqual(list(mergeRows(partials, 'id')), 
+                        [(1, 'first'), (1, 'second')])
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running row tests...'
+    unittest.main()
+
+# ============================================================================
@@ -0,0 +1,187 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db import DatabaseException
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteDictionaryCursor
+from y47.db.row import Record
+from y47.db.shard import ShardManager
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+
+# tenant: rows of its orders(id, total) table
+TENANTS = {
+    'acme': [(1, 10.0), (4, 40.0), (5, 50.0)],
+    'globex': [(2, 20.0), (6, 60.0)],
+    'initech': [(3, 30.0)],
+}
+
+
+# ShardManager (17)
+class TestShardManager(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for tenant, rows in TENANTS.items():
+            connection = SQLiteConnection(database=os.path.join(
+                                    self.directory, tenant + '.db')).connect
+            connection.execute('CREATE TABLE orders(id INTEGER, total REAL)')
+            connection.executemany('INSERT INTO orders VALUES(?, ?)', rows)
+            connection.commit()
+            connection.close()
+        self.shards = ShardManager(directory=self.directory, capacity=2,
+                                    max_workers=3)
+
+    def testCapacity(self):
+        with self.assertRaises(ValueError):
+            ShardManager(capacity=0)
+
+    def testShards(self):
+        self.assertEqual(self.shards.shards(), ['acme', 'globex', 'initech'])
+        self.assertEqual(self.shards.path('acme'), 
+                        os.path.join(self.directory, 'acme.db'))
+
+    def testHashedShards(self):
+        shards = ShardManager(directory=self.directory, pattern='s%s.db',
+                                shards=4)
+        self.assertEqual(shards.shards(), [0, 1, 2, 3])
+        self.assertEqual(shards.shard('acme'), shards.shard('acme'))
+        self.assertTrue(0 <= shards.shard(12345) < 4)
+
+    def testExecute(self):
+        self.assertEqual(self.shards.execute('globex', 
+                        'SELECT id FROM orders ORDER BY id'), [(2,), (6,)])
+
+    def testLRU(self):
+        for tenant in ['acme', 'globex', 'acme', 'initech']:
+            self.shards.execute(tenant, 'SELECT 1')
+        stats = self.shards.stats()
+        self.assertEqual(stats['open'], 2)
+        self.assertEqual(stats['opens'], 3)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(list(self.shards._open.keys()), ['acme', 'initech'])
+
+    def testInUseNotEvicted(self):
+        with self.shards.connection('acme') as connection:
+            self.shards.execute('globex', 'SELECT 1')
+            self.shards.execute('initech', 'SELECT 1')
+            self.assertTrue('acme' in self.shards._open)
+            connection.execute('SELECT 1')
+
+    def testConnectionIsExclusive(self):
+        seen = []
+        def other():
+            with self.shards.connection('acme'):
+                seen.append('other')
+        with self.shards.connection('acme'):
+            thread = threading.Thread(target=other)
+            thread.start()
+            thread.join(0.1)
+            seen.append('first')
+        thread.join()
+        self.assertEqual(seen, ['first', 'other'])
+
+    def testIterateAll(self):
+        rows = list(self.shards.iterate_all('SELECT id FROM orders'))
+        self.assertEqual(sorted(rows), [ (i,) for i in range(1, 7) ])
+
+    def testOrderedMerge(self):
+        self.assertEqual(self.shards.execute_all('SELECT id, total FROM orders',
+                        order_by='id'), [ (i, i * 10.0) for i in range(1, 7) ])
+
+    def testOrderedMergeStreams(self):
+        rows = self.shards.iterate_all('SELECT id FROM orders', order_by='id',
+                                        batch_size=1)
+        self.assertEqual(rows.next(), (1,))
+        self.assertEqual([ entry.users for entry in self.shards._open.values()
+                        ], [1, 1, 1])
+        rows.close()
+        self.assertEqual(sum([ entry.users 
+                        for entry in self.shards._open.values() ]), 0)
+
+    def testOrderByNotAColumn(self):
+        for order_by in ['id DESC', 'orders.id']:
+            with self.assertRaises(ValueError):
+                self.shards.execute_all('SELECT id FROM orders', 
+                                        order_by=order_by)
+        with self.assertRaises(ValueError):
+            self.shards.execute_all('SELECT id FROM orders', order_by='rowid')
+
+    def testGroupByNotAColumn(self):
+        with self.assertRaises(ValueError):
+            self.shards.aggregate('SELECT id, COUNT(*) FROM orders '
+                                    'GROUP BY id', group_by=['total'])
+
+    def testOrderedMergeDictionary(self):
+        self.shards.cursor_class = SQLiteDictionaryCursor
+        rows = self.shards.execute_all('SELECT id FROM orders', order_by='id',
+                                        shards=['acme', 'initech'])
+        self.assertEqual([ row['id'] for row in rows ], [1, 3, 4, 5])
+
+    def testRecordRows(self):
+        self.shards.row_type = Record
+        rows = self.shards.execute_all('SELECT id FROM orders', order_by='id')
+        self.assertEqual(rows[-1].id, 6)
+
+    def testAggregate(self):
+        self.assertEqual(self.shards.aggregate(
+                        'SELECT COUNT(*), SUM(total), MIN(id), MAX(id) '
+                        'FROM orders'), [(6, 210.0, 1, 6)])
+        self.assertEqual(self.shards.aggregate(
+                        'SELECT COUNT(*) AS n, MAX(id) AS top FROM orders',
+                        combine=['count', 'max']), [(6, 6)])
+
+    def testAggregateGroupBy(self):
+        self.assertEqual(self.shards.aggregate(
+                        'SELECT id % 2 AS odd, COUNT(*) FROM orders '
+                        'GROUP BY odd', group_by=['odd']), [(0, 3), (1, 3)])
+        with self.assertRaises(ValueError):
+            self.shards.aggregate('SELECT COUNT(*) FROM orders', 
+                                    combine=['avg'])
+
+    def testShardError(self):
+        with self.assertRaises(DatabaseException):
+            ShardManager(directory=os.path.join(self.directory, 'missing'),
+                        pattern='%s.db').execute('acme', 'SELECT 1')
+
+    def tearDown(self):
+        self.shards.close()
+        shutil.rmtree(self.directory)
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running shard tests...'
+    unittest.main()
+
+# ============================================================================
@@ -0,0 +1,131 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db.connection import SQLiteConnection
+from y47.db.cursor import SQLiteCursor
+from y47.db.statement import StatementCache
+import unittest
+
+
+class FakeCursor(object):
+    def __init__(self, sql):
+        self.sql = sql
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+# StatementCache (7)
+class TestStatementCache(unittest.TestCase):
+    def testCapacityInvalid(self):
+        with self.assertRaises(ValueError):
+            StatementCache(capacity=0)
+
+    def testMissThenHit(self):
+        self.cache = StatementCache(capacity=2)
+        first = self.cache.get('SELECT 1', FakeCursor)
+        second = self.cache.get('SELECT 1', FakeCursor)
+        self.assertTrue(first is second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def testEvictsLeastRecentlyUsed(self):
+        self.cache = StatementCache(capacity=2)
+        first = self.cache.get('SELECT 1', FakeCursor)
+        self.cache.get('SELECT 2', FakeCursor)
+        self.cache.get('SELECT 1', FakeCursor)
+        self.cache.get('SELECT 3', FakeCursor)
+        self.assertTrue('SELECT 1' in self.cache)
+        self.assertTrue('SELECT 2' not in self.cache)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertFalse(first.closed)
+
+    def testEvictionClosesCursor(self):
+        self.cache = StatementCache(capacity=1)
+        first = self.cache.get('SELECT 1', FakeCursor)
+        self.cache.get('SELECT 2', FakeCursor)
+        self.assertTrue(first.closed)
+
+    def testShrinkCapacity(self):
+        self.cache = StatementCache(capacity=3)
+        for sql in ['SELECT 1', 'SELECT 2', 'SELECT 3']:
+            self.cache.get(sql, FakeCursor)
+        self.cache.capacity = 1
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.evictions, 2)
+
+    def testClear(self):
+        self.cache = StatementCache(capacity=2)
+        first = self.cache.get('SELECT 1', FakeCursor)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertTrue(first.closed)
+
+    def testStats(self):
+        self.cache = StatementCache(capacity=5)
+        self.cache.get('SELECT 1', FakeCursor)
+        self.assertEqual(self.cache.stats(), {'capacity': 5, 'size': 1,
+                            'hits': 0, 'misses': 1, 'evictions': 0})
+
+
+# SQLiteCursor statement_cache (3)
+class TestSQLiteCursorStatementCache(unittest.TestCase):
+    def setUp(self):
+        self.connection = SQLiteConnection(database=':memory:').connect
+
+    def testDisabledByDefault(self):
+        self.cursor = SQLiteCursor(connection=self.connection)
+        self.assertEqual(self.cursor.statements, None)
+
+    def testReusesCursor(self):
+        self.cursor = SQLiteCursor(connection=self.connection, 
+                                    statement_cache=10)
+        for i in range(5):
+            results = self.cursor.execute("SELECT ?", (i,))
+            self.assertEqual(results[0][0], i)
+        self.assertEqual(self.cursor.statements.hits, 4)
+        self.assertEqual(self.cursor.statements.misses, 1)
+
+    def testConnectionChangeClearsCache(self):
+        self.cursor = SQLiteCursor(connection=self.connection, 
+                                    statement_cache=10)
+        self.cursor.execute("SELECT 1")
+        self.cursor.connection = SQLiteConnection(database=':memory:').connect
+        self.assertEqual(len(self.cursor.statements), 0)
+
+    def tearDown(self):
+        self.connection.close()
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running statement tests...'
+    unittest.main()
+
+# ============================================================================
@@ -0,0 +1,173 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db.connection import SQLiteConnection, OracleConnection
+from y47.db.cursor import SQLiteCursor
+from y47.db.driver import driver
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class FakeOracleHandle(object):
+    def __init__(self):
+        self.autocommit = 1
+
+
+# Transaction (14)
+class TestTransaction(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        path = os.path.join(self.tmp, 'transaction.db')
+        self.sqlite = SQLiteConnection(database=path)
+        self.sqlite.connect.execute(
+                        "CREATE TABLE test (id INTEGER PRIMARY KEY, name TEXT)")
+        # a second connection sees committed rows only
+        self.other = SQLiteConnection(database=path)._connect()
+
+    def count(self):
+        return self.other.execute("SELECT COUNT(*) FROM test").fetchone()[0]
+
+    def insert(self, tx, i):
+        SQLiteCursor(connection=tx.connection).execute(
+                        "INSERT INTO test VALUES (?, ?)", (i, 'name%d' % i))
+
+    def testCommit(self):
+        with self.sqlite.transaction() as tx:
+            self.insert(tx, 1)
+            self.assertEqual(self.count(), 0)
+        self.assertEqual(self.count(), 1)
+        self.assertEqual(tx.commits, 1)
+
+    def testRollback(self):
+        with self.assertRaises(ZeroDivisionError):
+            with self.sqlite.transaction() as tx:
+                self.insert(tx, 1)
+                1 / 0
+        self.assertEqual(self.count(), 0)
+
+    def testConnectionIsCached(self):
+        with self.sqlite.transaction() as tx:
+            self.assertTrue(tx.connection is self.sqlite.connect)
+
+    def testSavepointRollback(self):
+        with self.sqlite.transaction() as tx:
+            self.insert(tx, 1)
+            with self.assertRaises(driver('sqlite').IntegrityError):
+                with self.sqlite.transaction() as inner:
+                    self.insert(inner, 2)
+                    self.insert(inner, 1)
+            self.insert(tx, 3)
+        self.assertEqual(self.other.execute("SELECT id FROM test ORDER BY id"
+                        ).fetchall(), [(1,), (3,)])
+
+    def testSavepointRelease(self):
+        with self.sqlite.transaction():
+            with self.sqlite.transaction() as inner:
+                self.insert(inner, 1)
+            with self.sqlite.transaction() as inner:
+                self.insert(inner, 2)
+        self.assertEqual(self.count(), 2)
+
+    def testOuterRollbackUndoesSavepoints(self):
+        with self.assertRaises(ZeroDivisionError):
+            with self.sqlite.transaction():
+                with self.sqlite.transaction() as inner:
+                    self.insert(inner, 1)
+                1 / 0
+        self.assertEqual(self.count(), 0)
+
+    def testGroupSize(self):
+        with self.sqlite.transaction(group_size=10) as tx:
+            for i in range(25):
+                self.insert(tx, i)
+            self.assertEqual(self.count(), 20)
+        self.assertEqual(self.count(), 25)
+        self.assertEqual((tx.statements, tx.commits), (25, 3))
+
+    def testGroupMs(self):
+        with self.sqlite.transaction(group_ms=0) as tx:
+            self.insert(tx, 1)
+            self.assertEqual(self.count(), 1)
+
+    def testNoGroupCommitInsideSavepoint(self):
+        with self.sqlite.transaction(group_size=1) as tx:
+            with self.sqlite.transaction() as inner:
+                self.insert(inner, 1)
+                self.assertEqual(self.count(), 0)
+            tx.executed(0)
+            self.assertEqual(self.count(), 1)
+
+    def testExecutedByHand(self):
+        with self.sqlite.transaction(group_size=2) as tx:
+            tx.connection.execute("INSERT INTO test VALUES (1, 'name1')")
+            tx.executed()
+            self.insert(tx, 2)
+            self.assertEqual(self.count(), 2)
+        self.assertEqual(tx.statements, 2)
+
+    def testNotCountedAfterExit(self):
+        with self.sqlite.transaction(group_size=1) as tx:
+            pass
+        self.insert(tx, 1)
+        self.assertEqual((tx.statements, tx.commits), (0, 1))
+
+    def testExecutedOutsideTransaction(self):
+        tx = self.sqlite.transaction()
+        with self.assertRaises(ValueError):
+            tx.executed()
+
+    def testIsolationLevelRestored(self):
+        self.sqlite.autocommit = 'DEFERRED'
+        with self.sqlite.transaction() as tx:
+            self.assertEqual(tx.connection.isolation_level, None)
+            self.insert(tx, 1)
+        self.assertEqual(self.sqlite.connect.isolation_level, 'DEFERRED')
+        self.assertEqual(self.count(), 1)
+
+    def testOracleAutocommitSwitchedOff(self):
+        oracle, handle = OracleConnection(), FakeOracleHandle()
+        saved = oracle._enter(handle)
+        self.assertEqual(handle.autocommit, False)
+        oracle._exit(handle, saved)
+        self.assertEqual(handle.autocommit, 1)
+
+    def tearDown(self):
+        self.other.close()
+        self.sqlite.close()
+        shutil.rmtree(self.tmp)
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running transaction tests...'
+    unittest.main()
+
+# ============================================================================
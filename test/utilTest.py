@@ -0,0 +1,69 @@
+#####
+#
+# y47 Software Library Resource
+# Copyright (C) 2010-2012 Year47. All Rights Reserved.
+# 
+# Author: Glenn T Norton
+# Contact: glenn@year47.com
+#
+# This software is provided 'as-is', without any express or implied
+# warranty.  In no event will the authors be held liable for any damages
+# arising from the use of this software.
+# 
+# Permission is granted to anyone to use this software for any purpose,
+# including commercial applications, and to alter it and redistribute it
+# freely, subject to the following restrictions:
+# 
+# 1. The origin of this software must not be misrepresented; you must not
+#    claim that you wrote the original software. If you use this software
+#    in a product, an acknowledgment in the product documentation would be
+#    appreciated but is not required.
+#
+# 2. Altered source versions must be plainly marked as such, and must not be
+#    misrepresented as being the original software.
+#
+# 3. This notice may not be removed or altered from any source distribution.
+#
+#####
+
+from y47.db.util import VERB, checkColumn, increment
+import threading
+import unittest
+
+
+class Counted(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+
+
+# util (3)
+class TestUtil(unittest.TestCase):
+    def testVerb(self):
+        self.assertEqual(VERB.match(' (SELECT 1)').group(1), 'SELECT')
+        self.assertEqual(VERB.match('-- comment'), None)
+
+    def testIncrement(self):
+        counted = Counted()
+        threads = [ threading.Thread(target=lambda: [ increment(counted, 
+                    'hits') for i in range(1000) ]) for i in range(4) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counted.hits, 4000)
+
+    def testCheckColumn(self):
+        checkColumn('placed_at')
+        for name in ['id DESC', 'o.id', '', None, '1']:
+            with self.assertRaises(ValueError):
+                checkColumn(name)
+
+
+# ============================================================================
+
+if __name__ == '__main__':
+    print 'Running util tests...'
+    unittest.main()
+
+# ============================================================================